@@ -13,4 +13,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'competence_exchange.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Importé après l'initialisation de Django. Le flux d'événements des créneaux (text/event-stream)
+# est servi avant le gestionnaire de requêtes de Django ; les autres requêtes lui sont passées.
+from core.events import EventStreamApplication  # noqa: E402
+
+application = EventStreamApplication(django_application)
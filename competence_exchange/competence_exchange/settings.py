@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -22,9 +23,10 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-zefcnf)ttu-x!ys-6jl8aro+d8ush+edyg478mv8hiwdia54&3'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Mode debug par défaut ; DJANGO_DEBUG=0 pour la production, avec DJANGO_ALLOWED_HOSTS (noms séparés par des virgules)
+DEBUG = os.environ.get('DJANGO_DEBUG', '1') == '1'
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
 
 # Application definition
 
@@ -39,6 +41,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # En premier pour mesurer l'ensemble du traitement de la requête
+    'core.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -46,22 +50,34 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Après une écriture, les lectures du client restent sur la base principale (voir core.database)
+    'core.middleware.PrimaryPinMiddleware',
 ]
 
 ROOT_URLCONF = 'competence_exchange.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Moteur Django standard, chronométré pour l'en-tête Server-Timing (voir core.performance)
+        'BACKEND': 'core.performance.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / "templates"],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.navigation',
             ],
+            # Gabarits compilés une fois par processus (en mode debug, le cache est vidé à chaque
+            # modification d'un gabarit) ; sans informations de débogage hors mode debug
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+            'debug': DEBUG,
         },
     },
 ]
@@ -69,11 +85,119 @@ TEMPLATES = [
 WSGI_APPLICATION = 'competence_exchange.wsgi.application'
 
 # Database
+# Configuration lue dans l'environnement : DJANGO_DB_ENGINE, DJANGO_DB_NAME, DJANGO_DB_USER, DJANGO_DB_PASSWORD,
+# DJANGO_DB_HOST et DJANGO_DB_PORT pour la base principale (SQLite sur db.sqlite3 par défaut) ; les mêmes
+# variables préfixées DJANGO_DB_REPLICA_ (dont DJANGO_DB_REPLICA_NAME, obligatoire) déclarent un réplica en
+# lecture, vers lequel core.database.PrimaryReplicaRouter dirige les vues de liste.
+def database_settings(prefix, name=None, fallback='DJANGO_DB'):
+    """
+    Configuration d'une base lue dans les variables d'environnement `{prefix}_*`, à défaut `{fallback}_*`.
+    """
+    def env(key, default=''):
+        return os.environ.get(f'{prefix}_{key}', os.environ.get(f'{fallback}_{key}', default))
+
+    return {
+        'ENGINE': env('ENGINE', 'django.db.backends.sqlite3'),
+        'NAME': os.environ.get(f'{prefix}_NAME', name),
+        'USER': env('USER'),
+        'PASSWORD': env('PASSWORD'),
+        'HOST': env('HOST'),
+        'PORT': env('PORT'),
+        # Connexions persistantes (en secondes, 0 pour une connexion par requête), vérifiées avant réutilisation
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_DB_CONN_MAX_AGE', '0')),
+        'CONN_HEALTH_CHECKS': os.environ.get('DJANGO_DB_CONN_HEALTH_CHECKS', '1') == '1',
+    }
+
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        **database_settings('DJANGO_DB', BASE_DIR / 'db.sqlite3'),
+        # Base de test sur fichier : les tests de concurrence ouvrent une connexion par thread,
+        # ce que la base en mémoire partagée de SQLite ne permet pas sans erreurs de verrouillage.
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    }
+}
+if os.environ.get('DJANGO_DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **database_settings('DJANGO_DB_REPLICA'),
+        # Pendant les tests, le réplica est la base de test principale
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.database.PrimaryReplicaRouter']
+
+# Durée (en secondes) pendant laquelle un client qui vient d'écrire lit la base principale (voir core.database)
+REPLICA_PIN_SECONDS = int(os.environ.get('DJANGO_REPLICA_PIN_SECONDS', '5'))
+
+# Réglages de chaque connexion SQLite (core.database.configure_sqlite) : journal WAL pour que les lectures
+# ne bloquent pas les écritures, attente d'un verrou jusqu'à busy_timeout ms, synchronisation NORMAL (sûre en WAL)
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('DJANGO_SQLITE_JOURNAL_MODE', 'wal'),
+    'busy_timeout': int(os.environ.get('DJANGO_SQLITE_BUSY_TIMEOUT_MS', '5000')),
+    'synchronous': os.environ.get('DJANGO_SQLITE_SYNCHRONOUS', 'normal'),
+}
+
+# Cache
+# Mémoire locale par défaut ; DJANGO_CACHE_BACKEND=file active un cache sur disque partagé entre processus.
+if os.environ.get('DJANGO_CACHE_BACKEND') == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', str(BASE_DIR / 'cache')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'competence-exchange',
+        }
     }
+
+# Journalisation des mesures de performance (core.middleware.PerformanceMiddleware) :
+# chaque requête en DEBUG, les requêtes de plus de PERFORMANCE_SLOW_REQUEST_MS ms en WARNING.
+PERFORMANCE_SLOW_REQUEST_MS = 500
+
+# File de tâches de fond (voir core.tasks) : les tâches sont exécutées par `manage.py run_task_worker`,
+# qui doit tourner à côté du serveur (sans lui, les nouveaux créneaux ne sont pas indexés et les
+# courriels ne partent pas). DJANGO_TASKS_EAGER=1 les exécute dans la requête, après la validation de
+# la transaction, sans worker.
+TASKS_EAGER = os.environ.get('DJANGO_TASKS_EAGER', '0') == '1'
+
+# Courriels (notifications des demandeurs) : affichés sur la sortie standard par défaut
+EMAIL_BACKEND = os.environ.get('DJANGO_EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.environ.get('DJANGO_EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('DJANGO_EMAIL_PORT', '25'))
+DEFAULT_FROM_EMAIL = os.environ.get('DJANGO_DEFAULT_FROM_EMAIL', 'noreply@competence-exchange.local')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'performance': {
+            'format': '%(asctime)s %(levelname)s %(name)s %(message)s',
+        },
+    },
+    'handlers': {
+        'performance': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'performance',
+        },
+    },
+    'loggers': {
+        'core.performance': {
+            'handlers': ['performance'],
+            'level': os.environ.get('DJANGO_PERFORMANCE_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+        'core.tasks': {
+            'handlers': ['performance'],
+            'level': os.environ.get('DJANGO_TASKS_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
 }
 
 # Password validation
@@ -1,7 +1,217 @@
+from calendar import monthrange
+from datetime import date
+
 from django.contrib import admin
-from .models import Competence, Slot, Activity, Category
+from django.contrib.admin.views.main import ChangeList
+from django.db.models import Q
+from django.utils import formats
+from django.utils.text import capfirst
+
+from . import archive
+from .models import Competence, Slot, Activity, Category, MatchProposal, ArchivedSlot, ArchivedActivity, Task, AvailabilityStat
+from .pagination import EstimatedCountPaginator
+from .volunteering import set_availability
+
+
+class BoundedDateChangeList(ChangeList):
+    """
+    Liste de l'administration dont la hiérarchie de dates ne parcourt pas la table.
+
+    La hiérarchie de Django cherche les années, mois ou jours distincts de la sélection (un DISTINCT sur
+    une fonction de la date, donc sur toutes les lignes). Ici, seules la première et la dernière date de
+    la sélection sont lues, par deux lectures d'index, et toutes les périodes comprises entre elles sont
+    proposées, y compris celles qui seraient vides.
+    """
+
+    def _bound(self, ordering):
+        return self.queryset.order_by(ordering).values_list(self.date_hierarchy, flat=True).first()
+
+    def bounded_date_hierarchy(self):
+        """
+        Contexte du gabarit admin/date_hierarchy.html, comme la balise `date_hierarchy` de Django.
+        """
+        field = self.date_hierarchy
+        year_field, month_field, day_field = f'{field}__year', f'{field}__month', f'{field}__day'
+        year, month, day = (self.params.get(name) for name in (year_field, month_field, day_field))
+
+        def link(filters):
+            return self.get_query_string(filters, [f'{field}__'])
+
+        if year and month and day:
+            selected = date(int(year), int(month), int(day))
+            return {
+                'show': True,
+                'back': {'link': link({year_field: year, month_field: month}), 'title': capfirst(formats.date_format(selected, 'YEAR_MONTH_FORMAT'))},
+                'choices': [{'title': capfirst(formats.date_format(selected, 'MONTH_DAY_FORMAT'))}],
+            }
+        first = self._bound(field)
+        if first is None:
+            return {'show': False}
+        last = self._bound(f'-{field}')
+        if not year and first.year == last.year:
+            year = first.year
+            if first.month == last.month:
+                month = first.month
+        if year and month:
+            year, month = int(year), int(month)
+            days = range(first.day, last.day + 1) if (first.year, first.month) == (last.year, last.month) else range(1, monthrange(year, month)[1] + 1)
+            return {
+                'show': True,
+                'back': {'link': link({year_field: year}), 'title': str(year)},
+                'choices': [
+                    {
+                        'link': link({year_field: year, month_field: month, day_field: number}),
+                        'title': capfirst(formats.date_format(date(year, month, number), 'MONTH_DAY_FORMAT')),
+                    }
+                    for number in days
+                ],
+            }
+        if year:
+            year = int(year)
+            months = range(first.month, last.month + 1) if first.year == last.year else range(1, 13)
+            return {
+                'show': True,
+                'back': {'link': link({}), 'title': "Toutes les dates"},
+                'choices': [
+                    {
+                        'link': link({year_field: year, month_field: number}),
+                        'title': capfirst(formats.date_format(date(year, number, 1), 'YEAR_MONTH_FORMAT')),
+                    }
+                    for number in months
+                ],
+            }
+        return {
+            'show': True,
+            'back': None,
+            'choices': [
+                {'link': link({year_field: str(number)}), 'title': str(number)} for number in range(first.year, last.year + 1)
+            ],
+        }
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Administration d'une table pouvant compter des millions de lignes.
+
+    La liste ne fait aucun COUNT(*) complet : le paginateur compte exactement jusqu'à une limite puis
+    estime (voir `EstimatedCountPaginator`), et le total non filtré n'est pas affiché. La recherche
+    compare le texte saisi par égalité, sur des colonnes indexées, au lieu du `icontains` de Django
+    qui parcourt toute la table : chaque champ de `search_fields` est soit une colonne de la table,
+    soit `relation__colonne` (filtre par sous-requête sur la table liée, puis par l'index de la clé
+    étrangère). Un nombre entier cherche aussi l'identifiant. La hiérarchie de dates est bornée par la
+    première et la dernière date (voir `BoundedDateChangeList`) : le champ doit être indexé.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return BoundedDateChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term or not self.search_fields:
+            return queryset, False
+        condition = Q(pk=int(term)) if term.isdigit() else Q()
+        for path in self.search_fields:
+            relation, _, column = path.rpartition('__')
+            if not relation:
+                condition |= Q(**{column: term})
+                continue
+            related = self.model._meta.get_field(relation).related_model
+            condition |= Q(**{f'{relation}__in': related._default_manager.filter(**{column: term}).values('pk')})
+        return queryset.filter(condition), False
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ('name', 'updated_at')
+    search_fields = ('name',)
+
+
+@admin.register(Competence)
+class CompetenceAdmin(admin.ModelAdmin):
+    list_display = ('name', 'category', 'updated_at')
+    list_select_related = ('category',)
+    list_filter = ('category',)
+    search_fields = ('name',)
+
+
+@admin.register(Slot)
+class SlotAdmin(LargeTableAdmin):
+    # Filtres servis par l'index (is_available, purpose, date), hiérarchie de dates par l'index de la date
+    list_display = ('id', 'date', 'competence', 'user', 'purpose', 'is_available')
+    list_select_related = ('competence', 'user')
+    list_filter = ('is_available', 'purpose')
+    date_hierarchy = 'date'
+    # Ordre des index sur la date (qui se terminent par l'identifiant) : la page est lue sans tri
+    ordering = ('-date', '-id')
+    search_fields = ('user__username', 'competence__name')
+    raw_id_fields = ('user', 'competence')
+    actions = ('close_slots', 'reopen_slots', 'archive_selected_slots')
+
+    @admin.action(description="Fermer les créneaux sélectionnés")
+    def close_slots(self, request, queryset):
+        count = set_availability(queryset, available=False)
+        self.message_user(request, f"{count} créneau(x) fermé(s).")
+
+    @admin.action(description="Rouvrir les créneaux sélectionnés")
+    def reopen_slots(self, request, queryset):
+        count = set_availability(queryset, available=True)
+        self.message_user(request, f"{count} créneau(x) rouvert(s).")
+
+    @admin.action(description="Archiver les créneaux sélectionnés")
+    def archive_selected_slots(self, request, queryset):
+        totals = archive.archive_slots(queryset)
+        self.message_user(request, f"{totals['slots']} créneau(x) et {totals['activities']} activité(s) archivé(s).")
+
+
+@admin.register(Activity)
+class ActivityAdmin(LargeTableAdmin):
+    # __str__ affiche la compétence requise : elle est chargée par la même requête que la liste
+    list_display = ('__str__', 'requester', 'volunteer', 'updated_at')
+    list_select_related = ('competence_needed', 'requester', 'volunteer')
+    # Demandes avec ou sans volontaire : index (volunteer, competence_needed)
+    list_filter = (('volunteer', admin.EmptyFieldListFilter),)
+    search_fields = ('requester__username', 'volunteer__username', 'competence_needed__name')
+    raw_id_fields = ('requester', 'competence_needed', 'slot', 'volunteer')
+
+
+@admin.register(MatchProposal)
+class MatchProposalAdmin(LargeTableAdmin):
+    raw_id_fields = ('activity', 'offer')
+
+
+@admin.register(ArchivedSlot)
+class ArchivedSlotAdmin(LargeTableAdmin):
+    list_display = ('id', 'date', 'competence_id', 'user_id', 'purpose', 'is_available', 'archived_at')
+    raw_id_fields = ('user', 'competence')
+
+
+@admin.register(ArchivedActivity)
+class ArchivedActivityAdmin(LargeTableAdmin):
+    list_display = ('id', 'description', 'slot_id', 'archived_at')
+    raw_id_fields = ('requester', 'competence_needed', 'slot', 'volunteer')
+
+
+@admin.register(Task)
+class TaskAdmin(LargeTableAdmin):
+    # Filtre par état : index (status, run_at)
+    list_display = ('id', 'name', 'status', 'attempts', 'run_at', 'finished_at')
+    list_filter = ('status',)
+
+
+@admin.register(AvailabilityStat)
+class AvailabilityStatAdmin(LargeTableAdmin):
+    # Table maintenue par core.stats : consultation seulement
+    list_display = ('competence', 'week', 'open_offers', 'open_requests')
+    list_select_related = ('competence',)
+    date_hierarchy = 'week'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
-admin.site.register(Competence)
-admin.site.register(Slot)
-admin.site.register(Activity)
-admin.site.register(Category)
+    def has_delete_permission(self, request, obj=None):
+        return False
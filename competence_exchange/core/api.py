@@ -0,0 +1,296 @@
+import json
+from functools import wraps
+
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, set_response_etag
+from django.views.decorators.http import require_GET
+
+from . import database, queries, stats, versions
+from .models import Category, Competence, Slot
+from .pagination import InvalidCursor, KeysetPaginator
+
+# Taille de page par défaut et maximale de l'API (paramètre `limit`)
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 500
+
+# Nombre de lignes lues par aller-retour avec la base et envoyées par morceau en mode NDJSON
+STREAM_CHUNK_SIZE = 1000
+
+
+class ApiError(ValueError):
+    """
+    Exception levée lorsqu'un paramètre de requête de l'API est invalide.
+    """
+
+
+def staff_required(view):
+    """
+    Réserve une vue de l'API aux membres de l'équipe, comme `staff_member_required` pour les pages,
+    mais avec une réponse JSON (code 403) au lieu d'une redirection vers la connexion.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not (request.user.is_active and request.user.is_staff):
+            return JsonResponse({'error': "Accès réservé à l'équipe."}, status=403)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+class Resource:
+    """
+    Description d'une ressource de l'API en lecture seule.
+
+    Attributes:
+        queryset (callable): Fonction retournant le QuerySet des lignes exposées, sans tri.
+        fields (dict): Les champs exposés, dans l'ordre, associés à leur chemin de lookup.
+        ordering (tuple): Les chemins de tri de la pagination par curseur (le dernier doit être unique).
+        filters (dict): Les paramètres de filtre acceptés, associés à leur chemin de lookup.
+        login_required (bool): Ressource réservée aux utilisateurs connectés, comme la page qui l'affiche.
+    """
+
+    def __init__(self, queryset, fields, ordering, filters=None, login_required=False):
+        self.queryset = queryset
+        self.fields = fields
+        self.ordering = ordering
+        self.filters = filters or {}
+        self.login_required = login_required
+
+    def select(self, value):
+        """
+        Retourne les champs demandés par le paramètre `fields` (tous par défaut).
+
+        Raises :
+            ApiError : Si un champ demandé n'existe pas.
+        """
+        if not value:
+            return list(self.fields)
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown or not names:
+            raise ApiError(f"Champs inconnus : {', '.join(unknown)}. Champs disponibles : {', '.join(self.fields)}.")
+        return names
+
+    def filtered(self, params):
+        """
+        Retourne le QuerySet de la ressource restreint par les paramètres de filtre présents.
+
+        Raises :
+            ApiError : Si la valeur d'un filtre est invalide.
+        """
+        queryset = self.queryset()
+        model = queryset.model
+        for param, lookup in self.filters.items():
+            value = params.get(param)
+            if value is None:
+                continue
+            field = model._meta.get_field(lookup.split('__')[0])
+            try:
+                queryset = queryset.filter(**{lookup: field.to_python(value)})
+            except ValidationError as error:
+                raise ApiError(f"Filtre « {param} » invalide : {' '.join(error.messages)}") from error
+        return queryset
+
+
+RESOURCES = {
+    'categories': Resource(
+        lambda: Category.objects.all(),
+        {'id': 'id', 'name': 'name'},
+        ordering=('name', 'id'),
+    ),
+    'competences': Resource(
+        lambda: Competence.objects.all(),
+        {'id': 'id', 'name': 'name', 'category_id': 'category_id', 'category': 'category__name'},
+        ordering=('name', 'id'),
+        filters={'category': 'category_id'},
+    ),
+    'slots': Resource(
+        queries.open_slots_queryset,
+        {'id': 'id', 'date': 'date', 'purpose': 'purpose', 'competence_id': 'competence_id', 'competence': 'competence__name'},
+        ordering=('date', 'id'),
+        filters={'purpose': 'purpose', 'competence': 'competence_id'},
+    ),
+    'activities': Resource(
+        queries.open_requests_queryset,
+        {
+            'id': 'id', 'description': 'description', 'date': 'slot__date', 'slot_id': 'slot_id',
+            'competence_id': 'competence_needed_id', 'competence': 'competence_needed__name',
+        },
+        ordering=('slot__date', 'id'),
+        filters={'competence': 'competence_needed_id'},
+        # Les demandes d'aide (description comprise) ne sont affichées qu'aux utilisateurs connectés
+        login_required=True,
+    ),
+}
+
+
+def _page_size(value):
+    """
+    Valide le paramètre `limit`.
+
+    Raises :
+        ApiError : Si la taille de page n'est pas un entier entre 1 et API_MAX_PAGE_SIZE.
+    """
+    if not value:
+        return API_PAGE_SIZE
+    try:
+        size = int(value)
+    except ValueError:
+        size = 0
+    if not 1 <= size <= API_MAX_PAGE_SIZE:
+        raise ApiError(f"Le paramètre « limit » doit être un entier entre 1 et {API_MAX_PAGE_SIZE}.")
+    return size
+
+
+def _ndjson_chunks(rows, fields):
+    """
+    Sérialise des lignes `values()` en NDJSON, par morceaux de STREAM_CHUNK_SIZE lignes.
+
+    Args:
+        rows (iterable): Les lignes, indexées par chemin de lookup.
+        fields (dict): Les champs renvoyés, associés à leur chemin de lookup.
+    """
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({name: row[path] for name, path in fields.items()}, cls=DjangoJSONEncoder, ensure_ascii=False))
+        if len(lines) >= STREAM_CHUNK_SIZE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+async def _andjson_chunks(queryset, fields):
+    """
+    Variante asynchrone de `_ndjson_chunks`, pour servir le flux sous ASGI sans le charger en mémoire.
+    """
+    lines = []
+    # aiterator() exige un QuerySet `values()` : sous Django 4.2, il exécuterait un `values_list()` de façon synchrone
+    async for row in queryset.aiterator(chunk_size=STREAM_CHUNK_SIZE):
+        lines.append(json.dumps({name: row[path] for name, path in fields.items()}, cls=DjangoJSONEncoder, ensure_ascii=False))
+        if len(lines) >= STREAM_CHUNK_SIZE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def _stream(request, resource, names):
+    """
+    Exporte toutes les lignes d'une ressource en NDJSON, avec une mémoire constante côté serveur.
+    """
+    fields = {name: resource.fields[name] for name in names}
+    queryset = resource.filtered(request.GET).order_by(*resource.ordering).values(*set(fields.values()))
+    # Le flux est lu après la fin de la vue : la base est choisie maintenant, tant que le routage de la vue s'applique
+    queryset = queryset.using(queryset.db)
+    # Sous WSGI, un itérateur synchrone ; sous ASGI, un itérateur asynchrone (sinon Django chargerait tout le flux)
+    if isinstance(request, ASGIRequest):
+        content = _andjson_chunks(queryset, fields)
+    else:
+        content = _ndjson_chunks(queryset.iterator(chunk_size=STREAM_CHUNK_SIZE), fields)
+    return StreamingHttpResponse(content, content_type='application/x-ndjson; charset=utf-8')
+
+
+@require_GET
+@database.replica_reads
+def resource_list(request, resource):
+    """
+    Liste en JSON les lignes d'une ressource de l'API, en lecture seule.
+
+    Paramètres GET :
+        fields : Les champs à renvoyer, séparés par des virgules (tous par défaut).
+        limit : La taille de la page (API_PAGE_SIZE par défaut, API_MAX_PAGE_SIZE au plus).
+        cursor : Le curseur renvoyé dans `next` par la page précédente.
+        format : `ndjson` pour exporter toutes les lignes en flux, une ligne JSON par objet, sans pagination.
+        Ainsi que les filtres propres à la ressource (par exemple `competence` ou `purpose`).
+
+    Les pages JSON portent un ETag : une requête avec `If-None-Match` reçoit une réponse 304 si la page n'a pas changé.
+
+    Args:
+        request (HttpRequest): La requête HTTP reçue par le serveur.
+        resource (str): Le nom de la ressource dans RESOURCES.
+
+    Returns :
+        JsonResponse : La page `{'results': [...], 'next': url ou null}`.
+        StreamingHttpResponse : Le flux NDJSON avec `format=ndjson`.
+        HttpResponseNotModified : Si l'ETag de la page correspond à `If-None-Match`.
+        JsonResponse : `{'error': ...}` avec le code 400 si un paramètre est invalide, 401 si la ressource
+        est réservée aux utilisateurs connectés.
+    """
+    spec = RESOURCES[resource]
+    if spec.login_required and not request.user.is_authenticated:
+        return JsonResponse({'error': "Authentification requise."}, status=401)
+    try:
+        names = spec.select(request.GET.get('fields'))
+        if request.GET.get('format') == 'ndjson':
+            return _stream(request, spec, names)
+        paths = {spec.fields[name] for name in names} | set(spec.ordering)
+        paginator = KeysetPaginator(
+            spec.filtered(request.GET).values(*paths), ordering=spec.ordering, per_page=_page_size(request.GET.get('limit')),
+        )
+        page = paginator.get_page(request.GET.get('cursor'))
+    except InvalidCursor:
+        return JsonResponse({'error': "Curseur de pagination invalide."}, status=400)
+    except ApiError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    next_url = None
+    if page.has_next:
+        params = request.GET.copy()
+        params['cursor'] = page.next_cursor
+        next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+    payload = {
+        'results': [{name: row[spec.fields[name]] for name in names} for row in page],
+        'next': next_url,
+    }
+    response = HttpResponse(
+        json.dumps(payload, cls=DjangoJSONEncoder, ensure_ascii=False), content_type='application/json; charset=utf-8',
+    )
+    set_response_etag(response)
+    return get_conditional_response(request, etag=response['ETag'], response=response)
+
+
+@require_GET
+@staff_required
+@database.replica_reads
+@versions.conditional_page(Slot, Category, Competence)
+def availability_stats(request):
+    """
+    Offre et demande d'aide ouvertes par compétence ou par catégorie et par semaine, en JSON, lues dans
+    la table des statistiques seulement (voir `core.stats`). Réservée à l'équipe, comme le tableau de bord.
+
+    Paramètres GET : `group` (`competence` ou `category`), `weeks` et `start` (voir `core.stats.options`).
+
+    Args:
+        request (HttpRequest): La requête HTTP reçue par le serveur.
+
+    Returns :
+        JsonResponse : `{'group', 'weeks': [lundis], 'results': [{'id', 'name', 'offers', 'requests',
+        'total_offers', 'total_requests'}, ...]}`.
+        JsonResponse : `{'error': ...}` avec le code 400 si un paramètre est invalide, 403 hors de l'équipe.
+    """
+    try:
+        group, weeks, start = stats.options(request.GET)
+    except stats.StatsError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    table = stats.weekly(group, weeks, start)
+    return JsonResponse({'group': group, 'weeks': table['weeks'], 'results': table['rows']})
+
+
+@require_GET
+def slot_events(request):
+    """
+    Route du flux d'événements des créneaux (text/event-stream), servi par `core.events.EventStreamApplication`
+    dans l'application ASGI (competence_exchange/asgi.py) avant le gestionnaire de requêtes de Django.
+
+    La requête n'arrive jusqu'ici que si le flux n'est pas servi : sous WSGI, une connexion ouverte
+    occuperait un thread du serveur pendant toute sa durée.
+
+    Returns :
+        JsonResponse : `{'error': ...}` avec le code 503.
+    """
+    return JsonResponse(
+        {'error': "Le flux d'événements n'est disponible que par l'application ASGI."}, status=503,
+    )
@@ -7,3 +7,9 @@ class CoreConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        """
+        Enregistre les gestionnaires de signaux de l'application.
+        """
+        from . import signals  # noqa: F401
@@ -0,0 +1,178 @@
+from datetime import date, timedelta
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import events, stats, versions
+from .models import Slot, Activity, ArchivedSlot, ArchivedActivity, MatchIndexEntry, MatchProposal
+
+# Colonnes recopiées dans les tables d'archive (mêmes noms dans la table d'origine et dans l'archive)
+SLOT_COLUMNS = ('id', 'date', 'user_id', 'competence_id', 'is_available', 'purpose', 'updated_at')
+ACTIVITY_COLUMNS = ('id', 'description', 'requester_id', 'competence_needed_id', 'slot_id', 'volunteer_id', 'updated_at')
+
+
+def cutoff_date(days=0):
+    """
+    Date à partir de laquelle les créneaux sont conservés : les créneaux antérieurs sont archivés.
+
+    Args:
+        days (int): Nombre de jours passés conservés en plus de la date du jour.
+    """
+    return date.today() - timedelta(days=days)
+
+
+def _copy(source, target, columns, ids, archived_at):
+    """
+    Recopie les lignes `ids` de la table de `source` dans la table d'archive de `target` par un
+    INSERT ... SELECT : les lignes ne transitent pas par Python, dont la préparation des valeurs
+    coûterait plus que l'écriture elle-même.
+    """
+    connection = connections[router.db_for_write(target)]
+    quote = connection.ops.quote_name
+    column_list = ', '.join(quote(column) for column in columns)
+    placeholders = ', '.join(['%s'] * len(ids))
+    sql = (
+        f"INSERT INTO {quote(target._meta.db_table)} ({column_list}, {quote('archived_at')}) "
+        f"SELECT {column_list}, %s FROM {quote(source._meta.db_table)} WHERE {quote('id')} IN ({placeholders})"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [connection.ops.adapt_datetimefield_value(archived_at), *ids])
+
+
+def _delete(model, ids):
+    """
+    Supprime les lignes `ids` de la table de `model` par un DELETE direct, sans charger les objets ni
+    envoyer les signaux de suppression : les compteurs de versions sont incrémentés une fois par lot ;
+    l'index de correspondance, les statistiques et le flux d'événements sont mis à jour explicitement
+    par `_move`.
+    """
+    if not ids:
+        return
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {quote(model._meta.db_table)} WHERE {quote('id')} IN ({placeholders})", ids)
+
+
+def archive_batch(cutoff, after_id=0, batch_size=500):
+    """
+    Archive, en une transaction, au plus `batch_size` créneaux antérieurs à `cutoff` et leurs activités.
+
+    Les créneaux sont parcourus par identifiant croissant à partir de `after_id`, de sorte que chaque lot
+    reprend l'index de la clé primaire là où le précédent s'est arrêté.
+
+    Args:
+        cutoff (date): Les créneaux de date strictement antérieure sont archivés.
+        after_id (int): L'identifiant du dernier créneau archivé par le lot précédent.
+        batch_size (int): Nombre maximal de créneaux du lot.
+
+    Returns :
+        tuple : (identifiant du dernier créneau archivé ou None s'il n'y en avait plus, nombre de créneaux,
+        nombre d'activités).
+    """
+    with transaction.atomic():
+        slot_ids = list(
+            Slot.objects.filter(pk__gt=after_id, date__lt=cutoff).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not slot_ids:
+            return None, 0, 0
+        return slot_ids[-1], len(slot_ids), _move(slot_ids)
+
+
+def _move(slot_ids):
+    """
+    Déplace les créneaux `slot_ids` et leurs activités dans les tables d'archive (dans la transaction
+    de l'appelant).
+
+    Returns :
+        int : Le nombre d'activités archivées.
+    """
+    activity_ids = list(Activity.objects.filter(slot_id__in=slot_ids).values_list('pk', flat=True))
+    slots = [
+        Slot(pk=pk, competence_id=competence_id, date=slot_date, purpose=purpose, is_available=is_available)
+        for pk, competence_id, slot_date, purpose, is_available in Slot.objects.filter(pk__in=slot_ids).values_list(
+            'pk', 'competence_id', 'date', 'purpose', 'is_available',
+        )
+    ]
+
+    # Les créneaux encore ouverts sortent des statistiques (la suppression directe n'envoie pas de signal)
+    stats.apply(stats.deltas(
+        ((slot.competence_id, slot.date, slot.purpose) for slot in slots if slot.is_available), -1,
+    ))
+    archived_at = timezone.now()
+    _copy(Slot, ArchivedSlot, SLOT_COLUMNS, slot_ids, archived_at)
+    if activity_ids:
+        _copy(Activity, ArchivedActivity, ACTIVITY_COLUMNS, activity_ids, archived_at)
+
+    # Les lignes qui référencent les créneaux et les activités d'abord (clés étrangères vérifiées par la base)
+    MatchProposal.objects.filter(Q(offer_id__in=slot_ids) | Q(activity_id__in=activity_ids)).delete()
+    MatchIndexEntry.objects.filter(slot_id__in=slot_ids).delete()
+    _delete(Activity, activity_ids)
+    _delete(Slot, slot_ids)
+    versions.bump(Slot, Activity)
+    # Comme le signal post_delete d'un créneau : les pages ouvertes retirent les créneaux archivés
+    for slot in slots:
+        events.publish_on_commit(events.SLOT_DELETED, events.slot_data(slot))
+    return len(activity_ids)
+
+
+def archive_slots(queryset, batch_size=500):
+    """
+    Archive les créneaux d'un QuerySet quelle que soit leur date, avec leurs activités, par exemple depuis
+    une action groupée de l'administration : les créneaux sont déplacés par lots d'au plus `batch_size`,
+    comme par `archive_past_slots`, mais en une seule transaction.
+
+    Returns :
+        dict : Le nombre de créneaux et d'activités archivés, et le nombre de lots.
+    """
+    totals = {'slots': 0, 'activities': 0, 'batches': 0}
+    with transaction.atomic():
+        slot_ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(slot_ids), batch_size):
+            batch = slot_ids[start:start + batch_size]
+            totals['activities'] += _move(batch)
+            totals['slots'] += len(batch)
+            totals['batches'] += 1
+    return totals
+
+
+def archive_past_slots(cutoff=None, batch_size=500, progress=None):
+    """
+    Déplace dans les tables d'archive tous les créneaux antérieurs à `cutoff`, avec leurs activités,
+    par lots d'au plus `batch_size` créneaux : chaque lot est une transaction courte, de sorte que
+    l'archivage d'un long historique ne bloque pas les écritures des utilisateurs.
+
+    Args:
+        cutoff (date | None): Les créneaux de date strictement antérieure sont archivés (aujourd'hui par défaut).
+        batch_size (int): Nombre maximal de créneaux par lot.
+        progress (callable | None): Appelée après chaque lot avec les totaux courants.
+
+    Returns :
+        dict : Le nombre de créneaux et d'activités archivés, et le nombre de lots.
+    """
+    cutoff = cutoff or cutoff_date()
+    totals = {'slots': 0, 'activities': 0, 'batches': 0}
+    last_id = 0
+    while True:
+        last_id, slots, activities = archive_batch(cutoff, last_id, batch_size)
+        if last_id is None:
+            return totals
+        totals['slots'] += slots
+        totals['activities'] += activities
+        totals['batches'] += 1
+        if progress is not None:
+            progress(totals)
+
+
+def count_past_slots(cutoff=None):
+    """
+    Compte les créneaux et activités qu'archiverait `archive_past_slots`, sans rien modifier.
+    """
+    cutoff = cutoff or cutoff_date()
+    return {
+        'slots': Slot.objects.filter(date__lt=cutoff).count(),
+        'activities': Activity.objects.filter(slot__date__lt=cutoff).count(),
+        'batches': 0,
+    }
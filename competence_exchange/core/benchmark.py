@@ -0,0 +1,877 @@
+import asyncio
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from wsgiref.util import setup_testing_defaults
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.db.models import Count, Q
+from django.db.models.functions import TruncWeek
+from django.db.models.signals import post_save
+from django.template.loader import render_to_string
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import resolve, reverse
+
+from . import events, loadgen, matching, profiles, rows, search, stats, tasks
+from .models import Category, Competence, Slot, Activity, Profile
+
+
+class Route:
+    """
+    Description d'une route mesurée par le banc d'essai.
+
+    Attributes:
+        name (str): Le nom de la route dans core/urls.py.
+        method (str): La méthode HTTP ('get' ou 'post').
+        login (bool): Indique si la requête est faite par un utilisateur connecté.
+        prepare (callable | None): Fonction appelée hors chronométrage avant chaque requête, qui reçoit
+            l'utilisateur du banc d'essai et retourne le couple (arguments d'URL, données POST).
+    """
+
+    def __init__(self, name, method='get', login=True, prepare=None):
+        self.name = name
+        self.method = method
+        self.login = login
+        self.prepare = prepare
+
+
+def _other_user(user):
+    """
+    Retourne un autre utilisateur que celui du banc d'essai.
+    """
+    return User.objects.exclude(pk=user.pk).order_by('pk').first()
+
+
+def _user_competence(user):
+    """
+    Retourne une compétence de l'utilisateur du banc d'essai, en lui en ajoutant une au besoin.
+    """
+    competence = Competence.objects.filter(profiles__user=user).first()
+    if competence is None:
+        competence = Competence.objects.order_by('pk').first()
+        Profile.objects.get(user=user).competences.add(competence)
+    return competence
+
+
+def prepare_delete_slot(user):
+    """
+    Crée le créneau que la requête va supprimer.
+    """
+    slot = Slot.objects.create(date=date.today() + timedelta(days=1), user=user, competence=_user_competence(user))
+    return [slot.pk], None
+
+
+def prepare_add_slot(user):
+    """
+    Construit les données POST d'une demande d'aide.
+    """
+    data = {
+        'date': (date.today() + timedelta(days=7)).isoformat(),
+        'competence': _user_competence(user).pk,
+        'purpose': 'request',
+        'description': "Créneau du banc d'essai",
+    }
+    return [], data
+
+
+def prepare_volunteer(user):
+    """
+    Crée une demande d'aide ouverte d'un autre utilisateur, dans une compétence de l'utilisateur.
+    """
+    competence = _user_competence(user)
+    requester = _other_user(user)
+    slot = Slot.objects.create(date=date.today() + timedelta(days=1), user=requester, competence=competence, purpose='request')
+    activity = Activity.objects.create(description="Demande du banc d'essai", requester=requester, competence_needed=competence, slot=slot)
+    return [activity.pk], None
+
+
+def prepare_contact_info(user):
+    """
+    Crée une demande de l'utilisateur déjà prise par un volontaire.
+    """
+    competence = _user_competence(user)
+    slot = Slot.objects.create(date=date.today() + timedelta(days=1), user=user, competence=competence, purpose='request', is_available=False)
+    activity = Activity.objects.create(
+        description="Demande prise", requester=user, competence_needed=competence, slot=slot, volunteer=_other_user(user)
+    )
+    return [activity.pk], None
+
+
+# Toutes les routes de core/urls.py
+ROUTES = [
+    Route('available_slots', login=False),
+    Route('competence_list', login=False),
+    Route('login', login=False),
+    Route('logout', method='post'),
+    Route('user_competences'),
+    Route('my_slots'),
+    Route('delete_slot', prepare=prepare_delete_slot),
+    Route('add_slot', method='post', prepare=prepare_add_slot),
+    Route('help_requests'),
+    Route('my_requests'),
+    Route('available_help'),
+    Route('contact_info', prepare=prepare_contact_info),
+    Route('volunteer_for_help', prepare=prepare_volunteer),
+    Route('api_categories', login=False),
+    Route('api_competences', login=False),
+    Route('api_slots', login=False),
+    Route('api_activities'),
+]
+
+
+def percentile(values, fraction):
+    """
+    Percentile par interpolation linéaire d'une liste de valeurs.
+    """
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _prepare(client, route, user):
+    """
+    Prépare une requête hors chronométrage (connexion, données) ; retourne l'URL et les données POST.
+    """
+    if route.login:
+        client.force_login(user)
+    else:
+        client.logout()
+    args, data = route.prepare(user) if route.prepare else ([], None)
+    return reverse(route.name, args=args), data or {}
+
+
+def measure_route(route, user, iterations=20, warmup=2):
+    """
+    Mesure une route : latences sur `iterations` requêtes, puis nombre de requêtes SQL et pic mémoire
+    sur une requête supplémentaire instrumentée (l'instrumentation fausserait les latences).
+
+    Returns :
+        dict : Les mesures de la route (latences en millisecondes, mémoire en kilooctets).
+    """
+    client = Client()
+    send = getattr(client, route.method)
+    for _ in range(warmup):
+        send(*_prepare(client, route, user))
+    durations = []
+    for _ in range(iterations):
+        url, data = _prepare(client, route, user)
+        started = time.perf_counter()
+        send(url, data)
+        durations.append((time.perf_counter() - started) * 1000)
+
+    url, data = _prepare(client, route, user)
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as captured:
+            response = send(url, data)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'status': response.status_code,
+        'iterations': iterations,
+        'p50_ms': round(percentile(durations, 0.50), 3),
+        'p95_ms': round(percentile(durations, 0.95), 3),
+        'p99_ms': round(percentile(durations, 0.99), 3),
+        'mean_ms': round(statistics.fmean(durations), 3),
+        'max_ms': round(max(durations), 3),
+        'queries': len(captured),
+        'peak_memory_kb': round(peak / 1024, 1),
+        'response_bytes': len(response.content),
+    }
+
+
+def run(user, iterations=20, route_names=None, dataset=None):
+    """
+    Mesure toutes les routes (ou celles demandées) sur la base courante.
+
+    Args:
+        user (User): L'utilisateur utilisé pour les routes authentifiées.
+        iterations (int): Nombre de requêtes chronométrées par route.
+        route_names (list | None): Les routes à mesurer, toutes par défaut.
+        dataset (dict | None): La description du jeu de données, recopiée dans les résultats.
+
+    Returns :
+        dict : Les résultats, sérialisables en JSON.
+    """
+    routes = [route for route in ROUTES if route_names is None or route.name in route_names]
+    results = {}
+    # Le client de test utilise le nom d'hôte 'testserver'
+    with override_settings(ALLOWED_HOSTS=['*']):
+        for route in routes:
+            results[route.name] = measure_route(route, user, iterations)
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'iterations': iterations,
+            'dataset': dataset or {},
+        },
+        'routes': results,
+    }
+
+
+def compare(previous, current, threshold=0.2):
+    """
+    Compare deux résultats de banc d'essai.
+
+    Une régression est signalée lorsqu'une route fait plus de requêtes SQL, ou lorsque sa latence p95
+    augmente de plus de `threshold` (en proportion).
+
+    Returns :
+        tuple : (lignes du rapport, liste des noms de routes en régression).
+    """
+    lines = [f"{'route':<20} {'p95 avant':>10} {'p95 après':>10} {'écart':>8} {'requêtes':>12}"]
+    regressions = []
+    for name, after in current['routes'].items():
+        before = previous['routes'].get(name)
+        if before is None:
+            lines.append(f"{name:<20} {'-':>10} {after['p95_ms']:>10.2f} {'nouveau':>8} {after['queries']:>12}")
+            continue
+        change = (after['p95_ms'] - before['p95_ms']) / before['p95_ms'] if before['p95_ms'] else 0.0
+        regressed = change > threshold or after['queries'] > before['queries']
+        if regressed:
+            regressions.append(name)
+        lines.append(
+            f"{name:<20} {before['p95_ms']:>10.2f} {after['p95_ms']:>10.2f} {change:>+8.0%} "
+            f"{before['queries']:>5} -> {after['queries']:<4}{' !' if regressed else ''}"
+        )
+    return lines, regressions
+
+
+def synthetic_open_slots(size, competences=200, days=90, owners=None, skew=1.1, seed=0):
+    """
+    Génère en mémoire `size` créneaux ouverts (moitié demandes, moitié offres) au format attendu par
+    `matching.assign`, avec une popularité des compétences suivant une loi de Zipf.
+
+    Returns :
+        tuple : (demandes, offres).
+    """
+    from .loadgen import zipf_weights
+
+    rng = random.Random(seed)
+    owners = owners or max(size // 10, 1)
+    start = date.today()
+    competence_ids = rng.choices(range(competences), zipf_weights(competences, skew), k=size)
+    requests, offers = [], []
+    for index, competence_id in enumerate(competence_ids):
+        row = (index, competence_id, start + timedelta(days=rng.randrange(days)), rng.randrange(owners))
+        (requests if index % 2 else offers).append(row)
+    return requests, offers
+
+
+def measure_matching(size, repeat=3, **options):
+    """
+    Mesure le moteur de correspondance sur `size` créneaux ouverts synthétiques (hors accès à la base).
+
+    Returns :
+        dict : La taille, le nombre de propositions et les durées (meilleure et médiane) en millisecondes.
+    """
+    requests, offers = synthetic_open_slots(size, **options)
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        pairs = matching.assign(requests, offers)
+        durations.append((time.perf_counter() - started) * 1000)
+    return {
+        'open_slots': size,
+        'requests': len(requests),
+        'offers': len(offers),
+        'proposals': len(pairs),
+        'best_ms': round(min(durations), 1),
+        'median_ms': round(statistics.median(durations), 1),
+    }
+
+
+# Vues asynchrones comparées entre les points d'entrée WSGI et ASGI
+ASYNC_ROUTES = ['available_slots', 'competence_list', 'help_requests', 'available_help']
+
+
+def session_cookie(user):
+    """
+    Ouvre une session pour l'utilisateur et retourne l'en-tête Cookie correspondant.
+    """
+    client = Client()
+    client.force_login(user)
+    return f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+
+def _wsgi_get(application, path, cookie):
+    """
+    Envoie une requête GET à l'application WSGI, comme le ferait un serveur, et retourne le code HTTP.
+    """
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'HTTP_HOST': 'testserver', 'HTTP_COOKIE': cookie}
+    setup_testing_defaults(environ)
+    statuses = []
+    body = application(environ, lambda status, headers, exc_info=None: statuses.append(int(status.split()[0])))
+    try:
+        b''.join(body)
+    finally:
+        body.close()
+    return statuses[0]
+
+
+async def _asgi_get(application, path, cookie):
+    """
+    Envoie une requête GET à l'application ASGI, comme le ferait un serveur, et retourne le code HTTP.
+    """
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+        'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+    }
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Le client ne se déconnecte jamais avant la fin de la réponse
+        await asyncio.Event().wait()
+
+    statuses = []
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    await application(scope, receive, send)
+    return statuses[0]
+
+
+def _summary(entry_point, concurrency, statuses, durations, elapsed):
+    """
+    Résume une série de requêtes concurrentes : débit, latences et erreurs.
+    """
+    return {
+        'entry_point': entry_point,
+        'concurrency': concurrency,
+        'requests': len(statuses),
+        'errors': sum(1 for status in statuses if status != 200),
+        'throughput_rps': round(len(statuses) / elapsed, 1),
+        'p50_ms': round(percentile(durations, 0.50), 2),
+        'p95_ms': round(percentile(durations, 0.95), 2),
+    }
+
+
+def measure_wsgi(path, cookie='', concurrency=10, requests=200):
+    """
+    Mesure le point d'entrée WSGI : `concurrency` threads, comme un serveur WSGI multi-threadé.
+
+    Returns :
+        dict : Le débit (requêtes par seconde), les latences en millisecondes et le nombre d'erreurs.
+    """
+    application = get_wsgi_application()
+    durations = []
+
+    def send(_):
+        started = time.perf_counter()
+        status = _wsgi_get(application, path, cookie)
+        durations.append((time.perf_counter() - started) * 1000)
+        return status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        statuses = list(pool.map(send, range(requests)))
+    return _summary('wsgi', concurrency, statuses, durations, time.perf_counter() - started)
+
+
+def measure_asgi(path, cookie='', concurrency=10, requests=200):
+    """
+    Mesure le point d'entrée ASGI : au plus `concurrency` requêtes simultanées sur une boucle d'événements.
+
+    Returns :
+        dict : Le débit (requêtes par seconde), les latences en millisecondes et le nombre d'erreurs.
+    """
+    application = get_asgi_application()
+    durations = []
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send():
+            async with semaphore:
+                started = time.perf_counter()
+                status = await _asgi_get(application, path, cookie)
+                durations.append((time.perf_counter() - started) * 1000)
+                return status
+
+        return await asyncio.gather(*(send() for _ in range(requests)))
+
+    started = time.perf_counter()
+    statuses = asyncio.run(main())
+    return _summary('asgi', concurrency, statuses, durations, time.perf_counter() - started)
+
+
+def compare_entry_points(user, route_names=None, concurrency_levels=(1, 10, 100), requests=200):
+    """
+    Compare le débit des points d'entrée WSGI et ASGI sur les vues asynchrones, à plusieurs niveaux de concurrence.
+
+    La base doit être accessible depuis d'autres threads (fichier SQLite ou serveur), les données validées.
+
+    Returns :
+        list : Une mesure par route, niveau de concurrence et point d'entrée.
+    """
+    cookie = session_cookie(user)
+    results = []
+    with override_settings(ALLOWED_HOSTS=['*']):
+        for name in route_names or ASYNC_ROUTES:
+            path = reverse(name)
+            for concurrency in concurrency_levels:
+                for measure in (measure_wsgi, measure_asgi):
+                    result = measure(path, cookie, concurrency, requests)
+                    result['route'] = name
+                    results.append(result)
+    return results
+
+
+# Hacheur rapide pour les mesures de connexion : le hachage PBKDF2 (des centaines de millisecondes)
+# masquerait les écritures en base que ces mesures comparent
+LOGIN_PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+def _legacy_profile_save(sender, instance, created, **kwargs):
+    """
+    Ancien comportement du signal de profil, rétabli le temps d'une mesure de comparaison : le profil
+    est relu et réenregistré à chaque enregistrement de l'utilisateur, y compris à chaque connexion.
+    """
+    if not created:
+        instance.profile.save()
+
+
+def measure_logins(users=200, legacy=False, prefix='bench-login'):
+    """
+    Mesure le débit des connexions : authentification, création de la session et mise à jour de `last_login`,
+    pour `users` utilisateurs différents se connectant l'un après l'autre.
+
+    Args:
+        users (int): Nombre de connexions (un utilisateur créé pour chacune, puis supprimé).
+        legacy (bool): Rétablir l'ancien enregistrement du profil à chaque enregistrement de l'utilisateur.
+        prefix (str): Préfixe des noms des utilisateurs créés.
+
+    Returns :
+        dict : Le débit (connexions par seconde), les latences en millisecondes, et le nombre de requêtes SQL
+        et d'écritures par connexion.
+    """
+    with override_settings(PASSWORD_HASHERS=LOGIN_PASSWORD_HASHERS):
+        password = make_password(loadgen.PASSWORD)
+        accounts = profiles.bulk_create_users([User(username=f"{prefix}-{index}", password=password) for index in range(users)])
+        if legacy:
+            post_save.connect(_legacy_profile_save, sender=User, dispatch_uid='benchmark-legacy-profile-save')
+        try:
+            clients = [Client() for _ in accounts]
+            durations = []
+            statements = []
+
+            def count(execute, sql, params, many, context):
+                statements.append(sql.lstrip().split(None, 1)[0].upper())
+                return execute(sql, params, many, context)
+
+            # Compte les requêtes sans les journaliser (CaptureQueriesContext est limité à 9000 requêtes)
+            with connection.execute_wrapper(count):
+                started = time.perf_counter()
+                for client, account in zip(clients, accounts):
+                    login_started = time.perf_counter()
+                    client.login(username=account.username, password=loadgen.PASSWORD)
+                    durations.append((time.perf_counter() - login_started) * 1000)
+                elapsed = time.perf_counter() - started
+        finally:
+            post_save.disconnect(sender=User, dispatch_uid='benchmark-legacy-profile-save')
+            User.objects.filter(pk__in=[account.pk for account in accounts]).delete()
+
+    writes = sum(1 for statement in statements if statement in ('INSERT', 'UPDATE', 'DELETE'))
+    return {
+        'mode': 'legacy' if legacy else 'current',
+        'logins': len(accounts),
+        'throughput_lps': round(len(accounts) / elapsed, 1),
+        'p50_ms': round(percentile(durations, 0.50), 3),
+        'p95_ms': round(percentile(durations, 0.95), 3),
+        'queries_per_login': round(len(statements) / len(accounts), 2),
+        'writes_per_login': round(writes / len(accounts), 2),
+    }
+
+
+# Vocabulaire des descriptions synthétiques de la mesure de recherche (avec accents, comme les vraies données)
+SEARCH_VOCABULARY = (
+    "réparer remplacer installer monter démonter peindre poser changer nettoyer déménager tondre tailler "
+    "arroser cuisiner coudre tricoter réviser traduire expliquer apprendre accompagner garder promener "
+    "robinet fuite évier chaudière radiateur prise électricité lampe interrupteur étagère meuble armoire "
+    "porte fenêtre volet serrure vélo voiture pneu frein chaîne jardin haie pelouse potager arbre "
+    "ordinateur imprimante téléphone logiciel réseau wifi mathématiques français anglais espagnol piano "
+    "guitare chant dessin photographie couture ourlet pantalon robe gâteau repas pâtisserie déménagement "
+    "carton cuisine salle bain plafond mur papier carrelage parquet plomberie menuiserie maçonnerie "
+    "chien chat enfants devoirs courrier démarches administratives impôts dossier lettre"
+).split()
+
+
+def populate_search_index(size, seed=0, batch_size=10_000):
+    """
+    Remplit l'index des demandes (core_search_activity) de `size` descriptions synthétiques, sans créer
+    les activités correspondantes : l'autocomplétion ne lit que l'index.
+    """
+    rng = random.Random(seed)
+    weights = loadgen.zipf_weights(len(SEARCH_VOCABULARY), 1.0)
+    with connection.cursor() as cursor:
+        # Les documents synthétiques suivent ceux des activités existantes
+        cursor.execute("SELECT COALESCE(MAX(rowid), 0) FROM core_search_activity")
+        first = cursor.fetchone()[0] + 1
+        for start in range(first, first + size, batch_size):
+            rows = []
+            for rowid in range(start, min(start + batch_size, first + size)):
+                words = rng.choices(SEARCH_VOCABULARY, weights, k=rng.randint(4, 12))
+                rows.append((rowid, words[0], words[1], ' '.join(words).capitalize()))
+            cursor.executemany(
+                "INSERT INTO core_search_activity (rowid, competence, category, description) VALUES (%s, %s, %s, %s)", rows,
+            )
+
+
+def measure_search(size, queries=500, seed=0):
+    """
+    Mesure l'autocomplétion (`core.search.suggest`) et la recherche classée par bm25 sur un index de
+    `size` demandes synthétiques : préfixes de 2 à 6 lettres de mots du vocabulaire, sans accents,
+    comme les saisirait un utilisateur pressé.
+
+    Returns :
+        dict : Les latences (p50, p95, max) en millisecondes de l'autocomplétion et de la recherche classée.
+    """
+    started = time.perf_counter()
+    populate_search_index(size, seed)
+    populated_s = time.perf_counter() - started
+    rng = random.Random(seed + 1)
+    prefixes = []
+    for _ in range(queries):
+        word = unicodedata.normalize('NFKD', rng.choice(SEARCH_VOCABULARY)).encode('ascii', 'ignore').decode()
+        prefixes.append(word[:rng.randint(2, 6)])
+
+    suggest_ms, ranked_ms = [], []
+    for prefix in prefixes:
+        started = time.perf_counter()
+        search.suggest(prefix)
+        suggest_ms.append((time.perf_counter() - started) * 1000)
+    with connection.cursor() as cursor:
+        for prefix in prefixes[:max(queries // 10, 1)]:
+            started = time.perf_counter()
+            cursor.execute(
+                "SELECT rowid FROM core_search_activity WHERE core_search_activity MATCH %s ORDER BY rank LIMIT 20",
+                [search.match_expression([prefix], prefix=True)],
+            )
+            cursor.fetchall()
+            ranked_ms.append((time.perf_counter() - started) * 1000)
+    return {
+        'activities': size,
+        'populate_s': round(populated_s, 1),
+        'suggest_p50_ms': round(percentile(suggest_ms, 0.50), 3),
+        'suggest_p95_ms': round(percentile(suggest_ms, 0.95), 3),
+        'suggest_max_ms': round(max(suggest_ms), 3),
+        'ranked_p50_ms': round(percentile(ranked_ms, 0.50), 3),
+        'ranked_p95_ms': round(percentile(ranked_ms, 0.95), 3),
+    }
+
+
+def synthetic_rows(size, competences=50, days=90):
+    """
+    Construit, sans base de données, des créneaux et des activités non enregistrés dont les relations
+    sont déjà renseignées, comme après `with_related()` et `with_first_activity()`.
+
+    Returns :
+        tuple : (utilisateur de la requête, créneaux, activités).
+    """
+    user, other = User(pk=1, username="visiteur"), User(pk=2, username="demandeur")
+    competence_objects = [Competence(pk=pk, name=f"Compétence {pk}") for pk in range(1, competences + 1)]
+    slots, activities = [], []
+    for index in range(size):
+        competence = competence_objects[index % competences]
+        slot = Slot(
+            pk=index + 1, date=date.today() + timedelta(days=index % days), user=other, competence=competence,
+            purpose='aid' if index % 2 else 'request',
+        )
+        activity = Activity(
+            pk=index + 1, description=f"Demande d'aide n° {index}", requester=other, competence_needed=competence,
+            slot=slot, volunteer=user if index % 7 == 0 else None,
+        )
+        slot.prefetched_activities = [activity]
+        slots.append(slot)
+        activities.append(activity)
+    return user, slots, activities
+
+
+# Pages de liste mesurées : (route, gabarit, variable du gabarit, construction des lignes)
+TEMPLATE_PAGES = (
+    ('available_slots', 'core/available_slots.html', 'slots', lambda user, slots, activities: rows.slot_rows(slots, user)),
+    ('my_slots', 'core/my_slots.html', 'slots', lambda user, slots, activities: rows.slot_rows(slots, user)),
+    ('available_help', 'core/available_help.html', 'available_slots', lambda user, slots, activities: rows.offer_rows(slots)),
+    ('help_requests', 'core/help_requests.html', 'help_requests',
+     lambda user, slots, activities: rows.request_rows(activities, user, {activity.competence_needed_id for activity in activities})),
+    ('my_requests', 'core/my_requests.html', 'user_requests', lambda user, slots, activities: rows.request_rows(activities, user)),
+)
+
+
+def measure_templates(sizes=(1000, 10000), repeat=3):
+    """
+    Micro-benchmark du rendu des gabarits de liste : pour chaque page et chaque taille, durée de la
+    préparation des lignes (`core.rows`) et du rendu du gabarit (avec base.html et les processeurs de
+    contexte), meilleure de `repeat` mesures. Les objets sont construits en mémoire : seul le rendu
+    est mesuré, sans requête SQL.
+
+    Args:
+        sizes (tuple): Les nombres de lignes mesurés.
+        repeat (int): Nombre de mesures par page et par taille.
+
+    Returns :
+        list : Un dictionnaire `{'route', 'rows', 'build_ms', 'render_ms', 'per_row_us'}` par page et par taille.
+    """
+    factory = RequestFactory()
+    results = []
+    for size in sizes:
+        user, slots, activities = synthetic_rows(size)
+        for route, template_name, variable, build in TEMPLATE_PAGES:
+            path = reverse(route)
+            request = factory.get(path)
+            request.user = user
+            request.resolver_match = resolve(path)
+            # Rendu à blanc : compilation du gabarit (chargeur en cache) hors mesure
+            render_to_string(template_name, {variable: build(user, slots[:1], activities[:1])}, request)
+            build_ms, render_ms = [], []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                page_rows = build(user, slots, activities)
+                built = time.perf_counter()
+                render_to_string(template_name, {variable: page_rows}, request)
+                build_ms.append((built - started) * 1000)
+                render_ms.append((time.perf_counter() - built) * 1000)
+            results.append({
+                'route': route,
+                'rows': size,
+                'build_ms': round(min(build_ms), 2),
+                'render_ms': round(min(render_ms), 2),
+                'per_row_us': round((min(build_ms) + min(render_ms)) * 1000 / size, 2),
+            })
+    return results
+
+
+@tasks.task
+def benchmark_task(sleep_ms=0):
+    """
+    Tâche de la mesure de la file : attend `sleep_ms` millisecondes (simulation d'un appel externe,
+    comme l'envoi d'un courriel), sans accès à la base.
+    """
+    if sleep_ms:
+        time.sleep(sleep_ms / 1000)
+
+
+def measure_task_queue(count=2000, threads=4, sleep_ms=0):
+    """
+    Mesure le débit de la file de tâches : insertion de `count` tâches (une transaction par tâche, comme
+    depuis autant de requêtes), puis exécution par un worker de `threads` threads jusqu'à épuisement.
+
+    Returns :
+        dict : Le coût d'une insertion (ms) et le débit du worker (tâches par seconde).
+    """
+    with override_settings(TASKS_EAGER=False):
+        started = time.perf_counter()
+        for _ in range(count):
+            tasks.enqueue(benchmark_task, {'sleep_ms': sleep_ms})
+        enqueue_s = time.perf_counter() - started
+    tasks.metrics.reset()
+    started = time.perf_counter()
+    processed = tasks.Worker(threads=threads, poll_interval=0.1).run(until_empty=True)
+    elapsed = time.perf_counter() - started
+    snapshot = tasks.metrics.snapshot()['tasks'].get(benchmark_task.task_name, {})
+    return {
+        'tasks': processed,
+        'threads': threads,
+        'sleep_ms': sleep_ms,
+        'enqueue_ms': round(enqueue_s * 1000 / count, 3),
+        'throughput_per_s': round(processed / elapsed, 1),
+        'p95_ms': snapshot.get('p95_ms', 0.0),
+    }
+
+
+def measure_slot_events(connections=1000, events_count=50, interval_ms=20):
+    """
+    Test de charge du flux d'événements des créneaux : `connections` clients restent connectés à
+    l'application ASGI (appelée comme par un serveur, sans réseau), puis `events_count` événements sont
+    publiés depuis un autre thread, comme par les signaux d'une vue synchrone, un toutes les
+    `interval_ms` millisecondes.
+
+    Un diffuseur dédié est utilisé : les événements de la mesure n'atteignent pas les autres clients.
+
+    Returns :
+        dict : Le temps d'établissement des connexions, la mémoire par connexion (Ko), le nombre
+        d'événements reçus et perdus, et la latence entre publication et réception (ms).
+    """
+    broker = events.Broker()
+    application = events.EventStreamApplication(get_asgi_application(), broker=broker)
+    path = reverse('slot_events')
+    published = {}
+    latencies = []
+    resets = []
+
+    async def client(disconnected):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+            'headers': [(b'host', b'testserver'), (b'accept', b'text/event-stream')],
+            'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+        }
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] != 'http.response.body':
+                return
+            now = time.perf_counter()
+            for line in message['body'].split(b'\n'):
+                if line.startswith(b'id: '):
+                    latencies.append((now - published[int(line[4:])]) * 1000)
+                elif line == b'event: reset':
+                    resets.append(now)
+
+        await application(scope, receive, send)
+
+    def publish_all():
+        # Le diffuseur est dédié à la mesure : les identifiants des événements sont 1, 2, 3…
+        for event_id in range(1, events_count + 1):
+            published[event_id] = time.perf_counter()
+            broker.publish(events.SLOT_OPENED, {'slot': event_id, 'activity': None})
+            time.sleep(interval_ms / 1000)
+
+    async def main():
+        disconnected = asyncio.Event()
+        tracemalloc.start()
+        started = time.perf_counter()
+        clients = [asyncio.ensure_future(client(disconnected)) for _ in range(connections)]
+        while broker.subscriber_count() < connections:
+            await asyncio.sleep(0.01)
+        connect_s = time.perf_counter() - started
+        memory, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        await asyncio.get_running_loop().run_in_executor(None, publish_all)
+        expected = connections * events_count
+        deadline = time.perf_counter() + 10
+        while len(latencies) + len(resets) < expected and time.perf_counter() < deadline and not resets:
+            await asyncio.sleep(0.01)
+        disconnected.set()
+        await asyncio.gather(*clients)
+        return connect_s, memory, expected
+
+    connect_s, memory, expected = asyncio.run(main())
+    return {
+        'connections': connections,
+        'events': events_count,
+        'connect_s': round(connect_s, 2),
+        'memory_kb_per_connection': round(memory / 1024 / connections, 2),
+        'received': len(latencies),
+        'lost': expected - len(latencies),
+        'subscribers_left': broker.subscriber_count(),
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'max_ms': round(max(latencies, default=0.0), 2),
+    }
+
+
+def populate_slots(size, competences=500, categories=20, days=180, seed=0, batch_size=10_000):
+    """
+    Insère `size` créneaux synthétiques (offres et demandes, dont un quart déjà pris) répartis sur
+    `days` jours à partir d'un mois dans le passé, sans activités ni signaux, puis recalcule les
+    statistiques de disponibilité.
+    """
+    rng = random.Random(seed)
+    owner = User.objects.create_user(username=f"bench-stats-{seed}")
+    category_objects = Category.objects.bulk_create([Category(name=f"Catégorie stats {index}") for index in range(categories)])
+    competence_objects = Competence.objects.bulk_create([
+        Competence(name=f"Compétence stats {index}", category=category_objects[index % categories])
+        for index in range(competences)
+    ])
+    weights = loadgen.zipf_weights(competences, 1.1)
+    start = date.today() - timedelta(days=30)
+    for offset in range(0, size, batch_size):
+        Slot.objects.bulk_create([
+            Slot(
+                date=start + timedelta(days=rng.randrange(days)), user=owner,
+                competence=rng.choices(competence_objects, weights)[0],
+                purpose='request' if rng.random() < 0.5 else 'aid', is_available=rng.random() >= 0.25,
+            )
+            for _ in range(min(batch_size, size - offset))
+        ])
+    return competence_objects
+
+
+def measure_stats(size, repeat=5, seed=0):
+    """
+    Compare, sur `size` créneaux synthétiques, le calcul de l'offre et de la demande ouvertes des douze
+    prochaines semaines par un GROUP BY sur les créneaux et leur lecture dans la table des statistiques,
+    par compétence et par catégorie ; mesure aussi la reconstruction complète et la mise à jour
+    incrémentale d'un créneau.
+
+    Returns :
+        dict : Les durées en millisecondes (meilleure de `repeat` mesures), et celle de la reconstruction en secondes.
+    """
+    competence_objects = populate_slots(size, seed=seed)
+    started = time.perf_counter()
+    cells = stats.rebuild(batch_size=10_000)
+    rebuild_s = time.perf_counter() - started
+
+    week = stats.current_week()
+    open_slots = Slot.objects.filter(
+        is_available=True, date__gte=week, date__lt=week + timedelta(weeks=stats.WEEKS_SHOWN),
+    ).annotate(week=TruncWeek('date'))
+
+    def best(function):
+        durations = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            durations.append((time.perf_counter() - started) * 1000)
+        return round(min(durations), 2)
+
+    def group_by(key, name):
+        return lambda: list(open_slots.values(key, name, 'week').annotate(
+            offers=Count('id', filter=Q(purpose='aid')), requests=Count('id', filter=Q(purpose='request')),
+        ).order_by())
+
+    rng = random.Random(seed + 1)
+    changes = [
+        stats.deltas([(rng.choice(competence_objects).pk, week + timedelta(days=rng.randrange(84)), 'aid')])
+        for _ in range(200)
+    ]
+    started = time.perf_counter()
+    for change in changes:
+        stats.apply(change)
+    apply_ms = (time.perf_counter() - started) * 1000 / len(changes)
+    return {
+        'slots': size,
+        'cells': cells,
+        'rebuild_s': round(rebuild_s, 2),
+        'group_by_competence_ms': best(group_by('competence_id', 'competence__name')),
+        'stats_competence_ms': best(lambda: stats.weekly('competence')),
+        'group_by_category_ms': best(group_by('competence__category_id', 'competence__category__name')),
+        'stats_category_ms': best(lambda: stats.weekly('category')),
+        'apply_ms': round(apply_ms, 3),
+    }
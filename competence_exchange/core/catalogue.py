@@ -0,0 +1,193 @@
+from itertools import groupby
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F, Prefetch, Q, Sum
+from django.db.models.functions import Coalesce
+
+from . import stats
+from .models import Category, Competence
+
+# Clé du numéro de version du catalogue : toute modification d'une catégorie ou d'une
+# compétence l'incrémente, ce qui invalide d'un coup les données et les fragments mis en cache.
+VERSION_KEY = 'core:catalogue:version'
+DATA_KEY = 'core:catalogue:data:{version}'
+
+# Compétences de toutes les catégories, y compris sans catégorie, pour les listes de choix
+CHOICES_KEY = 'core:catalogue:choices:{version}'
+
+# Catalogue avec l'offre et la demande ouvertes par compétence (page competence_list) : il dépend aussi
+# des créneaux, donc de leur compteur de modifications et de la semaine en cours
+STATS_KEY = 'core:catalogue:stats:{version}:{slots}:{week}'
+STATS_TIMEOUT = 24 * 3600
+
+
+def get_version():
+    """
+    Retourne le numéro de version courant du catalogue.
+
+    Returns :
+        int : La version, initialisée à 1 si elle n'existe pas encore dans le cache.
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def invalidate():
+    """
+    Invalide le catalogue mis en cache en incrémentant sa version.
+    """
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, 1, timeout=None)
+
+
+def _catalogue_queryset():
+    """
+    Catégories triées par nom, avec leurs compétences préchargées.
+
+    Lues sur la base principale même depuis une vue routée vers le réplica : le catalogue est mis en cache
+    sous la version courante, qu'une copie en retard ne doit pas associer à d'anciennes données.
+    """
+    return Category.objects.using(DEFAULT_DB_ALIAS).prefetch_related('competences').order_by('name')
+
+
+def _stats_queryset(week):
+    """
+    Comme `_catalogue_queryset`, avec chaque compétence annotée du nombre de créneaux d'aide et de demande
+    ouverts à partir de la semaine `week`, lus dans la table des statistiques (AvailabilityStat) par la
+    même requête que les compétences.
+    """
+    current = Q(availability_stats__week__gte=week)
+    competences = Competence.objects.annotate(
+        open_offers=Coalesce(Sum('availability_stats__open_offers', filter=current), 0),
+        open_requests=Coalesce(Sum('availability_stats__open_requests', filter=current), 0),
+    )
+    return Category.objects.using(DEFAULT_DB_ALIAS).prefetch_related(
+        Prefetch('competences', queryset=competences)
+    ).order_by('name')
+
+
+def _serialize(categories, fields=()):
+    """
+    Convertit les catégories préchargées en structure sérialisable mise en cache.
+
+    Args:
+        fields (tuple): Les attributs supplémentaires recopiés pour chaque compétence.
+    """
+    return [
+        {
+            'id': category.id,
+            'name': category.name,
+            'competences': [
+                {'id': competence.id, 'name': competence.name, **{field: getattr(competence, field) for field in fields}}
+                for competence in sorted(category.competences.all(), key=lambda competence: competence.name)
+            ],
+        }
+        for category in categories
+    ]
+
+
+def get_catalogue():
+    """
+    Retourne les compétences regroupées par catégorie, depuis le cache si possible.
+
+    Returns :
+        list : Une liste de dictionnaires `{'id', 'name', 'competences': [{'id', 'name'}, ...]}`,
+        triée par nom de catégorie puis de compétence.
+    """
+    key = DATA_KEY.format(version=get_version())
+    catalogue = cache.get(key)
+    if catalogue is None:
+        catalogue = _serialize(_catalogue_queryset())
+        cache.set(key, catalogue, timeout=None)
+    return catalogue
+
+
+def get_choices():
+    """
+    Retourne toutes les compétences regroupées par catégorie pour les listes de choix (page
+    user_competences), depuis le cache si possible, sous la même version que le catalogue.
+
+    Contrairement à `get_catalogue`, les compétences sans catégorie y figurent, dans un dernier groupe
+    « Sans catégorie » d'identifiant None. La structure est calculée en une seule requête.
+
+    Returns :
+        list : Une liste de dictionnaires `{'id', 'name', 'competences': [{'id', 'name'}, ...]}`.
+    """
+    key = CHOICES_KEY.format(version=get_version())
+    choices = cache.get(key)
+    if choices is None:
+        competences = Competence.objects.using(DEFAULT_DB_ALIAS).values_list(
+            'id', 'name', 'category_id', 'category__name',
+        ).order_by(F('category__name').asc(nulls_last=True), 'category_id', 'name')
+        choices = [
+            {
+                'id': category_id,
+                'name': category_name or "Sans catégorie",
+                'competences': [{'id': pk, 'name': name} for pk, name, *_ in rows],
+            }
+            for (category_id, category_name), rows in groupby(competences, key=lambda row: tuple(row[2:]))
+        ]
+        cache.set(key, choices, timeout=None)
+    return choices
+
+
+def choice_ids(choices):
+    """
+    Retourne l'ensemble des identifiants des compétences d'une structure renvoyée par `get_choices`.
+    """
+    return {competence['id'] for group in choices for competence in group['competences']}
+
+
+async def aget_version():
+    """
+    Variante asynchrone de `get_version`.
+    """
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, 1, timeout=None)
+        version = await cache.aget(VERSION_KEY, 1)
+    return version
+
+
+async def aget_catalogue(version=None):
+    """
+    Variante asynchrone de `get_catalogue`, pour les vues asynchrones.
+
+    Args:
+        version (int | None): La version du catalogue si elle vient d'être lue, pour éviter une lecture du cache.
+    """
+    key = DATA_KEY.format(version=version or await aget_version())
+    catalogue = await cache.aget(key)
+    if catalogue is None:
+        catalogue = _serialize([category async for category in _catalogue_queryset()])
+        await cache.aset(key, catalogue, timeout=None)
+    return catalogue
+
+
+async def aget_catalogue_with_stats(version, slot_version):
+    """
+    Variante de `aget_catalogue` dont chaque compétence porte aussi `open_offers` et `open_requests`,
+    le nombre de créneaux ouverts à partir de la semaine en cours.
+
+    Les compteurs sont lus par la requête des compétences, en jointure sur la table des statistiques :
+    la page ne fait pas plus de requêtes qu'avec le seul catalogue, et aucune lorsque la structure est
+    en cache sous les versions courantes du catalogue et des créneaux.
+
+    Args:
+        version (int): La version du catalogue.
+        slot_version (int): Le compteur de modifications des créneaux (voir `core.versions`).
+    """
+    week = stats.current_week()
+    key = STATS_KEY.format(version=version, slots=slot_version, week=week.isoformat())
+    catalogue = await cache.aget(key)
+    if catalogue is None:
+        categories = [category async for category in _stats_queryset(week)]
+        catalogue = _serialize(categories, fields=('open_offers', 'open_requests'))
+        await cache.aset(key, catalogue, timeout=STATS_TIMEOUT)
+    return catalogue
@@ -0,0 +1,54 @@
+from functools import lru_cache
+
+from django.urls import get_script_prefix, reverse
+
+# Liens de la barre de navigation : (route, libellé, visibilité, mis en évidence sur la page courante).
+# Visibilité : 'all' pour tous, 'user' pour un utilisateur connecté, 'anonymous' pour un visiteur.
+NAVIGATION = (
+    ('available_slots', "Créneaux disponibles", 'all', True),
+    ('competence_list', "Liste des compétences", 'all', True),
+    ('help_requests', "Demandes d'aide", 'all', True),
+    ('search', "Recherche", 'all', True),
+    ('user_competences', "Mes compétences", 'user', True),
+    ('my_slots', "Mes créneaux", 'user', True),
+    ('add_slot', "Ajouter un créneau", 'user', True),
+    ('logout', "Déconnexion", 'user', False),
+    ('login', "Connexion", 'anonymous', False),
+)
+
+
+@lru_cache(maxsize=None)
+def _navigation_links(script_prefix, authenticated):
+    """
+    Inverse une fois par préfixe d'URL et par état de connexion les URL de la barre de navigation.
+
+    Returns :
+        tuple : Les liens visibles `(route, URL, libellé, mis en évidence)`.
+    """
+    hidden = 'anonymous' if authenticated else 'user'
+    return tuple(
+        (url_name, reverse(url_name), label, highlight)
+        for url_name, label, visibility, highlight in NAVIGATION if visibility != hidden
+    )
+
+
+def navigation(request):
+    """
+    Processeur de contexte de la barre de navigation de base.html : les liens visibles et celui de la
+    page courante sont calculés une fois par requête, au lieu d'une balise `{% url %}` et d'une
+    comparaison de `request.resolver_match.url_name` par lien dans le gabarit.
+
+    Args:
+        request (HttpRequest): La requête HTTP en cours de rendu.
+
+    Returns :
+        dict : `nav_links`, une liste de dictionnaires `{'url', 'label', 'active'}`.
+    """
+    current = request.resolver_match.url_name if request.resolver_match else None
+    links = _navigation_links(get_script_prefix(), request.user.is_authenticated)
+    return {
+        'nav_links': [
+            {'url': url, 'label': label, 'active': highlight and url_name == current}
+            for url_name, url, label, highlight in links
+        ],
+    }
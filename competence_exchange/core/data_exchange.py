@@ -0,0 +1,218 @@
+import csv
+import json
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import catalogue, match_index, stats, versions
+from .models import Category, Competence, Slot, Activity
+
+FORMATS = ('csv', 'jsonl')
+
+
+class DataImportError(ValueError):
+    """
+    Exception levée lorsqu'une ligne importée est invalide.
+    """
+
+
+class ModelSpec:
+    """
+    Description de l'échange de données d'un modèle : colonnes, clé d'upsert et références.
+
+    Attributes:
+        model (Model): Le modèle importé ou exporté.
+        columns (list): Les colonnes du fichier, dans l'ordre.
+        key (str): La colonne unique servant à l'upsert ('name' ou 'id').
+        references (dict): Pour chaque colonne de clé étrangère, le couple (modèle cible, champ de recherche).
+    """
+
+    def __init__(self, model, columns, key, references=None):
+        self.model = model
+        self.columns = columns
+        self.key = key
+        self.references = references or {}
+
+    def export_paths(self):
+        """
+        Chemins `values_list` correspondant aux colonnes (clés étrangères exportées par leur clé naturelle).
+        """
+        return [
+            f"{column}__{self.references[column][1]}" if column in self.references else column
+            for column in self.columns
+        ]
+
+    def field_name(self, column):
+        """
+        Nom de l'attribut du modèle alimenté par une colonne.
+        """
+        return f"{column}_id" if column in self.references else column
+
+
+SPECS = {
+    'category': ModelSpec(Category, ['name'], key='name'),
+    'competence': ModelSpec(Competence, ['name', 'category'], key='name', references={'category': (Category, 'name')}),
+    'slot': ModelSpec(
+        Slot, ['id', 'date', 'user', 'competence', 'is_available', 'purpose'], key='id',
+        references={'user': (User, 'username'), 'competence': (Competence, 'name')},
+    ),
+    'activity': ModelSpec(
+        Activity, ['id', 'description', 'requester', 'competence_needed', 'slot', 'volunteer'], key='id',
+        references={
+            'requester': (User, 'username'),
+            'competence_needed': (Competence, 'name'),
+            'slot': (Slot, 'id'),
+            'volunteer': (User, 'username'),
+        },
+    ),
+}
+
+
+def _serialize(value):
+    """
+    Convertit une valeur de la base en valeur JSON.
+    """
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def export_rows(spec, stream, fmt, chunk_size=2000):
+    """
+    Écrit toutes les lignes d'un modèle dans un flux, sans charger la table en mémoire.
+
+    Args:
+        spec (ModelSpec): Le modèle à exporter.
+        stream (file): Le flux texte de sortie.
+        fmt (str): 'csv' ou 'jsonl'.
+        chunk_size (int): Nombre de lignes lues par aller-retour avec la base.
+
+    Returns :
+        int : Le nombre de lignes exportées.
+    """
+    rows = spec.model.objects.order_by('pk').values_list(*spec.export_paths()).iterator(chunk_size=chunk_size)
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(spec.columns)
+        for row in rows:
+            writer.writerow(['' if value is None else _serialize(value) for value in row])
+            count += 1
+    else:
+        for row in rows:
+            # Une seule écriture par ligne : `OutputWrapper` (sortie d'une commande) complète chaque écriture d'un saut de ligne
+            stream.write(json.dumps(dict(zip(spec.columns, map(_serialize, row))), ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def read_rows(stream, fmt):
+    """
+    Lit les lignes d'un flux CSV ou JSONL une à une, sous forme de dictionnaires.
+    """
+    if fmt == 'csv':
+        for row in csv.DictReader(stream):
+            yield {column: (value if value != '' else None) for column, value in row.items()}
+    else:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _resolve_references(spec, rows):
+    """
+    Résout en une requête par référence les clés naturelles d'un lot de lignes en identifiants.
+    """
+    resolved = {}
+    for column, (model, lookup) in spec.references.items():
+        values = {row.get(column) for row in rows} - {None}
+        if lookup == 'id':
+            values = {int(value) for value in values}
+        resolved[column] = dict(model.objects.filter(**{f'{lookup}__in': values}).values_list(lookup, 'pk'))
+    return resolved
+
+
+def _build_instances(spec, rows, line_number):
+    """
+    Construit les instances non enregistrées d'un lot de lignes.
+    """
+    resolved = _resolve_references(spec, rows)
+    instances = []
+    for offset, row in enumerate(rows):
+        values = {}
+        try:
+            for column in spec.columns:
+                value = row.get(column)
+                if column in spec.references:
+                    if value is not None:
+                        key = int(value) if spec.references[column][1] == 'id' else value
+                        if key not in resolved[column]:
+                            raise ValidationError(f"{column} inconnu : « {value} »")
+                        value = resolved[column][key]
+                elif value is not None or column == 'id':
+                    value = spec.model._meta.get_field(column).to_python(value)
+                values[spec.field_name(column)] = value
+            instance = spec.model(**values)
+            instance.clean_fields(exclude=list(spec.references))
+        except (ValidationError, ValueError, TypeError) as error:
+            messages = error.messages if isinstance(error, ValidationError) else [str(error)]
+            raise DataImportError(f"Ligne {line_number + offset} : {' ; '.join(messages)}") from error
+        instances.append(instance)
+    return instances
+
+
+def import_rows(spec, rows, batch_size=1000, reindex=True):
+    """
+    Importe des lignes par lots, avec un upsert par lot sur la clé du modèle.
+
+    Chaque lot est inséré en une requête `INSERT ... ON CONFLICT DO UPDATE` dans une transaction,
+    de sorte que la mémoire utilisée dépend de la taille du lot et non du volume importé.
+    Les insertions groupées ne déclenchent pas les signaux : le catalogue est invalidé, l'index de
+    correspondance et les statistiques de disponibilité reconstruits et la version du modèle incrémentée
+    à la fin de l'import.
+
+    Args:
+        spec (ModelSpec): Le modèle importé.
+        rows (iterable): Les lignes, sous forme de dictionnaires indexés par colonne.
+        batch_size (int): Nombre de lignes par lot.
+        reindex (bool): Reconstruire l'index de correspondance et les statistiques après l'import de
+            créneaux ou d'activités.
+
+    Returns :
+        int : Le nombre de lignes importées.
+
+    Raises :
+        DataImportError : Si une ligne est invalide ; les lots déjà importés sont conservés.
+    """
+    update_fields = [spec.field_name(column) for column in spec.columns if column != spec.key]
+    if update_fields:
+        # `auto_now` n'est appliqué qu'aux lignes insérées : la date de modification est mise à jour explicitement
+        update_fields.append('updated_at')
+    rows = iter(rows)
+    count = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        try:
+            instances = _build_instances(spec, batch, line_number=count + 1)
+        except ValueError as error:
+            if isinstance(error, DataImportError):
+                raise
+            raise DataImportError(f"Lot commençant à la ligne {count + 1} : référence invalide ({error})") from error
+        with transaction.atomic():
+            if update_fields:
+                spec.model.objects.bulk_create(
+                    instances, update_conflicts=True, unique_fields=[spec.key], update_fields=update_fields,
+                )
+            else:
+                # Rien à mettre à jour en dehors de la clé : les lignes existantes sont conservées telles quelles
+                spec.model.objects.bulk_create(instances, ignore_conflicts=True)
+        count += len(instances)
+    if spec.model in (Category, Competence):
+        catalogue.invalidate()
+    elif reindex:
+        match_index.rebuild(batch_size=batch_size)
+        stats.rebuild(batch_size=batch_size)
+    versions.bump(spec.model)
+    return count
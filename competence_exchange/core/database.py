@@ -0,0 +1,112 @@
+import contextvars
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Alias de la base de lecture (réplica), configurée par les variables d'environnement DJANGO_DB_REPLICA_*
+REPLICA = 'replica'
+
+# Cookie posé après une écriture : les lectures du client restent sur la base principale le temps que le
+# réplica rattrape son retard, pour qu'il voie tout de suite ses propres modifications
+PIN_COOKIE = 'core_primary'
+
+# Attribut de requête posé par `wrote` : la vue a écrit dans la base, même sur une requête GET
+WRITE_ATTRIBUTE = '_core_primary_write'
+
+# Lectures de la vue en cours dirigées vers le réplica, isolées par thread et par tâche asynchrone
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+
+
+def replica_available():
+    """
+    Indique si un réplica est configuré.
+    """
+    return REPLICA in connections.settings
+
+
+def wrote(request):
+    """
+    Signale que la vue a écrit dans la base : `core.middleware.PrimaryPinMiddleware` pose alors le cookie
+    PIN_COOKIE, y compris pour les actions déclenchées par un lien (requête GET).
+    """
+    setattr(request, WRITE_ATTRIBUTE, True)
+
+
+def reading_from_replica():
+    """
+    Indique si les lectures en cours sont dirigées vers le réplica (vue décorée par `replica_reads`).
+    """
+    return _replica_reads.get() and replica_available()
+
+
+class PrimaryReplicaRouter:
+    """
+    Routeur de bases de données : les écritures vont toujours à la base principale ; les lectures des
+    modèles de l'application vont au réplica pendant l'exécution d'une vue de liste décorée par
+    `replica_reads`, et à la base principale partout ailleurs.
+
+    Les sessions et les utilisateurs restent lus sur la base principale : un utilisateur qui vient de
+    s'inscrire ou de se connecter doit être reconnu même si le réplica est en retard.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == 'core' and reading_from_replica():
+            return REPLICA
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Le réplica est une copie de la base principale : les objets des deux alias peuvent être liés
+        return {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA}
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Le réplica reçoit son schéma de la base principale (réplication ou copie), pas des migrations
+        return db != REPLICA
+
+
+def replica_reads(view):
+    """
+    Décorateur des vues de liste en lecture seule : leurs requêtes GET et HEAD lisent les modèles de
+    l'application sur le réplica, sauf si le client vient d'écrire (cookie PIN_COOKIE, voir
+    `core.middleware.PrimaryPinMiddleware`). Sans réplica configuré, le décorateur n'a aucun effet.
+
+    La variable de contexte est propagée aux threads de l'ORM des vues asynchrones par `sync_to_async`.
+    """
+    def routed(request):
+        return request.method in ('GET', 'HEAD') and PIN_COOKIE not in request.COOKIES
+
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            token = _replica_reads.set(routed(request))
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _replica_reads.reset(token)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = _replica_reads.set(routed(request))
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+    return wrapper
+
+
+def configure_sqlite(connection):
+    """
+    Applique les réglages de concurrence de SQLITE_PRAGMAS à une nouvelle connexion SQLite :
+    journal WAL (les lectures ne bloquent plus l'écriture et inversement), délai d'attente d'un verrou
+    au lieu d'une erreur immédiate, et synchronisation allégée (sûre en mode WAL).
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f"PRAGMA {name} = {value}")
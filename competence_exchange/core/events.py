@@ -0,0 +1,387 @@
+import asyncio
+import itertools
+import json
+import threading
+from collections import deque
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.urls import reverse
+
+# Événements publiés : un créneau ouvert (créé ou rouvert), pris par un volontaire, fermé sans
+# volontaire (action de l'administration), ou supprimé
+SLOT_OPENED = 'slot.opened'
+SLOT_CLAIMED = 'slot.claimed'
+SLOT_CLOSED = 'slot.closed'
+SLOT_DELETED = 'slot.deleted'
+
+# Nombre d'événements en attente par client : au-delà, le client est trop lent, ses événements sont
+# abandonnés et il reçoit un événement `reset` lui demandant de recharger la page
+BUFFER_SIZE = 64
+
+# Nombre d'événements gardés pour les clients qui se reconnectent avec l'en-tête Last-Event-ID
+HISTORY_SIZE = 1000
+
+# Commentaire envoyé aux clients inactifs, pour que les proxys ne ferment pas la connexion
+HEARTBEAT_SECONDS = 15
+
+# Délai de reconnexion indiqué au navigateur (millisecondes)
+RETRY_MS = 3000
+
+HEARTBEAT_FRAME = b': ping\n\n'
+RESET_FRAME = b'event: reset\ndata: {}\n\n'
+
+
+def format_event(event_id, event_type, data):
+    """
+    Encode un événement au format text/event-stream.
+
+    Returns :
+        bytes : Le message, encodé une seule fois pour tous les clients.
+    """
+    payload = json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return f'id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n'.encode()
+
+
+class Subscription:
+    """
+    Abonnement d'un client au flux d'événements, lié à la boucle d'événements qui le sert.
+
+    Les événements sont ajoutés par la boucle elle-même (voir `Broker.publish`) : la file n'a pas besoin
+    de verrou. Le client attend sur un simple Future, sans minuterie propre : les commentaires de
+    maintien de connexion sont demandés par une minuterie unique par boucle (voir `Broker.ping`).
+    """
+
+    def __init__(self, loop, size):
+        self.loop = loop
+        self.size = size
+        self.buffer = deque()
+        self.last_id = 0
+        self.overflowed = False
+        self.pinged = False
+        self.closed = False
+        self._waiter = None
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def push(self, event_id, frame):
+        """
+        Ajoute un événement à la file du client ; une file pleine est vidée et remplacée par un `reset`.
+        """
+        if self.overflowed or self.closed:
+            return
+        if len(self.buffer) >= self.size:
+            self.buffer.clear()
+            self.overflowed = True
+        else:
+            self.buffer.append((event_id, frame))
+        self._wake()
+
+    def ping(self):
+        """
+        Demande un commentaire de maintien de connexion si aucun événement n'est en attente.
+        """
+        self.pinged = True
+        self._wake()
+
+    def close(self):
+        """
+        Termine l'abonnement : le flux du client se termine au prochain réveil.
+        """
+        self.closed = True
+        self._wake()
+
+    async def next_frames(self):
+        """
+        Attend les prochains événements du client.
+
+        Returns :
+            bytes : Les événements en attente (ou un `reset`), ou un commentaire de maintien de connexion ;
+            None si l'abonnement est terminé.
+        """
+        if not self.buffer and not self.overflowed and not self.pinged and not self.closed:
+            self._waiter = self.loop.create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        self.pinged = False
+        if self.closed:
+            return None
+        if self.overflowed:
+            self.overflowed = False
+            return RESET_FRAME
+        if not self.buffer:
+            return HEARTBEAT_FRAME
+        frames = [frame for event_id, frame in self.buffer if event_id > self.last_id]
+        self.last_id = max(self.last_id, self.buffer[-1][0])
+        self.buffer.clear()
+        return b''.join(frames)
+
+
+class Broker:
+    """
+    Diffusion en mémoire des événements aux clients connectés au processus.
+
+    Les événements sont publiés depuis n'importe quel thread (vues synchrones, worker de tâches) ; chaque
+    boucle d'événements qui sert des clients reçoit un seul rappel par événement, qui remplit la file de
+    chacun de ses clients. Un client inactif ne coûte qu'un abonnement et une coroutine en attente.
+
+    La diffusion ne dépasse pas le processus : avec plusieurs processus serveurs, chacun ne voit que les
+    écritures faites chez lui.
+    """
+
+    def __init__(self, buffer_size=BUFFER_SIZE, history_size=HISTORY_SIZE):
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+        self._history = deque(maxlen=history_size)
+        self._ids = itertools.count(1)
+        self._last_id = 0
+
+    def subscribe(self):
+        """
+        Abonne un client servi par la boucle d'événements courante.
+        """
+        subscription = Subscription(asyncio.get_running_loop(), self.buffer_size)
+        with self._lock:
+            self._subscriptions.setdefault(subscription.loop, set()).add(subscription)
+            subscription.last_id = self._last_id
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Désabonne un client (sans effet s'il ne l'est plus).
+        """
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.loop)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.loop]
+
+    def subscriber_count(self):
+        """
+        Retourne le nombre de clients abonnés, toutes boucles confondues.
+        """
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def publish(self, event_type, data):
+        """
+        Publie un événement à tous les clients abonnés.
+
+        Args:
+            event_type (str): Le type d'événement (SLOT_OPENED, SLOT_CLAIMED, SLOT_CLOSED ou SLOT_DELETED).
+            data (dict): Les données de l'événement, sérialisables en JSON.
+
+        Returns :
+            int : L'identifiant de l'événement.
+        """
+        with self._lock:
+            event_id = next(self._ids)
+            frame = format_event(event_id, event_type, data)
+            self._history.append((event_id, frame))
+            self._last_id = event_id
+            loops = list(self._subscriptions)
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self._deliver, loop, event_id, frame)
+            except RuntimeError:
+                # Boucle fermée sans que ses clients se soient désabonnés
+                with self._lock:
+                    self._subscriptions.pop(loop, None)
+        return event_id
+
+    def _deliver(self, loop, event_id, frame):
+        """
+        Remplit la file des clients d'une boucle d'événements (exécuté par cette boucle).
+        """
+        for subscription in tuple(self._subscriptions.get(loop, ())):
+            subscription.push(event_id, frame)
+
+    def ping(self, loop):
+        """
+        Demande un commentaire de maintien de connexion à chaque client d'une boucle d'événements
+        (exécuté par cette boucle).
+
+        Returns :
+            int : Le nombre de clients de la boucle.
+        """
+        subscriptions = tuple(self._subscriptions.get(loop, ()))
+        for subscription in subscriptions:
+            subscription.ping()
+        return len(subscriptions)
+
+    def since(self, last_id):
+        """
+        Retourne les événements publiés après `last_id`, pour un client qui se reconnecte.
+
+        Returns :
+            list : Les couples `(identifiant, message)`, ou None si certains ne sont plus dans l'historique
+            (ou si `last_id` vient d'un autre processus ou d'avant un redémarrage).
+        """
+        with self._lock:
+            if last_id > self._last_id:
+                return None
+            if last_id == self._last_id:
+                return []
+            if not self._history or self._history[0][0] > last_id + 1:
+                return None
+            return [(event_id, frame) for event_id, frame in self._history if event_id > last_id]
+
+    def close(self):
+        """
+        Termine le flux de tous les clients abonnés (arrêt du serveur, tests).
+        """
+        with self._lock:
+            subscriptions = {loop: tuple(items) for loop, items in self._subscriptions.items()}
+        for loop, items in subscriptions.items():
+            for subscription in items:
+                try:
+                    loop.call_soon_threadsafe(subscription.close)
+                except RuntimeError:
+                    pass
+
+
+broker = Broker()
+
+
+def slot_data(slot, activity_id=None):
+    """
+    Données d'un événement de créneau : les pages de liste retrouvent leurs lignes par l'identifiant
+    du créneau ; les créneaux ouverts portent de quoi décider s'ils intéressent la page.
+    """
+    return {
+        'slot': slot.pk,
+        'activity': activity_id,
+        'competence': slot.competence_id,
+        'purpose': slot.purpose,
+        'date': slot.date,
+    }
+
+
+def publish_on_commit(event_type, data):
+    """
+    Publie l'événement après la validation de la transaction en cours (immédiatement hors transaction) :
+    un client ne doit pas voir une écriture encore susceptible d'être annulée.
+    """
+    transaction.on_commit(lambda: broker.publish(event_type, data))
+
+
+class EventStreamApplication:
+    """
+    Application ASGI qui sert le flux d'événements des créneaux (route `slot_events`) et passe les
+    autres requêtes à l'application Django.
+
+    Le flux est servi hors du gestionnaire de requêtes de Django : une connexion ouverte n'occupe ni
+    thread pour les middlewares synchrones, ni connexion à la base ; le flux est public et ne lit pas
+    la session. La déconnexion du client (`http.disconnect`), que Django 4.2 ne transmet pas aux vues,
+    termine l'abonnement aussitôt.
+    """
+
+    def __init__(self, application, broker=broker, heartbeat=HEARTBEAT_SECONDS):
+        self.application = application
+        self.broker = broker
+        self.heartbeat = heartbeat
+        self._path = None
+        self._heartbeats = {}
+
+    @property
+    def path(self):
+        # Inversée à la première requête : les URL ne sont pas toutes chargées à l'import du module ASGI
+        if self._path is None:
+            self._path = reverse('slot_events')
+        return self._path
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and self._path_info(scope) == self.path:
+            await self.stream(scope, receive, send)
+        else:
+            await self.application(scope, receive, send)
+
+    @staticmethod
+    def _path_info(scope):
+        path, root_path = scope['path'], scope.get('root_path', '')
+        return path[len(root_path):] if root_path and path.startswith(root_path) else path
+
+    async def stream(self, scope, receive, send):
+        """
+        Sert le flux text/event-stream jusqu'à la déconnexion du client ou la fermeture du diffuseur.
+        """
+        if scope['method'] not in ('GET', 'HEAD'):
+            await send({'type': 'http.response.start', 'status': 405, 'headers': [(b'allow', b'GET, HEAD')]})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        headers = dict(scope.get('headers', ()))
+        subscription = self.broker.subscribe()
+        self._start_heartbeat(subscription.loop)
+        watcher = asyncio.ensure_future(self._watch_disconnect(receive, subscription))
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [
+                    (b'content-type', b'text/event-stream; charset=utf-8'),
+                    (b'cache-control', b'no-cache'),
+                    # Pas de mise en mémoire tampon par nginx
+                    (b'x-accel-buffering', b'no'),
+                ],
+            })
+            if scope['method'] == 'HEAD':
+                await send({'type': 'http.response.body', 'body': b''})
+                return
+            await send({'type': 'http.response.body', 'body': self._opening(subscription, headers), 'more_body': True})
+            while True:
+                frames = await subscription.next_frames()
+                if frames is None:
+                    break
+                if frames:
+                    await send({'type': 'http.response.body', 'body': frames, 'more_body': True})
+            if not watcher.done():
+                await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            watcher.cancel()
+            self.broker.unsubscribe(subscription)
+
+    def _start_heartbeat(self, loop):
+        """
+        Démarre la minuterie de maintien de connexion de la boucle, si elle ne tourne pas déjà.
+        """
+        task = self._heartbeats.get(loop)
+        if task is None or task.done():
+            self._heartbeats[loop] = loop.create_task(self._heartbeat(loop))
+
+    async def _heartbeat(self, loop):
+        # S'arrête avec le dernier client de la boucle ; le suivant la redémarre
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            if not self.broker.ping(loop):
+                del self._heartbeats[loop]
+                return
+
+    def _opening(self, subscription, headers):
+        """
+        Début du flux : délai de reconnexion, puis les événements manqués depuis Last-Event-ID.
+        """
+        opening = [f'retry: {RETRY_MS}\n\n'.encode()]
+        last_event_id = headers.get(b'last-event-id', b'').decode('latin-1').strip()
+        if last_event_id:
+            missed = self.broker.since(int(last_event_id)) if last_event_id.isdigit() else None
+            if missed is None:
+                opening.append(RESET_FRAME)
+            else:
+                opening.extend(frame for event_id, frame in missed)
+                if missed:
+                    subscription.last_id = max(subscription.last_id, missed[-1][0])
+        return b''.join(opening)
+
+    @staticmethod
+    async def _watch_disconnect(receive, subscription):
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                subscription.close()
+                return
@@ -0,0 +1,105 @@
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from . import catalogue, match_index, profiles, stats, versions
+from .models import Category, Competence, Slot, Activity, Profile
+
+# Mot de passe commun à tous les utilisateurs générés
+PASSWORD = 'motdepasse'
+
+
+def zipf_weights(count, skew):
+    """
+    Poids d'une loi de Zipf : l'élément de rang r a un poids 1 / r^skew (skew = 0 donne une loi uniforme).
+    """
+    return [1 / (rank ** skew) for rank in range(1, count + 1)]
+
+
+def generate(users=100, categories=10, competences=100, slots=1000, request_ratio=0.5, volunteer_ratio=0.2,
+             past_ratio=0.2, competences_per_user=3, skew=1.1, seed=0, prefix='charge', batch_size=2000):
+    """
+    Génère un jeu de données réaliste : la popularité des compétences suit une loi de Zipf, de sorte que
+    quelques compétences concentrent la plupart des créneaux, comme en production.
+
+    Args:
+        users (int): Nombre d'utilisateurs.
+        categories (int): Nombre de catégories.
+        competences (int): Nombre de compétences.
+        slots (int): Nombre de créneaux.
+        request_ratio (float): Part des créneaux qui sont des demandes d'aide (chacune avec une activité).
+        volunteer_ratio (float): Part des demandes déjà prises par un volontaire.
+        past_ratio (float): Part des créneaux dont la date est passée.
+        competences_per_user (int): Nombre de compétences de chaque profil.
+        skew (float): Exposant de la loi de Zipf.
+        seed (int): Graine du générateur aléatoire, pour des jeux de données reproductibles.
+        prefix (str): Préfixe des noms générés, pour éviter les collisions avec des données existantes.
+        batch_size (int): Nombre de lignes par insertion groupée.
+
+    Returns :
+        dict : Le nombre de lignes créées par modèle.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    password = make_password(PASSWORD)
+
+    with transaction.atomic():
+        category_objects = Category.objects.bulk_create(
+            [Category(name=f"{prefix} catégorie {index}") for index in range(categories)], batch_size=batch_size
+        )
+        competence_objects = Competence.objects.bulk_create([
+            Competence(name=f"{prefix} compétence {index}", category=rng.choice(category_objects) if category_objects else None)
+            for index in range(competences)
+        ], batch_size=batch_size)
+        user_objects = profiles.bulk_create_users([
+            User(username=f"{prefix}-{index}", password=password, email=f"{prefix}-{index}@example.org")
+            for index in range(users)
+        ], batch_size=batch_size)
+
+        weights = zipf_weights(len(competence_objects), skew)
+        through = Profile.competences.through
+        links = []
+        for user in user_objects:
+            chosen = {competence.pk for competence in rng.choices(competence_objects, weights, k=competences_per_user)}
+            links.extend(through(profile_id=user.profile.pk, competence_id=competence_id) for competence_id in chosen)
+        through.objects.bulk_create(links, batch_size=batch_size)
+
+        slot_objects = []
+        for _ in range(slots):
+            offset = -rng.randint(1, 60) if rng.random() < past_ratio else rng.randint(0, 90)
+            slot_objects.append(Slot(
+                date=today + timedelta(days=offset),
+                user=rng.choice(user_objects),
+                competence=rng.choices(competence_objects, weights)[0],
+                purpose='request' if rng.random() < request_ratio else 'aid',
+            ))
+        activity_objects = []
+        for slot in slot_objects:
+            if slot.purpose == 'request' and rng.random() < volunteer_ratio:
+                slot.is_available = False
+        slot_objects = Slot.objects.bulk_create(slot_objects, batch_size=batch_size)
+        for slot in slot_objects:
+            if slot.purpose == 'request':
+                activity_objects.append(Activity(
+                    description=f"Besoin d'aide en {slot.competence.name}",
+                    requester=slot.user,
+                    competence_needed=slot.competence,
+                    slot=slot,
+                    volunteer=None if slot.is_available else rng.choice(user_objects),
+                ))
+        Activity.objects.bulk_create(activity_objects, batch_size=batch_size)
+
+    catalogue.invalidate()
+    match_index.rebuild(batch_size=batch_size)
+    stats.rebuild(batch_size=batch_size)
+    versions.bump(Category, Competence, Slot, Activity, Profile)
+    return {
+        'users': len(user_objects),
+        'categories': len(category_objects),
+        'competences': len(competence_objects),
+        'slots': len(slot_objects),
+        'activities': len(activity_objects),
+    }
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from core import archive
+
+
+class Command(BaseCommand):
+    """
+    Archive les créneaux passés et leurs activités, par lots de taille bornée, pour que les vues ne
+    parcourent que les créneaux en cours. À lancer périodiquement (par exemple chaque nuit).
+    """
+    help = "Déplace les créneaux passés et leurs activités dans les tables d'archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=0, help="Nombre de jours passés conservés (0 : archiver tout créneau antérieur à aujourd'hui).")
+        parser.add_argument('--batch-size', type=int, default=500, help="Nombre maximal de créneaux archivés par transaction.")
+        parser.add_argument('--dry-run', action='store_true', help="Compter les créneaux à archiver sans rien modifier.")
+
+    def handle(self, *args, **options):
+        cutoff = archive.cutoff_date(options['days'])
+        if options['dry_run']:
+            totals = archive.count_past_slots(cutoff)
+            self.stdout.write(f"{totals['slots']} créneaux et {totals['activities']} activités antérieurs au {cutoff:%d/%m/%Y} seraient archivés.")
+            return
+
+        def progress(totals):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Lot {totals['batches']} : {totals['slots']} créneaux archivés.")
+
+        totals = archive.archive_past_slots(cutoff, batch_size=options['batch_size'], progress=progress)
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['slots']} créneaux et {totals['activities']} activités archivés en {totals['batches']} lots."
+        ))
@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import profiles
+from core.models import Competence, Profile
+
+
+class Command(BaseCommand):
+    """
+    Ajoute ou retire des compétences à un groupe d'utilisateurs (par exemple une promotion accueillie
+    d'un coup), en une insertion groupée et une suppression sur la table de liaison des profils
+    (voir `core.profiles.change_competences`).
+
+    Les utilisateurs sont donnés par leur nom, en arguments ou dans un fichier (un nom par ligne).
+    """
+    help = "Ajoute ou retire des compétences à plusieurs utilisateurs à la fois."
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', help="Les noms des utilisateurs.")
+        parser.add_argument('--users-file', help="Un fichier contenant un nom d'utilisateur par ligne.")
+        parser.add_argument('--add', nargs='+', default=[], metavar='COMPETENCE', help="Les noms des compétences à ajouter.")
+        parser.add_argument('--remove', nargs='+', default=[], metavar='COMPETENCE', help="Les noms des compétences à retirer.")
+
+    def competence_ids(self, names):
+        """
+        Retourne les identifiants des compétences nommées.
+
+        Raises :
+            CommandError : Si une compétence est inconnue.
+        """
+        ids = dict(Competence.objects.filter(name__in=names).values_list('name', 'pk'))
+        unknown = sorted(set(names) - set(ids))
+        if unknown:
+            raise CommandError(f"Compétence(s) inconnue(s) : {', '.join(unknown)}.")
+        return set(ids.values())
+
+    def user_profiles(self, usernames):
+        """
+        Retourne les identifiants d'utilisateur indexés par identifiant de profil, lus par lots.
+
+        Raises :
+            CommandError : Si un utilisateur est inconnu.
+        """
+        found, names = {}, sorted(set(usernames))
+        for start in range(0, len(names), profiles.LOOKUP_BATCH_SIZE):
+            found.update(
+                (username, (pk, user_id)) for username, pk, user_id in Profile.objects.filter(
+                    user__username__in=names[start:start + profiles.LOOKUP_BATCH_SIZE],
+                ).values_list('user__username', 'pk', 'user_id')
+            )
+        unknown = [name for name in names if name not in found]
+        if unknown:
+            raise CommandError(f"Utilisateur(s) inconnu(s) : {', '.join(unknown[:20])}{' ...' if len(unknown) > 20 else ''}.")
+        return dict(found.values())
+
+    def handle(self, *args, **options):
+        usernames = list(options['usernames'])
+        if options['users_file']:
+            with open(options['users_file'], encoding='utf-8') as stream:
+                usernames += [line.strip() for line in stream if line.strip()]
+        if not usernames:
+            raise CommandError("Indiquez au moins un utilisateur.")
+        if not options['add'] and not options['remove']:
+            raise CommandError("Indiquez des compétences à ajouter (--add) ou à retirer (--remove).")
+        add, remove = self.competence_ids(options['add']), self.competence_ids(options['remove'])
+        if add & remove:
+            raise CommandError("Une compétence ne peut pas être à la fois ajoutée et retirée.")
+        user_profiles = self.user_profiles(usernames)
+        profiles.change_competences(user_profiles, add=add, remove=remove)
+        self.stdout.write(self.style.SUCCESS(f"{len(user_profiles)} profil(s) mis à jour."))
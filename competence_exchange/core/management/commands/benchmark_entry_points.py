@@ -0,0 +1,50 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, teardown_databases
+
+from core import benchmark, loadgen
+from core.management.commands.generate_load_data import add_dataset_arguments, dataset_options
+
+
+class Command(BaseCommand):
+    """
+    Compare le débit des points d'entrée WSGI et ASGI sur les vues de lecture asynchrones, à forte concurrence.
+
+    Comme run_benchmarks, la commande travaille sur une base de test jetable peuplée d'un jeu de données
+    synthétique. Les requêtes sont envoyées directement aux applications WSGI et ASGI, sans serveur ni
+    réseau : seul le coût du point d'entrée et des vues est mesuré.
+    """
+    help = "Compare le débit WSGI et ASGI des vues de lecture asynchrones."
+
+    def add_arguments(self, parser):
+        add_dataset_arguments(parser)
+        parser.add_argument('--route', action='append', dest='routes', help="Route à mesurer (répétable ; toutes les vues asynchrones par défaut).")
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 100], help="Niveaux de concurrence.")
+        parser.add_argument('--requests', type=int, default=200, help="Nombre de requêtes par mesure.")
+        parser.add_argument('--output', help="Fichier JSON des résultats.")
+
+    def handle(self, *args, **options):
+        unknown = set(options['routes'] or ()) - set(benchmark.ASYNC_ROUTES)
+        if unknown:
+            raise CommandError(f"Routes inconnues ou synchrones : {', '.join(sorted(unknown))}")
+
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            dataset = dataset_options(options)
+            loadgen.generate(**dataset)
+            user = User.objects.filter(username=f"{options['prefix']}-0").get()
+            results = benchmark.compare_entry_points(user, options['routes'], options['concurrency'], options['requests'])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        self.stdout.write(f"{'route':<18} {'entrée':<6} {'conc.':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'erreurs':>8}")
+        for result in results:
+            self.stdout.write(
+                f"{result['route']:<18} {result['entry_point']:<6} {result['concurrency']:>6} {result['throughput_rps']:>9.1f} "
+                f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['errors']:>8}"
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                json.dump({'dataset': dataset, 'results': results}, stream, indent=2, ensure_ascii=False)
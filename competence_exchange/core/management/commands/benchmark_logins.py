@@ -0,0 +1,39 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.test.utils import setup_databases, teardown_databases
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    """
+    Compare le débit des connexions avec l'ancien signal de profil (profil réenregistré à chaque
+    enregistrement de l'utilisateur) et avec le signal actuel (profil écrit à la création seulement).
+
+    Comme run_benchmarks, la commande travaille sur une base de test jetable.
+    """
+    help = "Mesure le débit des connexions avant et après la suppression de l'enregistrement du profil."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=500, help="Nombre de connexions par mesure.")
+        parser.add_argument('--output', help="Fichier JSON des résultats.")
+
+    def handle(self, *args, **options):
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            # Une mesure à blanc pour amorcer les caches (gabarits, connexions) avant les deux mesures comparées
+            benchmark.measure_logins(min(options['users'], 50))
+            results = [benchmark.measure_logins(options['users'], legacy=legacy) for legacy in (True, False)]
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        self.stdout.write(f"{'mode':<8} {'connexions':>10} {'conn./s':>9} {'p50 ms':>8} {'p95 ms':>8} {'requêtes':>9} {'écritures':>10}")
+        for result in results:
+            self.stdout.write(
+                f"{result['mode']:<8} {result['logins']:>10} {result['throughput_lps']:>9.1f} {result['p50_ms']:>8.3f} "
+                f"{result['p95_ms']:>8.3f} {result['queries_per_login']:>9.2f} {result['writes_per_login']:>10.2f}"
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                json.dump(results, stream, indent=2, ensure_ascii=False)
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    """
+    Mesure le passage à l'échelle du moteur de correspondance sur des créneaux ouverts synthétiques,
+    générés en mémoire : la base n'est pas utilisée.
+    """
+    help = "Mesure le moteur de correspondance à 10k, 100k et 1M créneaux ouverts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000], help="Nombres de créneaux ouverts.")
+        parser.add_argument('--competences', type=int, default=200, help="Nombre de compétences.")
+        parser.add_argument('--days', type=int, default=90, help="Nombre de jours couverts par les créneaux.")
+        parser.add_argument('--repeat', type=int, default=3, help="Nombre d'exécutions par taille.")
+        parser.add_argument('--seed', type=int, default=0, help="Graine du générateur aléatoire.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'créneaux':>10} {'demandes':>10} {'offres':>10} {'propositions':>13} {'meilleur':>11} {'médian':>11}")
+        for size in options['sizes']:
+            result = benchmark.measure_matching(
+                size, repeat=options['repeat'], competences=options['competences'], days=options['days'], seed=options['seed'],
+            )
+            self.stdout.write(
+                f"{result['open_slots']:>10} {result['requests']:>10} {result['offers']:>10} {result['proposals']:>13} "
+                f"{result['best_ms']:>8.1f} ms {result['median_ms']:>8.1f} ms"
+            )
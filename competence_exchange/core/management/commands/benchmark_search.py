@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    """
+    Mesure l'autocomplétion et la recherche plein texte sur un index FTS5 de demandes synthétiques.
+
+    Comme run_benchmarks, la commande travaille sur une base de test jetable ; seul l'index des demandes
+    est rempli, les activités elles-mêmes ne sont pas créées.
+    """
+    help = "Mesure la recherche plein texte sur 1M demandes synthétiques."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--activities', type=int, default=1_000_000, help="Nombre de demandes indexées.")
+        parser.add_argument('--queries', type=int, default=500, help="Nombre de requêtes d'autocomplétion mesurées.")
+        parser.add_argument('--seed', type=int, default=0, help="Graine du générateur aléatoire.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("La recherche plein texte indexée n'existe que sous SQLite (FTS5).")
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            result = benchmark.measure_search(options['activities'], options['queries'], options['seed'])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+        self.stdout.write(f"{result['activities']} demandes indexées en {result['populate_s']} s")
+        self.stdout.write(
+            f"autocomplétion : p50 {result['suggest_p50_ms']:.3f} ms, p95 {result['suggest_p95_ms']:.3f} ms, "
+            f"max {result['suggest_max_ms']:.3f} ms"
+        )
+        self.stdout.write(f"recherche classée (bm25) : p50 {result['ranked_p50_ms']:.3f} ms, p95 {result['ranked_p95_ms']:.3f} ms")
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    """
+    Test de charge du flux d'événements des créneaux : connexions inactives simultanées et latence de
+    diffusion d'un événement à tous les clients.
+
+    Le flux ne lit pas la base : la commande n'a pas besoin de base de test.
+    """
+    help = "Mesure le nombre de connexions et la latence du flux d'événements des créneaux."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, nargs='+', default=[1000, 5000], help="Nombres de clients connectés.")
+        parser.add_argument('--events', type=int, default=50, help="Nombre d'événements publiés par mesure.")
+        parser.add_argument('--interval-ms', type=float, default=20, help="Intervalle entre deux événements (millisecondes).")
+
+    def handle(self, *args, **options):
+        results = [
+            benchmark.measure_slot_events(connections, options['events'], options['interval_ms'])
+            for connections in options['connections']
+        ]
+        self.stdout.write(
+            f"{'connexions':>10} {'établies s':>10} {'Ko/conn.':>9} {'reçus':>8} {'perdus':>7} "
+            f"{'p50 ms':>7} {'p95 ms':>7} {'max ms':>7}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['connections']:>10} {result['connect_s']:>10.2f} {result['memory_kb_per_connection']:>9.2f} "
+                f"{result['received']:>8} {result['lost']:>7} {result['p50_ms']:>7.2f} {result['p95_ms']:>7.2f} "
+                f"{result['max_ms']:>7.2f}"
+            )
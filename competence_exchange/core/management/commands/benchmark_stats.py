@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.test.utils import setup_databases, teardown_databases
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    """
+    Compare le calcul de l'offre et de la demande ouvertes par GROUP BY sur les créneaux et leur lecture
+    dans la table des statistiques de disponibilité.
+
+    Comme run_benchmarks, la commande travaille sur une base de test jetable.
+    """
+    help = "Compare les statistiques de disponibilité matérialisées au GROUP BY sur les créneaux."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000], help="Nombres de créneaux.")
+        parser.add_argument('--repeat', type=int, default=5, help="Nombre de mesures par requête.")
+
+    def handle(self, *args, **options):
+        results = []
+        for size in options['sizes']:
+            old_config = setup_databases(verbosity=0, interactive=False)
+            try:
+                results.append(benchmark.measure_stats(size, options['repeat']))
+            finally:
+                teardown_databases(old_config, verbosity=0)
+        self.stdout.write(
+            f"{'créneaux':>10} {'cellules':>9} {'reconstr. s':>11} {'GROUP BY comp.':>15} {'table comp.':>12} "
+            f"{'GROUP BY cat.':>14} {'table cat.':>11} {'màj ms':>8}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['slots']:>10} {result['cells']:>9} {result['rebuild_s']:>11.2f} "
+                f"{result['group_by_competence_ms']:>12.2f} ms {result['stats_competence_ms']:>9.2f} ms "
+                f"{result['group_by_category_ms']:>11.2f} ms {result['stats_category_ms']:>8.2f} ms {result['apply_ms']:>8.3f}"
+            )
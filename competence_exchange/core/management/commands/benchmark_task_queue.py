@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.test.utils import setup_databases, teardown_databases
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    """
+    Mesure le débit de la file de tâches de fond selon le nombre de threads du worker.
+
+    Comme run_benchmarks, la commande travaille sur une base de test jetable.
+    """
+    help = "Mesure le débit de la file de tâches de fond."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=2000, help="Nombre de tâches par mesure.")
+        parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 8], help="Nombres de threads mesurés.")
+        parser.add_argument('--sleep-ms', type=float, default=0, help="Durée simulée de chaque tâche (millisecondes).")
+
+    def handle(self, *args, **options):
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = [
+                benchmark.measure_task_queue(options['tasks'], threads, options['sleep_ms'])
+                for threads in options['threads']
+            ]
+        finally:
+            teardown_databases(old_config, verbosity=0)
+        self.stdout.write(f"{'threads':>7} {'tâches':>7} {'insertion ms':>13} {'tâches/s':>9} {'p95 ms':>8}")
+        for result in results:
+            self.stdout.write(
+                f"{result['threads']:>7} {result['tasks']:>7} {result['enqueue_ms']:>13.3f} "
+                f"{result['throughput_per_s']:>9.1f} {result['p95_ms']:>8.2f}"
+            )
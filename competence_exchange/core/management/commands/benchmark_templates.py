@@ -0,0 +1,30 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    """
+    Mesure le rendu des gabarits de liste (préparation des lignes et rendu) pour des listes de 1 000
+    et 10 000 lignes construites en mémoire, sans base de données.
+    """
+    help = "Micro-benchmark du rendu des gabarits de liste."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000], help="Nombres de lignes mesurés.")
+        parser.add_argument('--repeat', type=int, default=3, help="Nombre de mesures par page (la meilleure est retenue).")
+        parser.add_argument('--output', help="Fichier JSON des résultats.")
+
+    def handle(self, *args, **options):
+        results = benchmark.measure_templates(tuple(options['sizes']), options['repeat'])
+        self.stdout.write(f"{'page':<16} {'lignes':>7} {'lignes ms':>10} {'rendu ms':>9} {'µs/ligne':>9}")
+        for result in results:
+            self.stdout.write(
+                f"{result['route']:<16} {result['rows']:>7} {result['build_ms']:>10.2f} {result['render_ms']:>9.2f} "
+                f"{result['per_row_us']:>9.2f}"
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                json.dump(results, stream, indent=2, ensure_ascii=False)
@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core import queries
+from core.models import Profile
+from core.views import SLOTS_PER_PAGE
+
+
+class Command(BaseCommand):
+    """
+    Affiche le plan d'exécution (EXPLAIN QUERY PLAN sous SQLite) de la requête principale de chaque vue de liste,
+    afin de vérifier que le planificateur utilise les index prévus.
+    """
+    help = "Affiche le plan d'exécution des requêtes des vues de liste."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--username',
+            help="Utilisateur pour lequel construire les requêtes des vues connectées (par défaut le premier utilisateur).",
+        )
+        parser.add_argument('--database', default='default', help="Alias de la base de données à interroger.")
+
+    def handle(self, *args, **options):
+        database = options['database']
+        if options['username']:
+            user = User.objects.using(database).filter(username=options['username']).first()
+            if user is None:
+                raise CommandError(f"Utilisateur introuvable : {options['username']}")
+        else:
+            user = User.objects.using(database).order_by('pk').first()
+
+        view_queries = [
+            ('available_slots', queries.available_slots_queryset().order_by('date', 'id')[:SLOTS_PER_PAGE + 1]),
+        ]
+        if user is not None:
+            # Sans compétence, le filtre `__in` vide ne produirait aucune requête à expliquer : un identifiant
+            # inexistant conserve la forme de la requête
+            competence_ids = frozenset(Profile.competences.through.objects.using(database).filter(
+                profile__user=user
+            ).values_list('competence_id', flat=True)) or frozenset([0])
+            view_queries += [
+                ('my_slots', queries.my_slots_queryset(user)),
+                ('help_requests', queries.help_requests_queryset(user, competence_ids)),
+                ('my_requests', queries.my_requests_queryset(user)),
+                ('available_help', queries.available_help_queryset(user, competence_ids)),
+            ]
+        else:
+            self.stderr.write("Aucun utilisateur : seules les vues publiques sont analysées.")
+
+        vendor = connections[database].vendor
+        for name, queryset in view_queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {name} ({vendor})"))
+            self.stdout.write(queryset.using(database).explain())
+            self.stdout.write("")
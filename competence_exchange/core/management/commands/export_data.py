@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from core.data_exchange import FORMATS, SPECS, export_rows
+
+
+class Command(BaseCommand):
+    """
+    Exporte les catégories, compétences, créneaux ou activités en CSV ou JSONL, en flux continu.
+    Les clés étrangères sont exportées par leur clé naturelle (nom, nom d'utilisateur) pour pouvoir
+    être réimportées avec import_data.
+    """
+    help = "Exporte un modèle en CSV ou JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=sorted(SPECS), help="Le modèle à exporter.")
+        parser.add_argument('--format', choices=FORMATS, default='csv', help="Le format de sortie.")
+        parser.add_argument('--output', help="Le fichier de sortie (sortie standard par défaut).")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Nombre de lignes lues par requête.")
+
+    def handle(self, *args, **options):
+        spec = SPECS[options['model']]
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as stream:
+                count = export_rows(spec, stream, options['format'], options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(f"{count} lignes exportées."))
+        else:
+            count = export_rows(spec, self.stdout, options['format'], options['chunk_size'])
+            # Les données occupent la sortie standard : le bilan passe par la sortie d'erreur
+            self.stderr.write(f"{count} lignes exportées.", style_func=None)
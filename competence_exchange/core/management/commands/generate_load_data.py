@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from core import loadgen
+
+
+def add_dataset_arguments(parser):
+    """
+    Ajoute les options décrivant le jeu de données généré (partagées avec run_benchmarks).
+    """
+    parser.add_argument('--users', type=int, default=100, help="Nombre d'utilisateurs.")
+    parser.add_argument('--categories', type=int, default=10, help="Nombre de catégories.")
+    parser.add_argument('--competences', type=int, default=100, help="Nombre de compétences.")
+    parser.add_argument('--slots', type=int, default=1000, help="Nombre de créneaux.")
+    parser.add_argument('--request-ratio', type=float, default=0.5, help="Part des créneaux qui sont des demandes d'aide.")
+    parser.add_argument('--volunteer-ratio', type=float, default=0.2, help="Part des demandes déjà prises.")
+    parser.add_argument('--past-ratio', type=float, default=0.2, help="Part des créneaux passés.")
+    parser.add_argument('--competences-per-user', type=int, default=3, help="Nombre de compétences par profil.")
+    parser.add_argument('--skew', type=float, default=1.1, help="Exposant de Zipf de la popularité des compétences.")
+    parser.add_argument('--seed', type=int, default=0, help="Graine du générateur aléatoire.")
+    parser.add_argument('--prefix', default='charge', help="Préfixe des noms générés.")
+
+
+def dataset_options(options):
+    """
+    Extrait des options de la commande les paramètres de `loadgen.generate`.
+    """
+    names = (
+        'users', 'categories', 'competences', 'slots', 'request_ratio', 'volunteer_ratio',
+        'past_ratio', 'competences_per_user', 'skew', 'seed', 'prefix',
+    )
+    return {name: options[name] for name in names}
+
+
+class Command(BaseCommand):
+    """
+    Génère un jeu de données synthétique dans la base courante (par exemple pour peupler un environnement de recette).
+    """
+    help = "Génère un jeu de données synthétique réaliste."
+
+    def add_arguments(self, parser):
+        add_dataset_arguments(parser)
+
+    def handle(self, *args, **options):
+        created = loadgen.generate(**dataset_options(options))
+        summary = ", ".join(f"{count} {name}" for name, count in created.items())
+        self.stdout.write(self.style.SUCCESS(f"Créés : {summary}."))
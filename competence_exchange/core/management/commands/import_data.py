@@ -0,0 +1,39 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.data_exchange import FORMATS, SPECS, DataImportError, import_rows, read_rows
+
+
+class Command(BaseCommand):
+    """
+    Importe des catégories, compétences, créneaux ou activités depuis un fichier CSV ou JSONL,
+    par lots et en flux continu. Les catégories et compétences sont mises à jour par leur nom,
+    les créneaux et activités par leur identifiant.
+    """
+    help = "Importe un modèle depuis un fichier CSV ou JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=sorted(SPECS), help="Le modèle à importer.")
+        parser.add_argument('path', help="Le fichier à importer ('-' pour l'entrée standard).")
+        parser.add_argument('--format', choices=FORMATS, help="Le format d'entrée (déduit de l'extension par défaut).")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Nombre de lignes insérées par requête.")
+        parser.add_argument(
+            '--no-reindex', action='store_true',
+            help="Ne pas reconstruire l'index de correspondance après l'import (à lancer ensuite avec rebuild_match_index).",
+        )
+
+    def handle(self, *args, **options):
+        spec = SPECS[options['model']]
+        fmt = options['format'] or ('jsonl' if options['path'].endswith(('.jsonl', '.ndjson')) else 'csv')
+        stream = sys.stdin if options['path'] == '-' else open(options['path'], encoding='utf-8', newline='')
+        try:
+            count = import_rows(
+                spec, read_rows(stream, fmt), batch_size=options['batch_size'], reindex=not options['no_reindex']
+            )
+        except DataImportError as error:
+            raise CommandError(str(error))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        self.stdout.write(self.style.SUCCESS(f"{count} lignes importées."))
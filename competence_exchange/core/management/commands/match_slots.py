@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core import matching
+
+
+class Command(BaseCommand):
+    """
+    Associe en masse les demandes d'aide ouvertes aux créneaux d'aide de même compétence et de même date.
+
+    La commande est idempotente et peut être planifiée (cron) : seules les demandes et offres sans
+    proposition sont examinées, et les propositions caduques sont supprimées à chaque exécution.
+    """
+    help = "Calcule les propositions de mise en relation entre demandes et offres d'aide."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Nombre de propositions insérées par requête.")
+        parser.add_argument('--dry-run', action='store_true', help="Calculer les propositions sans les enregistrer.")
+
+    def handle(self, *args, **options):
+        result = matching.run(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        verb = "seraient créées" if options['dry_run'] else "créées"
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['proposals']} propositions {verb} ({result['requests']} demandes, {result['offers']} offres examinées, "
+            f"{result['removed']} propositions caduques)."
+        ))
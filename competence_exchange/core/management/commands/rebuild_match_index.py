@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core import match_index
+
+
+class Command(BaseCommand):
+    """
+    Reconstruit l'index de correspondance des créneaux ouverts, par exemple après un import en masse
+    ou une mise à jour effectuée sans passer par les signaux.
+    """
+    help = "Reconstruit l'index de correspondance des créneaux ouverts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Nombre d'entrées insérées par requête.")
+
+    def handle(self, *args, **options):
+        created = match_index.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{created} entrées indexées."))
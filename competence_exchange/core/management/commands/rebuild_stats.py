@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core import stats
+
+
+class Command(BaseCommand):
+    """
+    Recalcule les statistiques de disponibilité à partir des créneaux, par exemple après un import en
+    masse ou une mise à jour effectuée sans passer par les signaux ; avec --check, indique seulement
+    les écarts.
+    """
+    help = "Recalcule les statistiques de disponibilité par compétence et par semaine."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Nombre de lignes insérées par requête.")
+        parser.add_argument('--check', action='store_true', help="Compte les cellules divergentes sans rien modifier.")
+
+    def handle(self, *args, **options):
+        if options['check']:
+            self.stdout.write(f"{stats.drift()} cellule(s) divergente(s).")
+            return
+        created = stats.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{created} cellules recalculées."))
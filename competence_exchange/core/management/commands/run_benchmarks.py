@@ -0,0 +1,59 @@
+import json
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, teardown_databases
+
+from core import benchmark, loadgen
+from core.management.commands.generate_load_data import add_dataset_arguments, dataset_options
+
+
+class Command(BaseCommand):
+    """
+    Mesure la latence (percentiles), le nombre de requêtes SQL et le pic mémoire de chaque route de core/urls.py.
+
+    Par défaut, la commande crée une base de test jetable, la peuple avec un jeu de données synthétique,
+    effectue les mesures puis détruit la base : la base courante n'est jamais modifiée. Les résultats sont
+    écrits en JSON pour être comparés d'un commit à l'autre avec --compare.
+    """
+    help = "Mesure les performances de chaque route sur un jeu de données synthétique."
+
+    def add_arguments(self, parser):
+        add_dataset_arguments(parser)
+        parser.add_argument('--iterations', type=int, default=20, help="Nombre de requêtes chronométrées par route.")
+        parser.add_argument('--route', action='append', dest='routes', help="Route à mesurer (répétable ; toutes par défaut).")
+        parser.add_argument('--output', help="Fichier JSON des résultats (sortie standard par défaut).")
+        parser.add_argument('--compare', help="Fichier JSON d'une exécution précédente à comparer.")
+        parser.add_argument('--threshold', type=float, default=0.2, help="Hausse relative du p95 considérée comme une régression.")
+        parser.add_argument('--fail-on-regression', action='store_true', help="Sortir en erreur en cas de régression.")
+
+    def handle(self, *args, **options):
+        known = {route.name for route in benchmark.ROUTES}
+        unknown = set(options['routes'] or ()) - known
+        if unknown:
+            raise CommandError(f"Routes inconnues : {', '.join(sorted(unknown))}")
+
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            dataset = dataset_options(options)
+            dataset['created'] = loadgen.generate(**dataset)
+            user = User.objects.filter(username=f"{options['prefix']}-0").get()
+            results = benchmark.run(user, options['iterations'], options['routes'], dataset)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        payload = json.dumps(results, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                stream.write(payload + '\n')
+        else:
+            self.stdout.write(payload)
+
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as stream:
+                previous = json.load(stream)
+            lines, regressions = benchmark.compare(previous, results, options['threshold'])
+            sys.stderr.write('\n'.join(lines) + '\n')
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f"Régressions : {', '.join(regressions)}")
@@ -0,0 +1,64 @@
+import json
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core import tasks
+
+
+class Command(BaseCommand):
+    """
+    Lance le worker de la file de tâches de fond (table Task, voir core.tasks), sans service externe.
+
+    Le worker s'arrête proprement sur SIGINT ou SIGTERM : les tâches en cours sont terminées, aucune
+    autre n'est prise en charge. Plusieurs workers (processus) peuvent tourner en même temps.
+
+    Au moins un worker doit tourner à côté du serveur : sans lui, les tâches restent en attente, les
+    longues séries de créneaux n'entrent pas dans l'index de correspondance (MatchIndexEntry) et les
+    courriels ne partent pas. Seul le mode immédiat (DJANGO_TASKS_EAGER=1) s'en passe.
+    """
+    help = "Exécute les tâches de fond (notifications, indexation) hors des requêtes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4, help="Nombre de tâches exécutées en parallèle.")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Attente maximale entre deux interrogations de la file (secondes).")
+        parser.add_argument('--max-tasks', type=int, help="S'arrête après ce nombre de tâches.")
+        parser.add_argument('--until-empty', action='store_true', help="S'arrête dès que la file est vide.")
+        parser.add_argument('--stats-interval', type=float, default=60.0, help="Intervalle d'affichage des mesures (secondes, 0 pour aucun).")
+
+    def _report(self):
+        """
+        Affiche les mesures du worker et l'état de la file.
+        """
+        try:
+            self.stdout.write(json.dumps({'worker': tasks.metrics.snapshot(), 'queue': tasks.queue_stats()}, ensure_ascii=False))
+        finally:
+            close_old_connections()
+
+    def handle(self, *args, **options):
+        worker = tasks.Worker(threads=options['threads'], poll_interval=options['poll_interval'])
+        previous_handlers = {
+            signum: signal.signal(signum, lambda *_: worker.stop()) for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+
+        stopped = threading.Event()
+        if options['stats_interval'] > 0:
+            def report_periodically():
+                while not stopped.wait(options['stats_interval']):
+                    self._report()
+            threading.Thread(target=report_periodically, daemon=True).start()
+
+        if settings.TASKS_EAGER:
+            self.stderr.write("TASKS_EAGER est activé : les tâches sont exécutées dans les requêtes, la file ne reçoit que les reprises.")
+        self.stdout.write(f"Worker {worker.worker_id} démarré ({worker.threads} threads).")
+        try:
+            processed = worker.run(max_tasks=options['max_tasks'], until_empty=options['until_empty'])
+        finally:
+            stopped.set()
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+        self.stdout.write(f"{processed} tâche(s) exécutée(s).")
+        self._report()
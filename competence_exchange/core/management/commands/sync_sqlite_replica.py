@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core import database
+
+
+class Command(BaseCommand):
+    """
+    Copie la base principale SQLite dans le fichier du réplica, par l'API de sauvegarde de SQLite.
+
+    Sert à essayer localement le routage des lectures avec deux fichiers SQLite, l'un tenant lieu de base
+    principale et l'autre de réplica (DJANGO_DB_REPLICA_NAME) : entre deux copies, le réplica est en retard,
+    comme un vrai réplica asynchrone.
+    """
+    help = "Copie la base principale SQLite dans le réplica SQLite."
+
+    def handle(self, *args, **options):
+        if not database.replica_available():
+            raise CommandError("Aucun réplica configuré (variable d'environnement DJANGO_DB_REPLICA_NAME).")
+        primary, replica = connections[DEFAULT_DB_ALIAS], connections[database.REPLICA]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError("La copie n'est possible qu'entre deux bases SQLite.")
+        primary.ensure_connection()
+        replica.ensure_connection()
+        primary.connection.backup(replica.connection)
+        self.stdout.write(self.style.SUCCESS(f"Base principale copiée dans {replica.settings_dict['NAME']}."))
@@ -0,0 +1,132 @@
+from django.db import transaction
+
+from . import tasks, versions
+from .models import Slot, Activity, MatchIndexEntry
+
+
+def _entries_for_slot(slot):
+    """
+    Construit les entrées d'index d'un créneau disponible (sans les enregistrer).
+    """
+    if slot.purpose == 'aid':
+        return [MatchIndexEntry(
+            competence_id=slot.competence_id, purpose='aid', date=slot.date, slot_id=slot.pk, owner_id=slot.user_id
+        )]
+    return [
+        MatchIndexEntry(
+            competence_id=activity['competence_needed_id'], purpose='request', date=slot.date,
+            slot_id=slot.pk, activity_id=activity['id'], owner_id=activity['requester_id'],
+        )
+        for activity in Activity.objects.filter(slot_id=slot.pk).values('id', 'competence_needed_id', 'requester_id')
+    ]
+
+
+def add_entries(slots, activities=()):
+    """
+    Indexe des créneaux et activités qui viennent d'être créés en masse, sans requête de lecture.
+
+    Args:
+        slots (list): Les créneaux créés, avec leur clé primaire.
+        activities (list): Les activités créées pour ces créneaux.
+    """
+    slots_by_id = {slot.pk: slot for slot in slots}
+    entries = [
+        MatchIndexEntry(
+            competence_id=slot.competence_id, purpose='aid', date=slot.date, slot_id=slot.pk, owner_id=slot.user_id
+        )
+        for slot in slots if slot.is_available and slot.purpose == 'aid'
+    ]
+    entries += [
+        MatchIndexEntry(
+            competence_id=activity.competence_needed_id, purpose='request', date=slots_by_id[activity.slot_id].date,
+            slot_id=activity.slot_id, activity_id=activity.pk, owner_id=activity.requester_id,
+        )
+        for activity in activities
+        if slots_by_id[activity.slot_id].is_available and slots_by_id[activity.slot_id].purpose == 'request'
+    ]
+    MatchIndexEntry.objects.bulk_create(entries)
+
+
+@tasks.task
+def index_new_slots(slot_ids):
+    """
+    Tâche de fond : indexe des créneaux créés en masse (et leurs activités), hors de la requête qui les
+    a créés. Les entrées éventuellement déjà présentes sont remplacées, de sorte qu'une tâche exécutée
+    de nouveau ne crée pas de doublons.
+
+    Args:
+        slot_ids (list): Les identifiants des créneaux créés.
+    """
+    slots = list(Slot.objects.filter(pk__in=slot_ids))
+    activities = list(Activity.objects.filter(slot_id__in=slot_ids))
+    MatchIndexEntry.objects.filter(slot_id__in=slot_ids).delete()
+    add_entries(slots, activities)
+    # Les pages de demandes et d'offres lisent l'index : leurs validateurs (ETag) doivent changer
+    # maintenant que les nouveaux créneaux y apparaissent, et pas seulement à leur création
+    versions.bump(Slot, Activity)
+
+
+def sync_slot(slot):
+    """
+    Met à jour les entrées d'index d'un créneau après une modification du créneau ou de ses activités.
+
+    Args:
+        slot (Slot): Le créneau à resynchroniser, dans son état actuel.
+    """
+    with transaction.atomic():
+        MatchIndexEntry.objects.filter(slot_id=slot.pk).delete()
+        if slot.is_available:
+            MatchIndexEntry.objects.bulk_create(_entries_for_slot(slot))
+
+
+def sync_activity(activity):
+    """
+    Met à jour les entrées d'index d'une activité, y compris si elle a changé de créneau.
+
+    Args:
+        activity (Activity): L'activité à resynchroniser, dans son état actuel.
+    """
+    with transaction.atomic():
+        MatchIndexEntry.objects.filter(activity_id=activity.pk).delete()
+        slot = Slot.objects.filter(pk=activity.slot_id).first()
+        if slot is not None:
+            sync_slot(slot)
+
+
+def rebuild(batch_size=1000):
+    """
+    Reconstruit entièrement l'index à partir des créneaux disponibles.
+
+    Args:
+        batch_size (int): Nombre d'entrées insérées par requête.
+
+    Returns :
+        int : Le nombre d'entrées créées.
+    """
+    aid_slots = Slot.objects.filter(is_available=True, purpose='aid').values_list(
+        'id', 'competence_id', 'date', 'user_id'
+    )
+    request_activities = Activity.objects.filter(slot__is_available=True, slot__purpose='request').values_list(
+        'id', 'competence_needed_id', 'slot__date', 'slot_id', 'requester_id'
+    )
+    created = 0
+    with transaction.atomic():
+        MatchIndexEntry.objects.all().delete()
+        batch = []
+        for slot_id, competence_id, slot_date, user_id in aid_slots.iterator(chunk_size=batch_size):
+            batch.append(MatchIndexEntry(
+                competence_id=competence_id, purpose='aid', date=slot_date, slot_id=slot_id, owner_id=user_id
+            ))
+            if len(batch) >= batch_size:
+                created += len(MatchIndexEntry.objects.bulk_create(batch))
+                batch = []
+        for activity_id, competence_id, slot_date, slot_id, requester_id in request_activities.iterator(chunk_size=batch_size):
+            batch.append(MatchIndexEntry(
+                competence_id=competence_id, purpose='request', date=slot_date,
+                slot_id=slot_id, activity_id=activity_id, owner_id=requester_id,
+            ))
+            if len(batch) >= batch_size:
+                created += len(MatchIndexEntry.objects.bulk_create(batch))
+                batch = []
+        created += len(MatchIndexEntry.objects.bulk_create(batch))
+    return created
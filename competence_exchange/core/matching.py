@@ -0,0 +1,153 @@
+from collections import defaultdict
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import MatchIndexEntry, MatchProposal
+
+
+def _augment(root, compatible, free, offer_to_request, request_to_offer):
+    """
+    Cherche, par un parcours en largeur, un chemin augmentant depuis la demande `root` jusqu'à une offre libre,
+    puis réaffecte les demandes le long du chemin.
+
+    Returns :
+        int : Le bit de l'offre libre utilisée, ou 0 si aucun chemin n'existe.
+    """
+    frontier = [root]
+    visited = 0
+    reached_by = {}
+    while frontier:
+        next_frontier = []
+        for request in frontier:
+            candidates = compatible[request] & ~visited
+            visited |= candidates
+            while candidates:
+                bit = candidates & -candidates
+                candidates ^= bit
+                offer = bit.bit_length() - 1
+                reached_by[offer] = request
+                if bit & free:
+                    # Remonte le chemin : chaque demande prend l'offre qui l'a atteinte
+                    while True:
+                        request = reached_by[offer]
+                        previous = request_to_offer.get(request)
+                        request_to_offer[request] = offer
+                        offer_to_request[offer] = request
+                        if request == root:
+                            return bit
+                        offer = previous
+                next_frontier.append(offer_to_request[offer])
+        frontier = next_frontier
+    return 0
+
+
+def match_bucket(requests, offers):
+    """
+    Couplage maximum entre les demandes et les offres d'une même compétence et d'une même date.
+
+    Une demande est compatible avec toutes les offres du groupe sauf celles de son propre auteur ;
+    la compatibilité est représentée par un masque de bits sur les offres, de sorte que le cas courant
+    (une offre libre et compatible) se résout en quelques opérations sur des entiers.
+
+    Args:
+        requests (list): Les couples (identifiant d'activité, auteur), triés.
+        offers (list): Les couples (identifiant de créneau, auteur), triés.
+
+    Returns :
+        list : Les couples (identifiant d'activité, identifiant de créneau) proposés.
+    """
+    all_offers = (1 << len(offers)) - 1
+    owner_masks = defaultdict(int)
+    for index, (_, owner) in enumerate(offers):
+        owner_masks[owner] |= 1 << index
+    compatible = [all_offers & ~owner_masks.get(owner, 0) for _, owner in requests]
+
+    free = all_offers
+    offer_to_request = {}
+    request_to_offer = {}
+    for request, mask in enumerate(compatible):
+        if not free:
+            break
+        available = mask & free
+        if available:
+            bit = available & -available
+            offer = bit.bit_length() - 1
+            offer_to_request[offer] = request
+            request_to_offer[request] = offer
+        else:
+            # Les seules offres libres sont celles de l'auteur : on tente de libérer une offre déjà attribuée
+            bit = _augment(request, compatible, free, offer_to_request, request_to_offer)
+        free &= ~bit
+    return [(requests[request][0], offers[offer][0]) for request, offer in sorted(request_to_offer.items())]
+
+
+def assign(requests, offers):
+    """
+    Associe des demandes d'aide à des créneaux d'aide de même compétence et de même date.
+
+    Les demandes et les offres sont regroupées par (compétence, date) en une passe, puis chaque groupe
+    est résolu indépendamment par `match_bucket` : aucune comparaison n'est faite entre groupes.
+
+    Args:
+        requests (iterable): Les tuples (identifiant d'activité, compétence, date, auteur).
+        offers (iterable): Les tuples (identifiant de créneau, compétence, date, auteur).
+
+    Returns :
+        list : Les couples (identifiant d'activité, identifiant de créneau) proposés.
+    """
+    offers_by_key = defaultdict(list)
+    for slot_id, competence_id, slot_date, owner_id in offers:
+        offers_by_key[competence_id, slot_date].append((slot_id, owner_id))
+    requests_by_key = defaultdict(list)
+    for activity_id, competence_id, slot_date, owner_id in requests:
+        if (competence_id, slot_date) in offers_by_key:
+            requests_by_key[competence_id, slot_date].append((activity_id, owner_id))
+
+    pairs = []
+    for key, bucket_requests in requests_by_key.items():
+        bucket_requests.sort()
+        pairs.extend(match_bucket(bucket_requests, sorted(offers_by_key[key])))
+    return pairs
+
+
+def run(batch_size=1000, dry_run=False):
+    """
+    Calcule les propositions de mise en relation pour toutes les demandes et offres ouvertes à venir.
+
+    Les propositions devenues caduques (créneau pris, fermé ou passé) sont supprimées, puis les demandes
+    et offres sans proposition sont lues dans l'index de correspondance et associées en mémoire. Le tout
+    s'exécute dans une seule transaction.
+
+    Args:
+        batch_size (int): Nombre de propositions insérées par requête.
+        dry_run (bool): Calculer les propositions sans les enregistrer.
+
+    Returns :
+        dict : Le nombre de demandes et d'offres examinées, de propositions créées et de propositions
+        caduques supprimées.
+    """
+    today = date.today()
+    with transaction.atomic():
+        stale = MatchProposal.objects.filter(
+            Q(offer__is_available=False) | Q(activity__slot__is_available=False)
+            | Q(activity__volunteer__isnull=False) | Q(offer__date__lt=today)
+        )
+        removed = stale.count() if dry_run else stale.delete()[0]
+
+        proposed = MatchProposal.objects.exclude(pk__in=stale.values('pk')) if dry_run else MatchProposal.objects.all()
+        requests = list(MatchIndexEntry.objects.filter(purpose='request', date__gte=today).exclude(
+            activity_id__in=proposed.values('activity_id')
+        ).values_list('activity_id', 'competence_id', 'date', 'owner_id'))
+        offers = list(MatchIndexEntry.objects.filter(purpose='aid', date__gte=today).exclude(
+            slot_id__in=proposed.values('offer_id')
+        ).values_list('slot_id', 'competence_id', 'date', 'owner_id'))
+
+        pairs = assign(requests, offers)
+        if not dry_run:
+            MatchProposal.objects.bulk_create(
+                [MatchProposal(activity_id=activity_id, offer_id=slot_id) for activity_id, slot_id in pairs],
+                batch_size=batch_size,
+            )
+    return {'requests': len(requests), 'offers': len(offers), 'proposals': len(pairs), 'removed': removed}
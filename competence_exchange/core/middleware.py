@@ -0,0 +1,109 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+from . import database
+from .performance import RequestMetrics, current_metrics, registry
+
+logger = logging.getLogger('core.performance')
+
+
+class PerformanceMiddleware:
+    """
+    Mesure chaque requête : durée totale, nombre et durée des requêtes SQL, durée du rendu des gabarits
+    et taille de la réponse.
+
+    Les requêtes SQL sont comptées par `core.performance.record_query`, installée sur chaque connexion :
+    sous ASGI, elles s'exécutent dans le thread de l'ORM et non dans celui du middleware, mais la
+    variable de contexte `current_metrics` y est propagée.
+
+    Les mesures sont renvoyées dans l'en-tête `Server-Timing`, agrégées par route dans
+    `core.performance.registry` (consultable via la vue `performance_stats`) et journalisées par le
+    logger `core.performance` : en DEBUG pour chaque requête, en WARNING au-delà de
+    `PERFORMANCE_SLOW_REQUEST_MS` millisecondes.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Sous ASGI, le middleware reste asynchrone pour ne pas forcer les vues asynchrones dans un thread
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.process_metrics(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.process_metrics(request, response, metrics, started)
+
+    def process_metrics(self, request, response, metrics, started):
+        """
+        Ajoute l'en-tête Server-Timing, enregistre les mesures de la requête et la journalise si besoin.
+        """
+        duration_ms = (time.perf_counter() - started) * 1000
+        db_ms = metrics.db_time * 1000
+        template_ms = metrics.template_time * 1000
+        size = 0 if response.streaming else len(response.content)
+
+        response['Server-Timing'] = (
+            f'total;dur={duration_ms:.1f}, '
+            f'db;dur={db_ms:.1f};desc="SQL ({metrics.queries})", '
+            f'tpl;dur={template_ms:.1f}'
+        )
+
+        match = getattr(request, 'resolver_match', None)
+        route = match.view_name if match else 'non résolue'
+        registry.record(route, duration_ms, metrics.queries, db_ms, template_ms, size)
+
+        slow_request_ms = getattr(settings, 'PERFORMANCE_SLOW_REQUEST_MS', 500)
+        level = logging.WARNING if duration_ms > slow_request_ms else logging.DEBUG
+        if logger.isEnabledFor(level):
+            logger.log(
+                level, "%s %s %s %.1fms db=%d/%.1fms tpl=%.1fms %doctets",
+                request.method, route, response.status_code, duration_ms, metrics.queries, db_ms, template_ms, size,
+                extra={
+                    'route': route, 'status': response.status_code, 'duration_ms': duration_ms,
+                    'queries': metrics.queries, 'db_ms': db_ms, 'template_ms': template_ms, 'size': size,
+                },
+            )
+        return response
+
+
+class PrimaryPinMiddleware(MiddlewareMixin):
+    """
+    Après une écriture (toute requête autre que GET, HEAD, OPTIONS ou TRACE, ou requête dont la vue a
+    appelé `core.database.wrote`), pose le cookie
+    `core.database.PIN_COOKIE` pour REPLICA_PIN_SECONDS secondes : les vues de liste de ce client lisent
+    alors la base principale, et il voit ses propres modifications malgré le retard du réplica.
+    Sans réplica configuré, le middleware n'a aucun effet.
+    """
+
+    def process_response(self, request, response):
+        wrote = request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE') or getattr(request, database.WRITE_ATTRIBUTE, False)
+        if wrote and database.replica_available():
+            response.set_cookie(
+                database.PIN_COOKIE, '1', max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 5),
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-17 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_category_alter_competence_options_activity_volunteer_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['competence_needed', 'requester'], name='activity_comp_requester_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['volunteer', 'competence_needed'], name='activity_volunteer_comp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='slot',
+            index=models.Index(fields=['is_available', 'purpose', 'date'], name='slot_avail_purpose_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='slot',
+            index=models.Index(condition=models.Q(('is_available', True), ('purpose', 'aid')), fields=['date', 'id'], name='slot_open_aid_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='slot',
+            index=models.Index(fields=['user', 'date'], name='slot_user_date_idx'),
+        ),
+    ]
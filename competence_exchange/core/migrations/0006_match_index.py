@@ -0,0 +1,55 @@
+# Generated by Django 4.2.16 on 2026-10-17 12:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_match_index(apps, schema_editor):
+    """
+    Indexe les créneaux ouverts existants.
+    """
+    Slot = apps.get_model('core', 'Slot')
+    Activity = apps.get_model('core', 'Activity')
+    MatchIndexEntry = apps.get_model('core', 'MatchIndexEntry')
+    entries = [
+        MatchIndexEntry(competence_id=slot.competence_id, purpose='aid', date=slot.date, slot_id=slot.pk, owner_id=slot.user_id)
+        for slot in Slot.objects.filter(is_available=True, purpose='aid').iterator()
+    ]
+    entries += [
+        MatchIndexEntry(
+            competence_id=activity.competence_needed_id, purpose='request', date=activity.slot.date,
+            slot_id=activity.slot_id, activity_id=activity.pk, owner_id=activity.requester_id,
+        )
+        for activity in Activity.objects.filter(slot__is_available=True, slot__purpose='request').select_related('slot').iterator()
+    ]
+    MatchIndexEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0005_slot_activity_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchIndexEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('purpose', models.CharField(choices=[('aid', 'Pour aider'), ('request', 'Demande d’aide')], max_length=10, verbose_name='Objectif')),
+                ('date', models.DateField(verbose_name='Date du créneau')),
+                ('activity', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='match_entries', to='core.activity')),
+                ('competence', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.competence')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('slot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_entries', to='core.slot')),
+            ],
+            options={
+                'verbose_name': "Entrée de l'index de correspondance",
+                'verbose_name_plural': "Entrées de l'index de correspondance",
+                'indexes': [models.Index(fields=['purpose', 'competence', 'date'], name='match_purpose_comp_date_idx')],
+            },
+        ),
+        migrations.RunPython(populate_match_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.16 on 2026-10-17 12:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_match_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchProposal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Créée le')),
+                ('activity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_proposals', to='core.activity')),
+                ('offer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_proposals', to='core.slot')),
+            ],
+            options={
+                'verbose_name': 'Proposition de mise en relation',
+                'verbose_name_plural': 'Propositions de mise en relation',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='matchproposal',
+            constraint=models.UniqueConstraint(fields=('activity',), name='match_proposal_unique_activity'),
+        ),
+        migrations.AddConstraint(
+            model_name='matchproposal',
+            constraint=models.UniqueConstraint(fields=('offer',), name='match_proposal_unique_offer'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.16 on 2026-10-17 12:58
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def create_model_versions(apps, schema_editor):
+    """
+    Initialise les compteurs de modifications des modèles suivis.
+    """
+    ModelVersion = apps.get_model('core', 'ModelVersion')
+    now = timezone.now()
+    ModelVersion.objects.bulk_create([
+        ModelVersion(label=label, version=1, changed_at=now)
+        for label in ('core.category', 'core.competence', 'core.slot', 'core.activity', 'core.profile')
+    ], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_match_proposal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelVersion',
+            fields=[
+                ('label', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Modèle')),
+                ('version', models.PositiveBigIntegerField(default=1, verbose_name='Version')),
+                ('changed_at', models.DateTimeField(verbose_name='Modifié le')),
+            ],
+            options={
+                'verbose_name': 'Version de modèle',
+                'verbose_name_plural': 'Versions de modèles',
+            },
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Modifiée le'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Modifiée le'),
+        ),
+        migrations.AddField(
+            model_name='competence',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Modifiée le'),
+        ),
+        migrations.AddField(
+            model_name='slot',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Modifié le'),
+        ),
+        migrations.RunPython(create_model_versions, migrations.RunPython.noop),
+    ]
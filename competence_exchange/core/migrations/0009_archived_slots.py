@@ -0,0 +1,54 @@
+# Generated by Django 4.2.16 on 2026-10-17 13:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0008_updated_at_and_model_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSlot',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name="Identifiant d'origine")),
+                ('date', models.DateField(verbose_name='Date du créneau')),
+                ('is_available', models.BooleanField(verbose_name='Disponible')),
+                ('purpose', models.CharField(choices=[('aid', 'Pour aider'), ('request', 'Demande d’aide')], max_length=10, verbose_name='Objectif')),
+                ('updated_at', models.DateTimeField(verbose_name='Modifié le')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Archivé le')),
+                ('competence', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_slots', to='core.competence')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_slots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Créneau archivé',
+                'verbose_name_plural': 'Créneaux archivés',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedActivity',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name="Identifiant d'origine")),
+                ('description', models.TextField(verbose_name="Description de l'activité")),
+                ('updated_at', models.DateTimeField(verbose_name='Modifiée le')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Archivée le')),
+                ('competence_needed', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_activities', to='core.competence')),
+                ('requester', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_requests', to=settings.AUTH_USER_MODEL)),
+                ('slot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activities', to='core.archivedslot')),
+                ('volunteer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_volunteerings', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Activité archivée',
+                'verbose_name_plural': 'Activités archivées',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedslot',
+            index=models.Index(fields=['user', 'date'], name='archived_slot_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,136 @@
+from django.db import migrations
+
+# Index plein texte SQLite FTS5 (voir core.search). Le tokeniseur unicode61 avec remove_diacritics 2
+# rend la recherche insensible à la casse et aux accents. Les index de préfixes de 2 à 6 caractères servent
+# l'autocomplétion : sans eux, FTS5 fusionne en mémoire les listes de tous les mots commençant par le
+# préfixe avant de renvoyer le premier résultat. Le rowid de chaque document est l'identifiant de la ligne.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE core_search_competence USING fts5(
+        name, category, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4 5 6'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE core_search_activity USING fts5(
+        competence, category, description, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4 5 6'
+    )
+    """,
+    # Pondération bm25 des colonnes, utilisée par ORDER BY rank
+    "INSERT INTO core_search_competence (core_search_competence, rank) VALUES ('rank', 'bm25(4.0, 1.0)')",
+    "INSERT INTO core_search_activity (core_search_activity, rank) VALUES ('rank', 'bm25(4.0, 2.0, 1.0)')",
+
+    # Compétences : le document reprend le nom de la catégorie
+    """
+    CREATE TRIGGER core_search_competence_insert AFTER INSERT ON core_competence BEGIN
+        INSERT INTO core_search_competence (rowid, name, category)
+        VALUES (new.id, new.name, (SELECT name FROM core_category WHERE id = new.category_id));
+    END
+    """,
+    """
+    CREATE TRIGGER core_search_competence_update AFTER UPDATE ON core_competence
+    WHEN old.name IS NOT new.name OR old.category_id IS NOT new.category_id BEGIN
+        DELETE FROM core_search_competence WHERE rowid = old.id;
+        INSERT INTO core_search_competence (rowid, name, category)
+        VALUES (new.id, new.name, (SELECT name FROM core_category WHERE id = new.category_id));
+        UPDATE core_search_activity
+        SET competence = new.name, category = (SELECT name FROM core_category WHERE id = new.category_id)
+        WHERE rowid IN (SELECT id FROM core_activity WHERE competence_needed_id = new.id AND volunteer_id IS NULL);
+    END
+    """,
+    """
+    CREATE TRIGGER core_search_competence_delete AFTER DELETE ON core_competence BEGIN
+        DELETE FROM core_search_competence WHERE rowid = old.id;
+    END
+    """,
+    # Catégories : renommage répercuté sur les documents de ses compétences et de leurs demandes
+    """
+    CREATE TRIGGER core_search_category_update AFTER UPDATE ON core_category
+    WHEN old.name IS NOT new.name BEGIN
+        UPDATE core_search_competence SET category = new.name
+        WHERE rowid IN (SELECT id FROM core_competence WHERE category_id = new.id);
+        UPDATE core_search_activity SET category = new.name
+        WHERE rowid IN (
+            SELECT core_activity.id FROM core_activity
+            JOIN core_competence ON core_competence.id = core_activity.competence_needed_id
+            WHERE core_competence.category_id = new.id AND core_activity.volunteer_id IS NULL
+        );
+    END
+    """,
+    # Activités : seules les demandes encore sans volontaire sont indexées
+    """
+    CREATE TRIGGER core_search_activity_insert AFTER INSERT ON core_activity
+    WHEN new.volunteer_id IS NULL BEGIN
+        INSERT INTO core_search_activity (rowid, competence, category, description)
+        SELECT new.id, core_competence.name, core_category.name, new.description
+        FROM core_competence LEFT JOIN core_category ON core_category.id = core_competence.category_id
+        WHERE core_competence.id = new.competence_needed_id;
+    END
+    """,
+    """
+    CREATE TRIGGER core_search_activity_update AFTER UPDATE ON core_activity
+    WHEN old.description IS NOT new.description OR old.competence_needed_id IS NOT new.competence_needed_id
+        OR old.volunteer_id IS NOT new.volunteer_id BEGIN
+        DELETE FROM core_search_activity WHERE rowid = old.id;
+        INSERT INTO core_search_activity (rowid, competence, category, description)
+        SELECT new.id, core_competence.name, core_category.name, new.description
+        FROM core_competence LEFT JOIN core_category ON core_category.id = core_competence.category_id
+        WHERE core_competence.id = new.competence_needed_id AND new.volunteer_id IS NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER core_search_activity_delete AFTER DELETE ON core_activity BEGIN
+        DELETE FROM core_search_activity WHERE rowid = old.id;
+    END
+    """,
+
+    # Indexation des lignes existantes
+    """
+    INSERT INTO core_search_competence (rowid, name, category)
+    SELECT core_competence.id, core_competence.name, core_category.name
+    FROM core_competence LEFT JOIN core_category ON core_category.id = core_competence.category_id
+    """,
+    """
+    INSERT INTO core_search_activity (rowid, competence, category, description)
+    SELECT core_activity.id, core_competence.name, core_category.name, core_activity.description
+    FROM core_activity
+    JOIN core_competence ON core_competence.id = core_activity.competence_needed_id
+    LEFT JOIN core_category ON core_category.id = core_competence.category_id
+    WHERE core_activity.volunteer_id IS NULL
+    """,
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS core_search_competence_insert",
+    "DROP TRIGGER IF EXISTS core_search_competence_update",
+    "DROP TRIGGER IF EXISTS core_search_competence_delete",
+    "DROP TRIGGER IF EXISTS core_search_category_update",
+    "DROP TRIGGER IF EXISTS core_search_activity_insert",
+    "DROP TRIGGER IF EXISTS core_search_activity_update",
+    "DROP TRIGGER IF EXISTS core_search_activity_delete",
+    "DROP TABLE IF EXISTS core_search_competence",
+    "DROP TABLE IF EXISTS core_search_activity",
+]
+
+
+def run_on_sqlite(statements):
+    """
+    Exécute les instructions sous SQLite seulement : les autres bases utilisent la recherche de repli
+    de core.search, sans index.
+    """
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_archived_slots'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_sqlite(CREATE_SQL), run_on_sqlite(DROP_SQL)),
+    ]
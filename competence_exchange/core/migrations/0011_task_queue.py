@@ -0,0 +1,65 @@
+# Generated by Django 4.2.16 on 2026-10-17 13:43
+
+from django.db import migrations, models
+
+# Les fusions de segments de l'index plein texte (voir 0010_search_index) ne sont plus faites pendant les
+# écritures des utilisateurs mais par la tâche de fond core.search.merge_index ; la fusion de secours
+# de FTS5 (crisismerge) reste active si le worker prend du retard.
+AUTOMERGE_SQL = [
+    "INSERT INTO core_search_competence (core_search_competence, rank) VALUES ('automerge', 0)",
+    "INSERT INTO core_search_activity (core_search_activity, rank) VALUES ('automerge', 0)",
+]
+RESTORE_AUTOMERGE_SQL = [
+    "INSERT INTO core_search_competence (core_search_competence, rank) VALUES ('automerge', 4)",
+    "INSERT INTO core_search_activity (core_search_activity, rank) VALUES ('automerge', 4)",
+]
+
+
+def run_on_sqlite(statements):
+    """
+    Exécute les instructions sous SQLite seulement (les autres bases n'ont pas d'index FTS5).
+    """
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Fonction')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Arguments')),
+                ('key', models.CharField(blank=True, max_length=200, null=True, verbose_name='Clé de dédoublonnage')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('running', 'En cours'), ('done', 'Terminée'), ('failed', 'En échec')], default='pending', max_length=10, verbose_name='État')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Exécutions')),
+                ('max_attempts', models.PositiveIntegerField(default=5, verbose_name='Exécutions maximales')),
+                ('run_at', models.DateTimeField(verbose_name='Exécutable à partir de')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Prise en charge le')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Terminée le')),
+                ('last_error', models.TextField(blank=True, verbose_name='Dernière erreur')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Créée le')),
+            ],
+            options={
+                'verbose_name': 'Tâche de fond',
+                'verbose_name_plural': 'Tâches de fond',
+                'indexes': [models.Index(fields=['status', 'run_at'], name='task_status_run_at_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('key',), name='task_pending_key_unique'),
+        ),
+        migrations.RunPython(run_on_sqlite(AUTOMERGE_SQL), run_on_sqlite(RESTORE_AUTOMERGE_SQL)),
+    ]
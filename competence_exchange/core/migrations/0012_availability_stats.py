@@ -0,0 +1,48 @@
+# Generated by Django 4.2.16 on 2026-10-17 13:59
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncWeek
+import django.db.models.deletion
+
+
+def build_stats(apps, schema_editor):
+    """
+    Calcule les statistiques des créneaux existants (comme `core.stats.rebuild`).
+    """
+    Slot = apps.get_model('core', 'Slot')
+    AvailabilityStat = apps.get_model('core', 'AvailabilityStat')
+    rows = Slot.objects.filter(is_available=True).annotate(week=TruncWeek('date')).values('competence_id', 'week').annotate(
+        open_offers=Count('id', filter=Q(purpose='aid')), open_requests=Count('id', filter=Q(purpose='request')),
+    ).order_by()
+    AvailabilityStat.objects.bulk_create([AvailabilityStat(**row) for row in rows.iterator()], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_task_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvailabilityStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.DateField(verbose_name='Semaine (lundi)')),
+                ('open_offers', models.IntegerField(default=0, verbose_name='Offres ouvertes')),
+                ('open_requests', models.IntegerField(default=0, verbose_name='Demandes ouvertes')),
+                ('competence', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_stats', to='core.competence')),
+            ],
+            options={
+                'verbose_name': 'Statistique de disponibilité',
+                'verbose_name_plural': 'Statistiques de disponibilité',
+                'indexes': [models.Index(fields=['week'], name='stat_week_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='availabilitystat',
+            constraint=models.UniqueConstraint(fields=('competence', 'week'), name='stat_competence_week_unique'),
+        ),
+        migrations.RunPython(build_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-17 14:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_availability_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='slot',
+            index=models.Index(fields=['date'], name='slot_date_idx'),
+        ),
+    ]
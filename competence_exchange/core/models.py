@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Prefetch
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
@@ -11,8 +12,10 @@ class Category(models.Model):
 
     Attributes :
         name (CharField): Le nom de la catégorie.
+        updated_at (DateTimeField): Date de dernière modification.
     """
     name = models.CharField("Nom de la catégorie", max_length=100, unique=True)
+    updated_at = models.DateTimeField("Modifiée le", auto_now=True)
 
     def __str__(self):
         return self.name
@@ -29,14 +32,44 @@ class Competence(models.Model):
     Attributes :
         name (CharField): Le nom de la compétence.
         Category (ForeignKey): La catégorie associée à cette compétence.
+        updated_at (DateTimeField): Date de dernière modification.
     """
     name = models.CharField("Nom de la compétence", max_length=100, unique=True)
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name='competences')
+    updated_at = models.DateTimeField("Modifiée le", auto_now=True)
 
     def __str__(self):
         return self.name
 
 
+class SlotQuerySet(models.QuerySet):
+    """
+    QuerySet partagé par les vues listant des créneaux.
+    """
+
+    def with_related(self):
+        """
+        Charge en une jointure la compétence et l'utilisateur du créneau.
+
+        Returns :
+            SlotQuerySet : Le QuerySet enrichi.
+        """
+        return self.select_related('competence', 'user')
+
+    def with_first_activity(self):
+        """
+        Précharge en une seule requête la première activité de chaque créneau,
+        avec son demandeur et son volontaire.
+
+        Returns :
+            SlotQuerySet : Le QuerySet enrichi, dont chaque créneau expose `first_activity`.
+        """
+        first_activity = Activity.objects.select_related('requester', 'volunteer').order_by('pk')[:1]
+        return self.prefetch_related(
+            Prefetch('activity_set', queryset=first_activity, to_attr='prefetched_activities')
+        )
+
+
 class Slot(models.Model):
     """
     Modèle représentant un créneau de disponibilité d'un utilisateur.
@@ -47,6 +80,7 @@ class Slot(models.Model):
         competence (ForeignKey): Compétence liée au créneau.
         is_available (BooleanField): Indicateur de disponibilité du créneau.
         purpose (CharField): Indique si le créneau est pour aider ou pour demander de l'aide.
+        updated_at (DateTimeField): Date de dernière modification.
     """
     PURPOSE_CHOICES = [
         ('aid', 'Pour aider'),
@@ -58,10 +92,56 @@ class Slot(models.Model):
     competence = models.ForeignKey('Competence', on_delete=models.CASCADE, related_name='slots')
     is_available = models.BooleanField("Disponible", default=True)
     purpose = models.CharField("Objectif", max_length=10, choices=PURPOSE_CHOICES, default='aid')
+    updated_at = models.DateTimeField("Modifié le", auto_now=True)
+
+    objects = SlotQuerySet.as_manager()
+
+    @property
+    def first_activity(self):
+        """
+        Retourne la première activité liée au créneau, ou None.
+
+        Utilise le préchargement de `SlotQuerySet.with_first_activity` lorsqu'il est disponible,
+        sinon effectue une requête.
+        """
+        if hasattr(self, 'prefetched_activities'):
+            return self.prefetched_activities[0] if self.prefetched_activities else None
+        return self.activity_set.first()
 
     def __str__(self):
         return f"{self.date} - {self.competence.name} - {'Disponible' if self.is_available else 'Indisponible'} - {self.get_purpose_display()}"
 
+    class Meta:
+        indexes = [
+            # Filtre (is_available, purpose) + tri par date des listes de créneaux ouverts
+            models.Index(fields=['is_available', 'purpose', 'date'], name='slot_avail_purpose_date_idx'),
+            # Index partiel restreint aux offres d'aide ouvertes, dans l'ordre (date, id) de la pagination
+            models.Index(
+                fields=['date', 'id'],
+                condition=models.Q(is_available=True, purpose='aid'),
+                name='slot_open_aid_date_idx',
+            ),
+            # Créneaux d'un utilisateur triés par date (my_slots)
+            models.Index(fields=['user', 'date'], name='slot_user_date_idx'),
+            # Bornes de la hiérarchie de dates de l'administration, créneaux passés à archiver
+            models.Index(fields=['date'], name='slot_date_idx'),
+        ]
+
+
+class ActivityQuerySet(models.QuerySet):
+    """
+    QuerySet partagé par les vues listant des activités.
+    """
+
+    def with_related(self):
+        """
+        Charge en une jointure la compétence, le créneau, le demandeur et le volontaire.
+
+        Returns :
+            ActivityQuerySet : Le QuerySet enrichi.
+        """
+        return self.select_related('competence_needed', 'slot', 'requester', 'volunteer')
+
 
 class Activity(models.Model):
     """
@@ -73,6 +153,7 @@ class Activity(models.Model):
         competence_needed (ForeignKey): Compétence requise pour cette activité.
         slot (ForeignKey): Le créneau associé à la demande d'aide.
         volunteer (ForeignKey): L'utilisateur qui se propose pour aider.
+        updated_at (DateTimeField): Date de dernière modification.
     """
     description = models.TextField("Description de l'activité")
     requester = models.ForeignKey(User, on_delete=models.CASCADE, related_name='requested_activities')
@@ -86,6 +167,9 @@ class Activity(models.Model):
         related_name='volunteered_activities',
         verbose_name="Utilisateur qui se propose pour aider"
     )
+    updated_at = models.DateTimeField("Modifiée le", auto_now=True)
+
+    objects = ActivityQuerySet.as_manager()
 
     def __str__(self):
         return f"Activité : {self.description} - Compétence requise : {self.competence_needed.name}"
@@ -93,6 +177,12 @@ class Activity(models.Model):
     class Meta:
         verbose_name = "Activité"
         verbose_name_plural = "Activités"
+        indexes = [
+            # Demandes d'aide par compétence en excluant le demandeur (help_requests)
+            models.Index(fields=['competence_needed', 'requester'], name='activity_comp_requester_idx'),
+            # Demandes où l'utilisateur est déjà volontaire, par compétence (help_requests)
+            models.Index(fields=['volunteer', 'competence_needed'], name='activity_volunteer_comp_idx'),
+        ]
 
 
 class Profile(models.Model):
@@ -110,12 +200,264 @@ class Profile(models.Model):
         return f"Profil de {self.user.username}"
 
 
+class ModelVersion(models.Model):
+    """
+    Compteur de modifications d'un modèle, incrémenté à chaque création, modification ou suppression
+    d'une de ses lignes (voir `core.versions`). Contrairement à un MAX(updated_at), il change aussi
+    lors d'une suppression ; il sert à calculer les ETag et Last-Modified des pages.
+
+    Attributes:
+        label (CharField): L'étiquette du modèle, par exemple 'core.slot'.
+        version (PositiveBigIntegerField): Le nombre de modifications.
+        changed_at (DateTimeField): Date de la dernière modification.
+    """
+    label = models.CharField("Modèle", max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField("Version", default=1)
+    changed_at = models.DateTimeField("Modifié le")
+
+    def __str__(self):
+        return f"{self.label} v{self.version}"
+
+    class Meta:
+        verbose_name = "Version de modèle"
+        verbose_name_plural = "Versions de modèles"
+
+
+class MatchIndexEntry(models.Model):
+    """
+    Index dénormalisé des créneaux ouverts, indexé par compétence, utilisé pour retrouver rapidement
+    les demandes d'aide et les offres d'aide correspondant aux compétences d'un utilisateur.
+
+    Une entrée existe pour chaque créneau d'aide disponible et pour chaque activité d'un créneau
+    de demande disponible. L'index est maintenu par les signaux de `core.signals` (et, pour les créneaux
+    créés en masse, par la tâche de fond `core.match_index.index_new_slots`) et peut être reconstruit
+    avec la commande `rebuild_match_index`.
+
+    Attributes:
+        competence (ForeignKey): Compétence offerte (créneau d'aide) ou requise (activité).
+        purpose (CharField): Objectif du créneau ('aid' ou 'request').
+        date (DateField): Date du créneau.
+        slot (ForeignKey): Le créneau ouvert.
+        activity (ForeignKey): L'activité du créneau de demande, vide pour un créneau d'aide.
+        owner (ForeignKey): L'utilisateur qui propose l'aide ou qui la demande.
+    """
+    competence = models.ForeignKey(Competence, on_delete=models.CASCADE, related_name='+')
+    purpose = models.CharField("Objectif", max_length=10, choices=Slot.PURPOSE_CHOICES)
+    date = models.DateField("Date du créneau")
+    slot = models.ForeignKey(Slot, on_delete=models.CASCADE, related_name='match_entries')
+    activity = models.ForeignKey(Activity, on_delete=models.CASCADE, null=True, blank=True, related_name='match_entries')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+
+    def __str__(self):
+        return f"{self.get_purpose_display()} - {self.competence_id} - {self.date}"
+
+    class Meta:
+        verbose_name = "Entrée de l'index de correspondance"
+        verbose_name_plural = "Entrées de l'index de correspondance"
+        indexes = [
+            models.Index(fields=['purpose', 'competence', 'date'], name='match_purpose_comp_date_idx'),
+        ]
+
+
+class MatchProposal(models.Model):
+    """
+    Proposition de mise en relation calculée par le moteur de correspondance (`core.matching`) entre une
+    demande d'aide et un créneau d'aide de même compétence et de même date.
+
+    Attributes:
+        activity (ForeignKey): La demande d'aide.
+        offer (ForeignKey): Le créneau d'aide proposé.
+        created_at (DateTimeField): Date de création de la proposition.
+    """
+    activity = models.ForeignKey(Activity, on_delete=models.CASCADE, related_name='match_proposals')
+    offer = models.ForeignKey(Slot, on_delete=models.CASCADE, related_name='match_proposals')
+    created_at = models.DateTimeField("Créée le", auto_now_add=True)
+
+    def __str__(self):
+        return f"Proposition : activité {self.activity_id} - créneau {self.offer_id}"
+
+    class Meta:
+        verbose_name = "Proposition de mise en relation"
+        verbose_name_plural = "Propositions de mise en relation"
+        constraints = [
+            models.UniqueConstraint(fields=['activity'], name='match_proposal_unique_activity'),
+            models.UniqueConstraint(fields=['offer'], name='match_proposal_unique_offer'),
+        ]
+
+
+class ArchivedSlot(models.Model):
+    """
+    Créneau passé, déplacé hors de la table des créneaux par la commande `archive_past_slots`
+    (voir `core.archive`) pour que les vues ne parcourent que les créneaux en cours.
+
+    Attributes:
+        id (BigIntegerField): L'identifiant d'origine du créneau.
+        date (DateField): La date du créneau.
+        user (ForeignKey): L'utilisateur qui proposait ou demandait de l'aide.
+        competence (ForeignKey): Compétence liée au créneau.
+        is_available (BooleanField): Disponibilité du créneau au moment de l'archivage.
+        purpose (CharField): Objectif du créneau.
+        updated_at (DateTimeField): Date de dernière modification du créneau.
+        archived_at (DateTimeField): Date de l'archivage.
+    """
+    id = models.BigIntegerField("Identifiant d'origine", primary_key=True)
+    date = models.DateField("Date du créneau")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_slots')
+    competence = models.ForeignKey(Competence, on_delete=models.CASCADE, related_name='archived_slots')
+    is_available = models.BooleanField("Disponible")
+    purpose = models.CharField("Objectif", max_length=10, choices=Slot.PURPOSE_CHOICES)
+    updated_at = models.DateTimeField("Modifié le")
+    archived_at = models.DateTimeField("Archivé le", auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.date} - {self.competence_id} - {self.get_purpose_display()} (archivé)"
+
+    class Meta:
+        verbose_name = "Créneau archivé"
+        verbose_name_plural = "Créneaux archivés"
+        indexes = [
+            models.Index(fields=['user', 'date'], name='archived_slot_user_date_idx'),
+        ]
+
+
+class ArchivedActivity(models.Model):
+    """
+    Activité d'un créneau archivé (voir ArchivedSlot).
+
+    Attributes:
+        id (BigIntegerField): L'identifiant d'origine de l'activité.
+        description (TextField): La description de l'activité.
+        requester (ForeignKey): L'utilisateur qui demandait l'aide.
+        competence_needed (ForeignKey): Compétence requise.
+        slot (ForeignKey): Le créneau archivé associé.
+        volunteer (ForeignKey): L'utilisateur qui s'était proposé, le cas échéant.
+        updated_at (DateTimeField): Date de dernière modification de l'activité.
+        archived_at (DateTimeField): Date de l'archivage.
+    """
+    id = models.BigIntegerField("Identifiant d'origine", primary_key=True)
+    description = models.TextField("Description de l'activité")
+    requester = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_requests')
+    competence_needed = models.ForeignKey(Competence, on_delete=models.CASCADE, related_name='archived_activities')
+    slot = models.ForeignKey(ArchivedSlot, on_delete=models.CASCADE, related_name='activities')
+    volunteer = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_volunteerings',
+    )
+    updated_at = models.DateTimeField("Modifiée le")
+    archived_at = models.DateTimeField("Archivée le", auto_now_add=True)
+
+    def __str__(self):
+        return f"Activité archivée : {self.description}"
+
+    class Meta:
+        verbose_name = "Activité archivée"
+        verbose_name_plural = "Activités archivées"
+
+
+class Task(models.Model):
+    """
+    Tâche de fond durable, exécutée hors du cycle de la requête par un worker (voir `core.tasks`).
+
+    La tâche est insérée dans la transaction de l'opération qui la demande : elle n'existe que si
+    cette opération est validée, et survit à un redémarrage du serveur jusqu'à son exécution.
+
+    Attributes:
+        name (CharField): Chemin de la fonction à exécuter (décorée par `core.tasks.task`).
+        payload (JSONField): Arguments nommés de la fonction.
+        key (CharField): Clé de dédoublonnage : une seule tâche en attente par clé.
+        status (CharField): État de la tâche.
+        attempts (PositiveIntegerField): Nombre d'exécutions commencées.
+        max_attempts (PositiveIntegerField): Nombre maximal d'exécutions avant l'échec définitif.
+        run_at (DateTimeField): Date à partir de laquelle la tâche peut être exécutée.
+        locked_by (CharField): Identifiant du worker qui exécute la tâche.
+        locked_at (DateTimeField): Date de prise en charge par le worker.
+        finished_at (DateTimeField): Date de fin (succès ou échec définitif).
+        last_error (TextField): Dernière erreur rencontrée.
+        created_at (DateTimeField): Date de création.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'En attente'),
+        (RUNNING, 'En cours'),
+        (DONE, 'Terminée'),
+        (FAILED, 'En échec'),
+    ]
+
+    name = models.CharField("Fonction", max_length=200)
+    payload = models.JSONField("Arguments", default=dict, blank=True)
+    key = models.CharField("Clé de dédoublonnage", max_length=200, null=True, blank=True)
+    status = models.CharField("État", max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField("Exécutions", default=0)
+    max_attempts = models.PositiveIntegerField("Exécutions maximales", default=5)
+    run_at = models.DateTimeField("Exécutable à partir de")
+    locked_by = models.CharField("Worker", max_length=100, blank=True)
+    locked_at = models.DateTimeField("Prise en charge le", null=True, blank=True)
+    finished_at = models.DateTimeField("Terminée le", null=True, blank=True)
+    last_error = models.TextField("Dernière erreur", blank=True)
+    created_at = models.DateTimeField("Créée le", auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
+
+    class Meta:
+        verbose_name = "Tâche de fond"
+        verbose_name_plural = "Tâches de fond"
+        indexes = [
+            # Sélection des tâches exécutables par le worker, et des tâches bloquées ou terminées à purger
+            models.Index(fields=['status', 'run_at'], name='task_status_run_at_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['key'], condition=models.Q(status='pending'), name='task_pending_key_unique',
+            ),
+        ]
+
+
+class AvailabilityStat(models.Model):
+    """
+    Statistique matérialisée : nombre de créneaux ouverts par compétence et par semaine, pour l'offre
+    (créneaux d'aide) et la demande (créneaux de demande d'aide).
+
+    Les compteurs sont tenus à jour par les signaux de `core.signals` et, pour les écritures qui n'en
+    déclenchent pas, directement par `core.stats.apply` ; la commande `rebuild_stats` les recalcule à
+    partir des créneaux.
+
+    Attributes:
+        competence (ForeignKey): La compétence des créneaux.
+        week (DateField): Le lundi de la semaine des créneaux.
+        open_offers (IntegerField): Nombre de créneaux d'aide disponibles.
+        open_requests (IntegerField): Nombre de créneaux de demande d'aide disponibles.
+    """
+    competence = models.ForeignKey(Competence, on_delete=models.CASCADE, related_name='availability_stats')
+    week = models.DateField("Semaine (lundi)")
+    open_offers = models.IntegerField("Offres ouvertes", default=0)
+    open_requests = models.IntegerField("Demandes ouvertes", default=0)
+
+    def __str__(self):
+        return f"{self.competence_id} - {self.week} : {self.open_offers} offre(s), {self.open_requests} demande(s)"
+
+    class Meta:
+        verbose_name = "Statistique de disponibilité"
+        verbose_name_plural = "Statistiques de disponibilité"
+        indexes = [
+            # Tableaux de bord et badges : les semaines à partir de la semaine courante
+            models.Index(fields=['week'], name='stat_week_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['competence', 'week'], name='stat_competence_week_unique'),
+        ]
+
+
 @receiver(post_save, sender=User)
-def create_or_update_user_profile(sender, instance, created, **kwargs):
+def create_user_profile(sender, instance, created, **kwargs):
     """
-    Signal unique pour créer ou mettre à jour le profil de l'utilisateur.
+    Signal unique pour créer le profil d'un nouvel utilisateur.
+
+    Le profil ne reprend aucune donnée de l'utilisateur : les enregistrements suivants (dont la mise à
+    jour de `last_login` à chaque connexion) n'ont rien à y écrire. Les créations groupées, qui ne
+    déclenchent pas ce signal, passent par `core.profiles.bulk_create_users`.
     """
     if created:
         Profile.objects.create(user=instance)
-    else:
-        instance.profile.save()
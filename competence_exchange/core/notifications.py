@@ -0,0 +1,32 @@
+from django.core.mail import send_mail
+from django.urls import reverse
+
+from . import tasks
+from .models import Activity
+
+
+@tasks.task
+def notify_volunteer(activity_id):
+    """
+    Tâche de fond : prévient par courriel le demandeur qu'un volontaire s'est proposé pour sa demande.
+
+    La tâche ne fait rien si l'activité a été supprimée entre-temps, n'a plus de volontaire, ou si le
+    demandeur n'a pas d'adresse électronique.
+
+    Args:
+        activity_id (int): L'identifiant de l'activité prise en charge.
+    """
+    activity = Activity.objects.select_related('requester', 'volunteer', 'competence_needed', 'slot').filter(
+        pk=activity_id
+    ).first()
+    if activity is None or activity.volunteer is None or not activity.requester.email:
+        return
+    send_mail(
+        "Un volontaire pour votre demande d'aide",
+        f"Bonjour {activity.requester.username},\n\n"
+        f"{activity.volunteer.username} s'est proposé pour votre demande « {activity.description} » "
+        f"({activity.competence_needed.name}, le {activity.slot.date:%d/%m/%Y}).\n"
+        f"Ses coordonnées : {reverse('contact_info', args=[activity.pk])}\n",
+        None,
+        [activity.requester.email],
+    )
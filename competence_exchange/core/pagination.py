@@ -0,0 +1,211 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Min, Q
+from django.utils.functional import cached_property
+
+# Nombre de lignes jusqu'auquel EstimatedCountPaginator compte exactement
+EXACT_COUNT_LIMIT = 10_000
+
+
+class InvalidCursor(ValueError):
+    """
+    Exception levée lorsqu'un curseur de pagination ne peut pas être décodé.
+    """
+
+
+class KeysetPage:
+    """
+    Page de résultats renvoyée par `KeysetPaginator`.
+
+    Attributes:
+        object_list (list): Les objets de la page.
+        next_cursor (str | None): Le curseur de la page suivante, ou None s'il n'y en a pas.
+    """
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Pagination par curseur (« keyset ») sur un ensemble ordonné de champs, par exemple (date, id).
+
+    Contrairement à une pagination par OFFSET, chaque page est obtenue par un filtre
+    « strictement après le dernier élément vu », ce qui coûte O(taille de la page) avec
+    un index adapté et reste stable lorsque des lignes sont insérées entre deux pages.
+    Le dernier champ de l'ordre doit être unique (typiquement `id`).
+
+    Attributes:
+        queryset (QuerySet): Le QuerySet à paginer, sans tri.
+        ordering (tuple): Les champs de tri, éventuellement préfixés par '-' pour un tri décroissant.
+        per_page (int): Le nombre d'éléments par page.
+    """
+
+    def __init__(self, queryset, ordering=('date', 'id'), per_page=50):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self.fields = [self._resolve_field(name.lstrip('-')) for name in self.ordering]
+
+    def _resolve_field(self, path):
+        """
+        Retrouve le champ de modèle correspondant à un chemin de lookup (ex. 'slot__date').
+        """
+        model = self.queryset.model
+        parts = path.split('__')
+        for part in parts[:-1]:
+            model = model._meta.get_field(part).related_model
+        if parts[-1] == 'pk':
+            return model._meta.pk
+        return model._meta.get_field(parts[-1])
+
+    def encode_cursor(self, obj):
+        """
+        Construit le curseur désignant la position juste après `obj` (une instance ou un dictionnaire `values()`).
+        """
+        values = []
+        for name in self.ordering:
+            if isinstance(obj, dict):
+                # Ligne d'un QuerySet `values()`, indexée par chemin de lookup
+                value = obj[name.lstrip('-')]
+            else:
+                value = obj
+                for part in name.lstrip('-').split('__'):
+                    value = getattr(value, part)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        raw = json.dumps(values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """
+        Décode un curseur en la liste des valeurs des champs de tri.
+
+        Raises :
+            InvalidCursor : Si le curseur est malformé.
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise InvalidCursor(cursor)
+            return [field.to_python(value) for field, value in zip(self.fields, values)]
+        except (ValueError, TypeError, ValidationError) as exc:
+            raise InvalidCursor(cursor) from exc
+
+    def _after(self, values):
+        """
+        Construit le filtre « strictement après » les valeurs données, dans l'ordre de tri.
+        """
+        condition = Q()
+        for index, name in enumerate(self.ordering):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            step = Q(**{f'{field}__{lookup}': values[index]})
+            for previous_name, previous_value in zip(self.ordering[:index], values[:index]):
+                step &= Q(**{previous_name.lstrip('-'): previous_value})
+            condition |= step
+        return condition
+
+    def _page_queryset(self, cursor):
+        """
+        QuerySet de la page qui suit le curseur, avec un élément de plus pour savoir s'il existe une page suivante.
+        """
+        queryset = self.queryset.order_by(*self.ordering)
+        if cursor:
+            queryset = queryset.filter(self._after(self.decode_cursor(cursor)))
+        return queryset[:self.per_page + 1]
+
+    def _build_page(self, object_list):
+        """
+        Construit la page à partir des éléments lus (au plus per_page + 1).
+        """
+        next_cursor = None
+        if len(object_list) > self.per_page:
+            object_list = object_list[:self.per_page]
+            next_cursor = self.encode_cursor(object_list[-1])
+        return KeysetPage(object_list, next_cursor)
+
+    def get_page(self, cursor=None):
+        """
+        Retourne la page qui suit le curseur donné, ou la première page si `cursor` est vide.
+
+        Args:
+            cursor (str | None): Le curseur renvoyé par la page précédente.
+
+        Returns :
+            KeysetPage : La page demandée.
+
+        Raises :
+            InvalidCursor : Si le curseur est malformé.
+        """
+        return self._build_page(list(self._page_queryset(cursor)))
+
+    async def aget_page(self, cursor=None):
+        """
+        Variante asynchrone de `get_page`, pour les vues asynchrones.
+
+        Raises :
+            InvalidCursor : Si le curseur est malformé.
+        """
+        return self._build_page([obj async for obj in self._page_queryset(cursor)])
+
+
+def estimated_count(model, using):
+    """
+    Estime le nombre de lignes de la table d'un modèle sans la parcourir : à partir des statistiques du
+    planificateur sous PostgreSQL, de l'étendue des clés primaires sous SQLite (deux lectures de l'index
+    de la clé primaire ; les lignes supprimées, par exemple archivées, sont comptées tant que des clés
+    plus petites et plus grandes existent). Les autres bases comptent exactement.
+
+    Returns :
+        int : Le nombre de lignes estimé.
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+            row = cursor.fetchone()
+        # reltuples vaut -1 (ou 0) tant que la table n'a pas été analysée
+        if row and row[0] > 0:
+            return int(row[0])
+    elif connection.vendor == 'sqlite':
+        # Deux requêtes : SQLite ne lit l'extrémité de l'index que pour un MIN ou un MAX seul
+        rows = model._default_manager.using(using)
+        low = rows.aggregate(low=Min('pk'))['low']
+        return 0 if low is None else rows.aggregate(high=Max('pk'))['high'] - low + 1
+    return model._default_manager.using(using).count()
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginateur des listes de l'administration pour les grandes tables : évite le COUNT(*) complet que
+    fait le paginateur de Django à chaque affichage.
+
+    Le nombre de lignes est compté exactement jusqu'à EXACT_COUNT_LIMIT, par un COUNT sur une
+    sous-requête limitée (qui s'arrête à la limite). Au-delà, il est estimé pour la table entière
+    (`estimated_count`) ; une liste filtrée n'annonce que la limite, et l'on affine alors les filtres.
+    """
+    exact_limit = EXACT_COUNT_LIMIT
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        bounded = queryset.order_by()[:self.exact_limit + 1].count()
+        if bounded <= self.exact_limit or queryset.query.has_filters():
+            return bounded
+        return max(estimated_count(queryset.model, queryset.db), bounded)
@@ -0,0 +1,183 @@
+import bisect
+import contextvars
+import threading
+import time
+from collections import deque
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+# Bornes supérieures (en millisecondes) des classes de l'histogramme des durées
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, float('inf'))
+
+# Nombre de requêtes récentes conservées par route pour le calcul des percentiles
+WINDOW_SIZE = 1000
+
+
+class RequestMetrics:
+    """
+    Mesures d'une requête HTTP en cours, accumulées par la connexion à la base et le moteur de gabarits.
+
+    Attributes:
+        queries (int): Nombre de requêtes SQL exécutées.
+        db_time (float): Temps passé dans la base, en secondes.
+        template_time (float): Temps de rendu des gabarits, en secondes.
+    """
+    __slots__ = ('queries', 'db_time', 'template_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """
+        Enveloppe d'exécution SQL (voir `connection.execute_wrapper`) qui chronomètre chaque requête.
+        """
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+# Mesures de la requête en cours, isolées par thread et par tâche asynchrone
+current_metrics = contextvars.ContextVar('current_metrics', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Enveloppe d'exécution SQL installée une fois pour toutes sur chaque connexion : la requête est
+    chronométrée pour la requête HTTP en cours, s'il y en a une.
+    """
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_query_wrapper(connection):
+    """
+    Installe `record_query` sur une connexion à la base, si ce n'est pas déjà fait.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedTemplate(Template):
+    """
+    Gabarit dont la durée de rendu est ajoutée aux mesures de la requête en cours.
+    """
+
+    def render(self, context=None, request=None):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    Moteur de gabarits Django qui chronomètre le rendu des gabarits de premier niveau
+    (les gabarits inclus ou étendus sont comptés dans le rendu de leur parent).
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class RouteStats:
+    """
+    Statistiques glissantes des requêtes d'une route : histogramme des durées depuis le démarrage du
+    processus et fenêtre des WINDOW_SIZE dernières requêtes pour les percentiles.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.buckets = [0] * len(BUCKETS_MS)
+        self.recent = deque(maxlen=WINDOW_SIZE)
+
+    def add(self, duration_ms, queries, db_ms, template_ms, size):
+        """
+        Ajoute les mesures d'une requête.
+        """
+        self.count += 1
+        self.buckets[bisect.bisect_left(BUCKETS_MS, duration_ms)] += 1
+        self.recent.append((duration_ms, queries, db_ms, template_ms, size))
+
+    def snapshot(self):
+        """
+        Retourne les statistiques sous forme de dictionnaire sérialisable.
+        """
+        durations = sorted(sample[0] for sample in self.recent)
+        window = len(self.recent) or 1
+
+        def percentile(fraction):
+            return round(durations[min(int(len(durations) * fraction), len(durations) - 1)], 2) if durations else 0.0
+
+        return {
+            'count': self.count,
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'mean_queries': round(sum(sample[1] for sample in self.recent) / window, 2),
+            'mean_db_ms': round(sum(sample[2] for sample in self.recent) / window, 2),
+            'mean_template_ms': round(sum(sample[3] for sample in self.recent) / window, 2),
+            'mean_bytes': round(sum(sample[4] for sample in self.recent) / window),
+            'histogram': [
+                {
+                    'le_ms': None if bound == float('inf') else bound,
+                    'label': f"> {BUCKETS_MS[-2]} ms" if bound == float('inf') else f"≤ {bound} ms",
+                    'count': count,
+                }
+                for bound, count in zip(BUCKETS_MS, self.buckets)
+            ],
+        }
+
+
+class PerformanceRegistry:
+    """
+    Registre des statistiques par route du processus courant.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, duration_ms, queries, db_ms, template_ms, size):
+        """
+        Ajoute les mesures d'une requête aux statistiques de sa route.
+        """
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = RouteStats()
+            stats.add(duration_ms, queries, db_ms, template_ms, size)
+
+    def snapshot(self):
+        """
+        Retourne les statistiques de toutes les routes, triées par nom.
+        """
+        with self._lock:
+            return {route: stats.snapshot() for route, stats in sorted(self._routes.items())}
+
+    def reset(self):
+        """
+        Efface toutes les statistiques.
+        """
+        with self._lock:
+            self._routes.clear()
+
+
+registry = PerformanceRegistry()
@@ -0,0 +1,177 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+
+from . import versions
+from .models import Profile
+
+# Identifiants des compétences d'un utilisateur, partagés entre requêtes et retirés par le signal m2m_changed
+CACHE_KEY = 'core:user-competences:{user_id}'
+CACHE_TIMEOUT = 60 * 60
+
+# Nombre de noms d'utilisateur par requête lors de la relecture des identifiants (limite de variables SQLite)
+LOOKUP_BATCH_SIZE = 500
+
+# Attribut de l'utilisateur qui mémorise l'ensemble pendant la requête (request.user est chargé à chaque requête)
+USER_ATTRIBUTE = '_competence_ids'
+
+
+def _query(user):
+    """
+    Lit les identifiants de compétences de l'utilisateur dans la table de liaison, sans charger son profil
+    ni les compétences. La lecture se fait sur la base principale : le résultat est mis en cache, et une
+    copie en retard y remettrait des compétences que l'utilisateur vient de modifier.
+    """
+    return Profile.competences.through.objects.using(DEFAULT_DB_ALIAS).filter(profile__user=user).values_list('competence_id', flat=True)
+
+
+def competence_ids(user):
+    """
+    Retourne l'ensemble des identifiants des compétences possédées par l'utilisateur.
+
+    L'ensemble est calculé au premier appel puis mémorisé sur l'objet utilisateur pour le reste de la
+    requête ; il est aussi mis en cache entre les requêtes, et retiré du cache dès que les compétences
+    de l'utilisateur changent (voir `core.signals`). Les vues s'en servent pour les tests d'appartenance
+    et les filtres `__in`, sans requête sur la table de liaison.
+
+    Args:
+        user (User | AnonymousUser): L'utilisateur de la requête.
+
+    Returns :
+        frozenset : Les identifiants des compétences (vide pour un utilisateur anonyme).
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    ids = getattr(user, USER_ATTRIBUTE, None)
+    if ids is None:
+        key = CACHE_KEY.format(user_id=user.pk)
+        ids = cache.get(key)
+        if ids is None:
+            ids = frozenset(_query(user))
+            cache.set(key, ids, CACHE_TIMEOUT)
+        setattr(user, USER_ATTRIBUTE, ids)
+    return ids
+
+
+async def acompetence_ids(user):
+    """
+    Variante asynchrone de `competence_ids`, pour les vues asynchrones (l'utilisateur doit déjà être chargé).
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    ids = getattr(user, USER_ATTRIBUTE, None)
+    if ids is None:
+        key = CACHE_KEY.format(user_id=user.pk)
+        ids = await cache.aget(key)
+        if ids is None:
+            # aiterator() exige un QuerySet `values()` sous Django 4.2 (voir `core.api`)
+            ids = frozenset([row['competence_id'] async for row in _query(user).values('competence_id').aiterator()])
+            await cache.aset(key, ids, CACHE_TIMEOUT)
+        setattr(user, USER_ATTRIBUTE, ids)
+    return ids
+
+
+def forget(user_ids, users=()):
+    """
+    Retire du cache les compétences mémorisées des utilisateurs donnés, tout de suite et de nouveau après
+    la validation de la transaction (une lecture concurrente a pu remettre l'ancienne valeur entre-temps).
+
+    Args:
+        user_ids (iterable): Les identifiants des utilisateurs.
+        users (iterable): Les objets utilisateurs déjà chargés, dont la mémorisation de requête est aussi effacée.
+    """
+    keys = [CACHE_KEY.format(user_id=user_id) for user_id in set(user_ids)]
+    for user in users:
+        if hasattr(user, USER_ATTRIBUTE):
+            delattr(user, USER_ATTRIBUTE)
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def change_competences(profiles, add=(), remove=(), users=(), batch_size=LOOKUP_BATCH_SIZE):
+    """
+    Ajoute et retire des compétences à des profils directement sur la table de liaison, en une
+    transaction : une insertion groupée des couples (profil, compétence) à ajouter, les couples déjà
+    présents étant ignorés, et une suppression des couples à retirer, par lots de `batch_size` profils.
+
+    Contrairement à `profile.competences.set(...)`, aucune ligne n'est relue ni écrite une à une. Ces
+    écritures ne déclenchent pas le signal `m2m_changed` : les compétences mémorisées des utilisateurs
+    sont donc retirées du cache, et le compteur des profils incrémenté, ici.
+
+    Args:
+        profiles (dict): Les identifiants d'utilisateur, indexés par identifiant de profil.
+        add (iterable): Les identifiants des compétences à ajouter.
+        remove (iterable): Les identifiants des compétences à retirer.
+        users (iterable): Les objets utilisateurs déjà chargés, dont la mémorisation de requête est aussi effacée.
+        batch_size (int): Nombre de profils par requête.
+    """
+    through = Profile.competences.through
+    add, remove, profile_ids = set(add), set(remove), list(profiles)
+    if not profile_ids or not (add or remove):
+        return
+    with transaction.atomic():
+        if add:
+            through.objects.bulk_create(
+                [through(profile_id=profile_id, competence_id=competence_id) for profile_id in profile_ids for competence_id in add],
+                batch_size=batch_size, ignore_conflicts=True,
+            )
+        if remove:
+            for start in range(0, len(profile_ids), batch_size):
+                through.objects.filter(
+                    profile_id__in=profile_ids[start:start + batch_size], competence_id__in=remove,
+                ).delete()
+        forget(profiles.values(), users=users)
+        versions.bump(Profile)
+
+
+def set_competences(user, competence_ids):
+    """
+    Remplace les compétences de l'utilisateur par `competence_ids` : la différence avec les compétences
+    actuelles, relues avec l'identifiant du profil en une requête, est appliquée par `change_competences`.
+
+    Args:
+        user (User): L'utilisateur (authentifié).
+        competence_ids (iterable): Les identifiants des compétences choisies, déjà validés.
+
+    Returns :
+        tuple : Les ensembles des identifiants ajoutés et retirés.
+    """
+    wanted = set(competence_ids)
+    with transaction.atomic():
+        rows = list(Profile.objects.using(DEFAULT_DB_ALIAS).filter(user=user).values_list('pk', 'competences'))
+        current = {competence_id for _, competence_id in rows if competence_id is not None}
+        added, removed = wanted - current, current - wanted
+        change_competences({rows[0][0]: user.pk}, added, removed, users=[user])
+    return added, removed
+
+
+def bulk_create_users(users, batch_size=None):
+    """
+    Insère des utilisateurs et leurs profils par insertions groupées, en une transaction.
+
+    `bulk_create` ne déclenche pas le signal `post_save` qui crée le profil d'un nouvel utilisateur :
+    les profils sont donc insérés ici, par une seconde insertion groupée, au lieu d'une insertion par
+    utilisateur.
+
+    Args:
+        users (list): Les utilisateurs à créer, non enregistrés (mot de passe déjà haché).
+        batch_size (int | None): Nombre de lignes par insertion groupée.
+
+    Returns :
+        list : Les utilisateurs créés, dont le profil est accessible sans requête par `user.profile`.
+    """
+    with transaction.atomic():
+        users = User.objects.bulk_create(users, batch_size=batch_size)
+        if not connection.features.can_return_rows_from_bulk_insert:
+            # Base sans INSERT ... RETURNING : les identifiants sont relus par nom d'utilisateur
+            by_username = {user.username: user for user in users}
+            names = list(by_username)
+            for start in range(0, len(names), LOOKUP_BATCH_SIZE):
+                rows = User.objects.filter(username__in=names[start:start + LOOKUP_BATCH_SIZE]).values_list('username', 'pk')
+                for username, pk in rows:
+                    by_username[username].pk = pk
+        Profile.objects.bulk_create([Profile(user=user) for user in users], batch_size=batch_size)
+        # Comme le signal de création de profil : un identifiant réutilisé ne doit pas hériter de compétences en cache
+        forget(user.pk for user in users)
+    return users
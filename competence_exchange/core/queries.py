@@ -0,0 +1,107 @@
+from datetime import date
+
+from django.db.models import Q
+
+from .models import Slot, Activity, MatchIndexEntry
+
+
+def available_slots_queryset():
+    """
+    Créneaux d'aide ouverts et à venir, affichés sur la liste publique.
+
+    Returns :
+        SlotQuerySet : Les créneaux, sans tri (le paginateur impose l'ordre (date, id)).
+    """
+    return Slot.objects.filter(
+        is_available=True, purpose='aid', date__gte=date.today()
+    ).with_related().with_first_activity()
+
+
+def my_slots_queryset(user):
+    """
+    Créneaux à venir créés par l'utilisateur (les créneaux passés sont archivés, voir `core.archive`).
+
+    Args:
+        user (User): L'utilisateur connecté.
+
+    Returns :
+        SlotQuerySet : Les créneaux triés par date.
+    """
+    return Slot.objects.filter(user=user, date__gte=date.today()).with_related().with_first_activity().order_by('date', 'id')
+
+
+def help_requests_queryset(user, competence_ids):
+    """
+    Demandes d'aide à venir d'autres utilisateurs dans une compétence que l'utilisateur possède,
+    encore disponibles ou pour lesquelles il est déjà volontaire.
+
+    Args:
+        user (User): L'utilisateur connecté.
+        competence_ids (frozenset): Les identifiants de ses compétences (voir `core.profiles.competence_ids`).
+
+    Returns :
+        ActivityQuerySet : Les activités triées par date de créneau.
+    """
+    # Demandes ouvertes : lecture de l'index de correspondance pour les seules compétences de l'utilisateur
+    today = date.today()
+    open_requests = MatchIndexEntry.objects.filter(
+        purpose='request', competence_id__in=competence_ids, date__gte=today
+    ).exclude(owner=user).values('activity_id')
+    return Activity.objects.filter(
+        Q(id__in=open_requests)
+        # Inclut les créneaux où l'utilisateur est déjà volontaire
+        | Q(volunteer=user, competence_needed__in=competence_ids, slot__purpose='request', slot__date__gte=today)
+    ).exclude(requester=user).with_related().order_by('slot__date', 'id')
+
+
+def my_requests_queryset(user):
+    """
+    Demandes d'aide à venir créées par l'utilisateur.
+
+    Args:
+        user (User): L'utilisateur connecté.
+
+    Returns :
+        ActivityQuerySet : Les activités triées par date de créneau.
+    """
+    return Activity.objects.filter(requester=user, slot__date__gte=date.today()).with_related().order_by('slot__date', 'id')
+
+
+def available_help_queryset(user, competence_ids):
+    """
+    Créneaux d'aide ouverts et à venir proposés par d'autres utilisateurs dans une compétence que l'utilisateur ne possède pas.
+
+    Args:
+        user (User): L'utilisateur connecté.
+        competence_ids (frozenset): Les identifiants de ses compétences (voir `core.profiles.competence_ids`).
+
+    Returns :
+        SlotQuerySet : Les créneaux triés par date.
+    """
+    # Offres ouvertes : lecture de l'index de correspondance, hors compétences de l'utilisateur
+    open_offers = MatchIndexEntry.objects.filter(purpose='aid', date__gte=date.today()).exclude(
+        competence_id__in=competence_ids
+    ).exclude(owner=user).values('slot_id')
+    return Slot.objects.filter(id__in=open_offers).with_related().order_by('date', 'id')
+
+
+def open_slots_queryset():
+    """
+    Créneaux ouverts et à venir, d'aide comme de demande, exposés par l'API.
+
+    Returns :
+        SlotQuerySet : Les créneaux, sans tri.
+    """
+    return Slot.objects.filter(is_available=True, date__gte=date.today())
+
+
+def open_requests_queryset():
+    """
+    Demandes d'aide encore sans volontaire sur des créneaux ouverts et à venir, exposées par l'API.
+
+    Returns :
+        ActivityQuerySet : Les activités, sans tri.
+    """
+    return Activity.objects.filter(
+        volunteer__isnull=True, slot__is_available=True, slot__purpose='request', slot__date__gte=date.today()
+    )
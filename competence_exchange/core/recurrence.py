@@ -0,0 +1,112 @@
+import datetime
+
+from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
+
+from . import events, match_index, search, stats, tasks, versions
+from .models import Slot, Activity
+
+# Nombre maximal de créneaux créés par une seule requête
+MAX_SLOTS_PER_REQUEST = 100
+
+# Au-delà de ce nombre de créneaux, l'indexation de correspondance est confiée à une tâche de fond
+SYNC_INDEX_LIMIT = 10
+
+
+def parse_date(value, label):
+    """
+    Convertit une date au format AAAA-MM-JJ.
+
+    Raises :
+        ValidationError : Si la date est absente ou invalide.
+    """
+    try:
+        return datetime.date.fromisoformat((value or '').strip())
+    except ValueError:
+        raise ValidationError(f"{label} invalide : « {value} ».")
+
+
+def expand_dates(start, until=None, weekdays=None, extra_dates=()):
+    """
+    Calcule les dates des créneaux à créer.
+
+    Sans date de fin, seule la date de début est retenue. Avec une date de fin, les dates entre
+    début et fin (incluses) tombant un des jours de la semaine donnés sont retenues ; sans jour
+    précisé, la récurrence est hebdomadaire sur le jour de la date de début.
+
+    Args:
+        start (date): La date de début.
+        until (date | None): La date de fin de la récurrence.
+        weekdays (iterable | None): Les jours de la semaine retenus (0 = lundi, 6 = dimanche).
+        extra_dates (iterable): Des dates supplémentaires, hors récurrence.
+
+    Returns :
+        list : Les dates distinctes, triées.
+
+    Raises :
+        ValidationError : Si la période est incohérente ou dépasse MAX_SLOTS_PER_REQUEST créneaux.
+    """
+    dates = set(extra_dates)
+    if until is None:
+        dates.add(start)
+    else:
+        if until < start:
+            raise ValidationError("La date de fin doit suivre la date de début.")
+        weekdays = set(weekdays or ()) or {start.weekday()}
+        if not weekdays <= set(range(7)):
+            raise ValidationError("Jour de la semaine invalide.")
+        # Borne la boucle avant de parcourir la période
+        if (until - start).days // 7 * len(weekdays) > MAX_SLOTS_PER_REQUEST:
+            raise ValidationError(f"Impossible de créer plus de {MAX_SLOTS_PER_REQUEST} créneaux à la fois.")
+        day = start
+        while day <= until:
+            if day.weekday() in weekdays:
+                dates.add(day)
+            day += datetime.timedelta(days=1)
+    if len(dates) > MAX_SLOTS_PER_REQUEST:
+        raise ValidationError(f"Impossible de créer plus de {MAX_SLOTS_PER_REQUEST} créneaux à la fois.")
+    return sorted(dates)
+
+
+def create_slots(user, competence, purpose, dates, description=None):
+    """
+    Crée un créneau par date, et l'activité associée pour une demande d'aide, en une seule transaction
+    et avec une insertion groupée par table. Jusqu'à SYNC_INDEX_LIMIT créneaux, ils sont indexés pour la
+    correspondance dans la même transaction ; au-delà, par la tâche de fond `index_new_slots`.
+
+    Args:
+        user (User): L'utilisateur qui crée les créneaux.
+        competence (Competence): La compétence des créneaux.
+        purpose (str): 'aid' ou 'request'.
+        dates (list): Les dates des créneaux.
+        description (str | None): La description de l'activité, pour une demande d'aide.
+
+    Returns :
+        list : Les créneaux créés.
+    """
+    with transaction.atomic():
+        slots = Slot.objects.bulk_create([
+            Slot(date=slot_date, competence=competence, user=user, is_available=True, purpose=purpose)
+            for slot_date in dates
+        ])
+        activities = []
+        if purpose == 'request' and description:
+            activities = Activity.objects.bulk_create([
+                Activity(description=description, requester=user, competence_needed=competence, slot=slot)
+                for slot in slots
+            ])
+        # bulk_create ne déclenche pas les signaux : les statistiques et les versions des modèles sont mises
+        # à jour et les créneaux publiés directement. Quelques créneaux sont indexés tout de suite, pour
+        # apparaître dans les correspondances même sans worker ; une longue série l'est par une tâche de fond,
+        # comme la fusion de l'index plein texte
+        stats.apply(stats.deltas((competence.pk, slot_date, purpose) for slot_date in dates))
+        versions.bump(Slot, Activity)
+        for slot in slots:
+            events.publish_on_commit(events.SLOT_OPENED, events.slot_data(slot))
+        returns_ids = connections[router.db_for_write(Slot)].features.can_return_rows_from_bulk_insert
+        if len(slots) <= SYNC_INDEX_LIMIT and returns_ids:
+            match_index.add_entries(slots, activities)
+        else:
+            tasks.enqueue(match_index.index_new_slots, {'slot_ids': [slot.pk for slot in slots]})
+        search.schedule_merge()
+    return slots
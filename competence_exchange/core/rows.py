@@ -0,0 +1,129 @@
+from django.urls import reverse
+from django.utils import formats
+
+# Identifiant factice inséré dans une URL inversée, remplacé ensuite par l'identifiant de chaque ligne
+URL_MARKER = 987654321987
+
+
+def url_builder(view_name):
+    """
+    Inverse une fois l'URL de la vue et retourne une fonction qui construit l'URL d'un objet par
+    simple concaténation, au lieu d'un `{% url %}` (et de la résolution complète de l'inversion)
+    à chaque ligne d'une liste.
+
+    La vue doit prendre un unique paramètre entier (convertisseur `<int:...>`).
+
+    Args:
+        view_name (str): Le nom de la route.
+
+    Returns :
+        callable : Fonction `pk -> URL`.
+    """
+    head, tail = reverse(view_name, args=[URL_MARKER]).split(str(URL_MARKER))
+    return lambda pk: f'{head}{pk}{tail}'
+
+
+def date_formatter():
+    """
+    Retourne une fonction qui formate une date comme le gabarit (`{{ date }}`, format DATE_FORMAT de
+    la langue active), en mémorisant le résultat : une liste ne compte que quelques dizaines de dates
+    distinctes pour des milliers de lignes.
+    """
+    formatted = {}
+
+    def format_date(value):
+        if value not in formatted:
+            formatted[value] = formats.date_format(value)
+        return formatted[value]
+    return format_date
+
+
+def _can_contact(user, activity):
+    """
+    Indique si l'utilisateur est le demandeur ou le volontaire de l'activité (comparaison des
+    identifiants, sans charger les utilisateurs liés).
+    """
+    return user.is_authenticated and user.pk in (activity.requester_id, activity.volunteer_id)
+
+
+def slot_rows(slots, user):
+    """
+    Prépare les lignes des listes de créneaux (créneaux disponibles, mes créneaux).
+
+    Args:
+        slots (iterable): Les créneaux, avec leur compétence et leur première activité préchargées
+            (`SlotQuerySet.with_related().with_first_activity()`).
+        user (User | AnonymousUser): L'utilisateur de la requête.
+
+    Returns :
+        list : Des dictionnaires `{'id', 'date', 'competence', 'is_aid', 'description', 'contact_url',
+        'delete_url'}` ; `description` et `contact_url` valent None s'il n'y a rien à afficher.
+    """
+    format_date = date_formatter()
+    contact_url = url_builder('contact_info')
+    delete_url = url_builder('delete_slot')
+    rows = []
+    for slot in slots:
+        activity = slot.first_activity
+        rows.append({
+            'id': slot.id,
+            'date': format_date(slot.date),
+            'competence': slot.competence.name,
+            'is_aid': slot.purpose == 'aid',
+            'description': activity.description if activity and slot.purpose == 'request' else None,
+            'contact_url': contact_url(activity.id) if activity and _can_contact(user, activity) else None,
+            'delete_url': delete_url(slot.id),
+        })
+    return rows
+
+
+def offer_rows(slots):
+    """
+    Prépare les lignes de la liste de l'aide disponible.
+
+    Args:
+        slots (iterable): Les créneaux, avec leur compétence et leur propriétaire préchargés.
+
+    Returns :
+        list : Des dictionnaires `{'date', 'competence', 'owner'}`.
+    """
+    format_date = date_formatter()
+    return [
+        {'date': format_date(slot.date), 'competence': slot.competence.name, 'owner': slot.user.username}
+        for slot in slots
+    ]
+
+
+def request_rows(activities, user, competence_ids=frozenset()):
+    """
+    Prépare les lignes des listes de demandes d'aide (demandes pour mes compétences, mes demandes,
+    résultats de recherche).
+
+    Args:
+        activities (iterable): Les activités, avec compétence, créneau et demandeur préchargés
+            (`ActivityQuerySet.with_related()`).
+        user (User | AnonymousUser): L'utilisateur de la requête.
+        competence_ids (frozenset): Les compétences de l'utilisateur : le lien pour se proposer
+            n'est affiché que pour les demandes dans l'une d'elles.
+
+    Returns :
+        list : Des dictionnaires `{'id', 'slot_id', 'description', 'competence', 'date', 'requester',
+        'volunteer_url', 'contact_url'}` ; les URL valent None si le lien n'est pas proposé.
+    """
+    format_date = date_formatter()
+    volunteer_url = url_builder('volunteer_for_help')
+    contact_url = url_builder('contact_info')
+    is_authenticated = user.is_authenticated
+    return [
+        {
+            'id': activity.id,
+            'slot_id': activity.slot_id,
+            'description': activity.description,
+            'competence': activity.competence_needed.name,
+            'date': format_date(activity.slot.date),
+            'requester': activity.requester.username,
+            'volunteer_url': volunteer_url(activity.id) if activity.competence_needed_id in competence_ids else None,
+            'contact_url': contact_url(activity.id) if is_authenticated and activity.volunteer_id == user.pk else None,
+        }
+        for activity in activities
+    ]
@@ -0,0 +1,232 @@
+import re
+from datetime import date
+
+from django.db import OperationalError, connections, router, transaction
+from django.db.models import Q
+
+from . import tasks
+from .models import Activity, Competence
+
+# Nombre de résultats par type sur la page de recherche, et de suggestions de l'autocomplétion
+RESULTS_LIMIT = 20
+SUGGESTIONS_LIMIT = 8
+
+# Longueur maximale d'une requête (au-delà, les mots suivants sont ignorés)
+MAX_TERMS = 8
+
+# Tables de l'index plein texte et quantité de travail (pages écrites) d'une fusion de segments
+INDEX_TABLES = ('core_search_competence', 'core_search_activity')
+MERGE_PAGES = 500
+
+# Clé de dédoublonnage de la tâche de fusion : une seule fusion en attente à la fois
+MERGE_TASK_KEY = 'search:merge-index'
+
+# Délai avant une fusion (secondes) : elle regroupe les écritures de cet intervalle et ne dispute pas
+# le verrou d'écriture de SQLite à la requête qui la demande
+MERGE_DELAY_SECONDS = 30
+
+WORD_RE = re.compile(r'\w+')
+
+
+def terms(text):
+    """
+    Découpe le texte saisi en mots, sans la syntaxe de requête FTS5 (guillemets, opérateurs, colonnes).
+
+    Returns :
+        list : Les mots, au plus MAX_TERMS.
+    """
+    return WORD_RE.findall(text or '')[:MAX_TERMS]
+
+
+def match_expression(words, prefix=False):
+    """
+    Construit l'expression MATCH FTS5 cherchant tous les mots (chacun entre guillemets, donc sans
+    interprétation de la syntaxe FTS5) ; avec `prefix`, le dernier mot peut n'être que le début d'un mot.
+    """
+    quoted = [f'"{word}"' for word in words]
+    if prefix and quoted:
+        quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def _fts_available(connection):
+    """
+    Indique si la base dispose de l'index FTS5 (créé par la migration 0010 sous SQLite seulement).
+    """
+    return connection.vendor == 'sqlite'
+
+
+def _fetch(model, sql, params):
+    """
+    Exécute une requête sur la base de lecture du modèle et retourne les lignes.
+    """
+    connection = connections[router.db_for_read(model)]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _in_order(queryset, ids):
+    """
+    Charge les objets `ids` et les retourne dans l'ordre des identifiants (ordre de pertinence).
+    """
+    objects = queryset.in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
+
+
+def _requests_matching(queryset, words):
+    """
+    Sans index plein texte : filtre les demandes ouvertes et à venir dont la description, la compétence
+    ou sa catégorie contient chacun des mots (les champs couverts par l'index).
+    """
+    queryset = queryset.filter(volunteer__isnull=True, slot__is_available=True, slot__date__gte=date.today())
+    for word in words:
+        queryset = queryset.filter(
+            Q(description__icontains=word) | Q(competence_needed__name__icontains=word)
+            | Q(competence_needed__category__name__icontains=word)
+        )
+    return queryset
+
+
+def search_competences(text, limit=RESULTS_LIMIT):
+    """
+    Recherche les compétences par leur nom ou celui de leur catégorie, triées par pertinence (bm25).
+
+    Args:
+        text (str): Le texte saisi.
+        limit (int): Nombre maximal de résultats.
+
+    Returns :
+        list : Les compétences, avec leur catégorie chargée.
+    """
+    words = terms(text)
+    if not words:
+        return []
+    queryset = Competence.objects.select_related('category')
+    if not _fts_available(connections[router.db_for_read(Competence)]):
+        for word in words:
+            queryset = queryset.filter(Q(name__icontains=word) | Q(category__name__icontains=word))
+        return list(queryset.order_by('name')[:limit])
+    rows = _fetch(Competence, (
+        "SELECT rowid FROM core_search_competence WHERE core_search_competence MATCH %s ORDER BY rank LIMIT %s"
+    ), [match_expression(words, prefix=True), limit])
+    return _in_order(queryset, [row[0] for row in rows])
+
+
+def search_requests(text, limit=RESULTS_LIMIT):
+    """
+    Recherche les demandes d'aide ouvertes et à venir par leur description, leur compétence ou sa
+    catégorie, triées par pertinence (bm25).
+
+    Args:
+        text (str): Le texte saisi.
+        limit (int): Nombre maximal de résultats.
+
+    Returns :
+        list : Les activités, avec leur compétence, leur créneau et leur demandeur chargés.
+    """
+    words = terms(text)
+    if not words:
+        return []
+    queryset = Activity.objects.select_related('competence_needed', 'slot', 'requester')
+    if not _fts_available(connections[router.db_for_read(Activity)]):
+        return list(_requests_matching(queryset, words).order_by('slot__date', 'id')[:limit])
+    # L'index ne contient que les demandes sans volontaire ; le créneau doit encore être ouvert et à venir
+    rows = _fetch(Activity, (
+        "SELECT core_search_activity.rowid FROM core_search_activity"
+        " JOIN core_activity ON core_activity.id = core_search_activity.rowid"
+        " JOIN core_slot ON core_slot.id = core_activity.slot_id"
+        " WHERE core_search_activity MATCH %s AND core_slot.is_available AND core_slot.date >= %s"
+        " ORDER BY rank LIMIT %s"
+    ), [match_expression(words, prefix=True), date.today().isoformat(), limit])
+    return _in_order(queryset, [row[0] for row in rows])
+
+
+def suggest(text, limit=SUGGESTIONS_LIMIT):
+    """
+    Suggestions de l'autocomplétion : les compétences dont le nom ou la catégorie commence par le texte
+    saisi, par pertinence, complétées par les descriptions des demandes ouvertes et à venir les plus
+    récentes (les mêmes que celles de `search_requests`).
+
+    Les demandes ne sont pas triées par pertinence : classer toutes les correspondances d'un préfixe
+    court parmi des millions de demandes coûterait trop cher pour une frappe au clavier. L'ordre des
+    rowid décroissants, natif pour FTS5, permet de s'arrêter aux `limit` premières.
+
+    Args:
+        text (str): Le texte saisi.
+        limit (int): Nombre maximal de suggestions.
+
+    Returns :
+        list : Des dictionnaires `{'type': 'competence' | 'request', 'id', 'label'}`.
+    """
+    words = terms(text)
+    if not words:
+        return []
+    if not _fts_available(connections[router.db_for_read(Competence)]):
+        suggestions = [
+            {'type': 'competence', 'id': competence.id, 'label': competence.name}
+            for competence in search_competences(text, limit)
+        ]
+        if len(suggestions) < limit:
+            suggestions += [
+                {'type': 'request', 'id': pk, 'label': description[:80]}
+                for pk, description in _requests_matching(Activity.objects, words)
+                .order_by('-id').values_list('id', 'description')[:limit - len(suggestions)]
+            ]
+        return suggestions
+    expression = match_expression(words, prefix=True)
+    suggestions = [
+        {'type': 'competence', 'id': pk, 'label': name}
+        for pk, name in _fetch(Competence, (
+            "SELECT rowid, name FROM core_search_competence WHERE core_search_competence MATCH %s"
+            " ORDER BY rank LIMIT %s"
+        ), [expression, limit])
+    ]
+    if len(suggestions) < limit:
+        suggestions += [
+            {'type': 'request', 'id': pk, 'label': description[:80]}
+            for pk, description in _fetch(Activity, (
+                "SELECT core_search_activity.rowid, core_search_activity.description FROM core_search_activity"
+                " JOIN core_activity ON core_activity.id = core_search_activity.rowid"
+                " JOIN core_slot ON core_slot.id = core_activity.slot_id"
+                " WHERE core_search_activity MATCH %s AND core_activity.volunteer_id IS NULL"
+                " AND core_slot.is_available AND core_slot.date >= %s"
+                " ORDER BY core_search_activity.rowid DESC LIMIT %s"
+            ), [expression, date.today().isoformat(), limit - len(suggestions)])
+        ]
+    return suggestions
+
+
+@tasks.task
+def merge_index(pages=MERGE_PAGES):
+    """
+    Tâche de fond : fusionne les segments de l'index plein texte écrits par les déclencheurs.
+
+    La fusion automatique de FTS5 est désactivée (migration 0011) : elle aurait lieu pendant les
+    écritures des utilisateurs. Cette tâche, demandée après les écritures avec la clé MERGE_TASK_KEY,
+    fait ce travail hors de la requête, au plus `pages` pages par table. Si la base est verrouillée par
+    d'autres écritures, la fusion est reportée de MERGE_DELAY_SECONDS au lieu d'échouer.
+
+    Args:
+        pages (int): Nombre maximal de pages écrites par table.
+    """
+    connection = connections[router.db_for_write(Activity)]
+    if not _fts_available(connection):
+        return
+    try:
+        # Point de sauvegarde : une fusion refusée n'annule pas la transaction de la tâche
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            for table in INDEX_TABLES:
+                cursor.execute(f"INSERT INTO {table} ({table}, rank) VALUES ('merge', %s)", [pages])
+    except OperationalError as error:
+        if 'locked' not in str(error):
+            raise
+        schedule_merge()
+
+
+def schedule_merge():
+    """
+    Demande une fusion de l'index plein texte après des écritures, dans MERGE_DELAY_SECONDS secondes
+    (sans effet si une fusion est déjà en attente). Même en mode immédiat, elle est confiée au worker.
+    """
+    tasks.enqueue(merge_index, key=MERGE_TASK_KEY, delay=MERGE_DELAY_SECONDS)
@@ -0,0 +1,165 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from . import catalogue, database, events, match_index, performance, profiles, stats, versions
+from .models import Slot, Activity, Category, Competence, Profile
+
+
+@receiver(post_save, sender=Slot)
+def sync_match_index_on_slot_save(sender, instance, raw=False, **kwargs):
+    """
+    Met à jour l'index de correspondance lorsqu'un créneau est créé ou modifié.
+    La suppression d'un créneau ou d'une activité supprime ses entrées par cascade.
+    """
+    if not raw:
+        match_index.sync_slot(instance)
+
+
+@receiver(post_save, sender=Activity)
+def sync_match_index_on_activity_save(sender, instance, raw=False, **kwargs):
+    """
+    Met à jour l'index de correspondance lorsqu'une activité est créée ou modifiée.
+    """
+    if not raw:
+        match_index.sync_activity(instance)
+
+
+@receiver(pre_save, sender=Slot)
+def remember_slot_stats(sender, instance, raw=False, **kwargs):
+    """
+    Mémorise l'état en base d'un créneau modifié, pour retirer des statistiques son ancienne cellule.
+    """
+    if not raw:
+        stats.remember(instance)
+
+
+@receiver(post_save, sender=Slot)
+def update_stats_on_slot_save(sender, instance, raw=False, **kwargs):
+    """
+    Met à jour les statistiques de disponibilité lorsqu'un créneau est créé ou modifié.
+    """
+    if not raw:
+        stats.slot_saved(instance)
+
+
+@receiver(post_delete, sender=Slot)
+def update_stats_on_slot_delete(sender, instance, **kwargs):
+    """
+    Met à jour les statistiques de disponibilité lorsqu'un créneau est supprimé.
+    """
+    stats.slot_deleted(instance)
+
+
+@receiver(post_save, sender=Slot)
+def publish_slot_saved(sender, instance, raw=False, **kwargs):
+    """
+    Publie l'état d'un créneau créé ou modifié (ouvert ou pris) aux clients du flux d'événements,
+    après la validation de la transaction.
+    """
+    if not raw:
+        event_type = events.SLOT_OPENED if instance.is_available else events.SLOT_CLAIMED
+        events.publish_on_commit(event_type, events.slot_data(instance))
+
+
+@receiver(post_delete, sender=Slot)
+def publish_slot_deleted(sender, instance, **kwargs):
+    """
+    Publie la suppression d'un créneau aux clients du flux d'événements.
+    """
+    events.publish_on_commit(events.SLOT_DELETED, events.slot_data(instance))
+
+
+@receiver(post_save, sender=Activity)
+def publish_activity_claimed(sender, instance, raw=False, **kwargs):
+    """
+    Publie la prise en charge d'une demande enregistrée par `save()` (administration par exemple) ;
+    `core.volunteering.claim_activity` publie la sienne lui-même.
+
+    La suppression d'une activité n'est pas publiée : son créneau reste, et la suppression du créneau
+    (qui supprime ses activités par cascade) est publiée par `publish_slot_deleted`.
+    """
+    if not raw and instance.volunteer_id is not None:
+        events.publish_on_commit(events.SLOT_CLAIMED, {'slot': instance.slot_id, 'activity': instance.pk})
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Competence)
+@receiver(post_delete, sender=Competence)
+def invalidate_catalogue(sender, **kwargs):
+    """
+    Invalide le catalogue des compétences mis en cache lorsqu'une catégorie ou une compétence change.
+    """
+    catalogue.invalidate()
+
+
+@receiver(post_save, sender=Slot)
+@receiver(post_delete, sender=Slot)
+@receiver(post_save, sender=Activity)
+@receiver(post_delete, sender=Activity)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Competence)
+@receiver(post_delete, sender=Competence)
+def bump_model_version(sender, raw=False, **kwargs):
+    """
+    Incrémente le compteur de modifications du modèle, qui sert aux ETag et Last-Modified des pages.
+    """
+    if not raw:
+        versions.bump(sender)
+
+
+@receiver(m2m_changed, sender=Profile.competences.through)
+def bump_profile_version(sender, action, **kwargs):
+    """
+    Incrémente le compteur des profils lorsque les compétences d'un utilisateur changent
+    (les pages d'un utilisateur dépendent de ses compétences).
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        versions.bump(Profile)
+
+
+@receiver(m2m_changed, sender=Profile.competences.through)
+def forget_user_competences(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Retire du cache les compétences mémorisées des utilisateurs dont les compétences changent
+    (voir `core.profiles.competence_ids`).
+    """
+    if not reverse:
+        # `profile.competences.add(...)` : un seul utilisateur, dont l'objet chargé est aussi mis à jour
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            user = Profile._meta.get_field('user').get_cached_value(instance, default=None)
+            profiles.forget([instance.user_id], users=[user] if user is not None else ())
+    elif action in ('post_add', 'post_remove'):
+        # `competence.profiles.add(...)` : les profils modifiés sont dans pk_set
+        profiles.forget(Profile.objects.filter(pk__in=pk_set).values_list('user_id', flat=True))
+    elif action == 'pre_clear':
+        # `competence.profiles.clear()` : les profils ne sont plus connus après la suppression
+        profiles.forget(instance.profiles.values_list('user_id', flat=True))
+
+
+@receiver(post_save, sender=Profile)
+def forget_new_profile_competences(sender, instance, created, raw=False, **kwargs):
+    """
+    Retire du cache les compétences mémorisées sous l'identifiant d'un nouvel utilisateur, au cas où un
+    utilisateur supprimé (ou une transaction annulée) aurait porté le même identifiant.
+    """
+    if created and not raw:
+        profiles.forget([instance.user_id])
+
+
+@receiver(connection_created)
+def install_performance_wrapper(sender, connection, **kwargs):
+    """
+    Installe la mesure des requêtes SQL sur chaque nouvelle connexion à la base (un thread par connexion).
+    """
+    performance.install_query_wrapper(connection)
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """
+    Règle chaque nouvelle connexion SQLite pour la concurrence (voir SQLITE_PRAGMAS).
+    """
+    database.configure_sqlite(connection)
@@ -0,0 +1,281 @@
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+
+from django.db import connections, router, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+
+from . import versions
+from .models import AvailabilityStat, Slot
+
+# Nombre de semaines affichées par défaut par le tableau de bord, et au plus
+WEEKS_SHOWN = 12
+MAX_WEEKS = 52
+
+# Colonne de AvailabilityStat comptant les créneaux ouverts de chaque objectif
+COLUMNS = {'aid': 'open_offers', 'request': 'open_requests'}
+
+# Regroupements du tableau de bord : (identifiant, nom) lus par jointure depuis la table des statistiques
+GROUPS = {
+    'competence': ('competence_id', 'competence__name'),
+    'category': ('competence__category_id', 'competence__category__name'),
+}
+
+# Bases qui acceptent INSERT ... ON CONFLICT (...) DO UPDATE avec `excluded`
+UPSERT_VENDORS = ('sqlite', 'postgresql')
+
+# Attribut posé par `remember` sur un créneau modifié : son état en base avant l'enregistrement
+PREVIOUS_ATTRIBUTE = '_stats_previous'
+
+
+class StatsError(ValueError):
+    """
+    Exception levée lorsqu'un paramètre du tableau de bord est invalide.
+    """
+
+
+def week_of(day):
+    """
+    Retourne le lundi de la semaine d'une date (date ou chaîne ISO).
+    """
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    return day - timedelta(days=day.weekday())
+
+
+def current_week():
+    """
+    Retourne le lundi de la semaine en cours.
+    """
+    return week_of(timezone.localdate())
+
+
+def deltas(slots, sign=1):
+    """
+    Variations des compteurs pour des créneaux ouverts qui apparaissent (`sign` = 1) ou disparaissent (-1).
+
+    Args:
+        slots (iterable): Des triplets `(competence_id, date, purpose)`.
+
+    Returns :
+        Counter : Les variations, indexées par `(competence_id, semaine, objectif)`.
+    """
+    changes = Counter()
+    for competence_id, day, purpose in slots:
+        changes[(competence_id, week_of(day), purpose)] += sign
+    return changes
+
+
+def _upsert(connection, cells):
+    """
+    Ajoute les variations de toutes les cellules en une requête INSERT ... ON CONFLICT DO UPDATE
+    (SQLite, PostgreSQL) : la cellule absente est créée, la cellule existante incrémentée par la base,
+    sans lecture préalable ni perte de mise à jour entre écritures concurrentes.
+    """
+    quote = connection.ops.quote_name
+    table = quote(AvailabilityStat._meta.db_table)
+    columns = [quote(column) for column in ('competence_id', 'week', 'open_offers', 'open_requests')]
+    params = []
+    for (competence_id, week), changes in cells.items():
+        params += [competence_id, connection.ops.adapt_datefield_value(week), changes['open_offers'], changes['open_requests']]
+    counters = ', '.join(
+        f"{column} = {table}.{column} + excluded.{column}" for column in columns[2:]
+    )
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join(['(%s, %s, %s, %s)'] * len(cells))} "
+        f"ON CONFLICT ({columns[0]}, {columns[1]}) DO UPDATE SET {counters}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def apply(changes):
+    """
+    Ajoute des variations aux compteurs, en une requête quel que soit le nombre de cellules
+    (compétence, semaine) touchées. Les écritures concurrentes s'additionnent sans se perdre.
+
+    Sur les bases sans INSERT ... ON CONFLICT, chaque cellule est mise à jour par un UPDATE relatif,
+    et les cellules absentes sont créées à zéro puis mises à jour de la même façon.
+
+    Args:
+        changes (Counter): Les variations renvoyées par `deltas`.
+    """
+    cells = defaultdict(Counter)
+    for (competence_id, week, purpose), delta in changes.items():
+        if delta:
+            cells[(competence_id, week)][COLUMNS[purpose]] += delta
+    cells = {cell: columns for cell, columns in cells.items() if any(columns.values())}
+    if not cells:
+        return
+    connection = connections[router.db_for_write(AvailabilityStat)]
+    if connection.vendor in UPSERT_VENDORS:
+        _upsert(connection, cells)
+        return
+
+    def update(cell):
+        competence_id, week = cell
+        return AvailabilityStat.objects.filter(competence_id=competence_id, week=week).update(**{
+            column: F(column) + delta for column, delta in cells[cell].items() if delta
+        })
+
+    missing = [cell for cell in cells if not update(cell)]
+    if missing:
+        AvailabilityStat.objects.bulk_create(
+            [AvailabilityStat(competence_id=competence_id, week=week) for competence_id, week in missing],
+            ignore_conflicts=True,
+        )
+        for cell in missing:
+            update(cell)
+
+
+def remember(slot):
+    """
+    Mémorise, avant l'enregistrement d'un créneau existant, son état en base (signal pre_save) : le
+    créneau peut changer de compétence, de date, d'objectif ou de disponibilité.
+    """
+    if slot.pk is None or slot._state.adding:
+        return
+    previous = Slot.objects.filter(pk=slot.pk).values_list('competence_id', 'date', 'purpose', 'is_available').first()
+    setattr(slot, PREVIOUS_ATTRIBUTE, previous)
+
+
+def slot_saved(slot):
+    """
+    Met à jour les compteurs après l'enregistrement d'un créneau (signal post_save).
+    """
+    previous = slot.__dict__.pop(PREVIOUS_ATTRIBUTE, None)
+    changes = Counter()
+    if previous is not None and previous[3]:
+        changes.update(deltas([previous[:3]], -1))
+    if slot.is_available:
+        changes.update(deltas([(slot.competence_id, slot.date, slot.purpose)]))
+    apply(changes)
+
+
+def slot_deleted(slot):
+    """
+    Met à jour les compteurs après la suppression d'un créneau (signal post_delete).
+    """
+    if slot.is_available:
+        apply(deltas([(slot.competence_id, slot.date, slot.purpose)], -1))
+
+
+def _expected():
+    """
+    Compteurs calculés à partir des créneaux ouverts, en une requête GROUP BY.
+    """
+    return Slot.objects.filter(is_available=True).annotate(week=TruncWeek('date')).values('competence_id', 'week').annotate(
+        open_offers=Count('id', filter=Q(purpose='aid')), open_requests=Count('id', filter=Q(purpose='request')),
+    ).order_by()
+
+
+def drift():
+    """
+    Compare les compteurs matérialisés à ceux calculés à partir des créneaux, sans rien modifier.
+
+    Returns :
+        int : Le nombre de cellules (compétence, semaine) dont les compteurs diffèrent.
+    """
+    expected = {
+        (row['competence_id'], row['week']): (row['open_offers'], row['open_requests']) for row in _expected().iterator()
+    }
+    current = {
+        (competence_id, week): (offers, requests)
+        for competence_id, week, offers, requests in AvailabilityStat.objects.values_list(
+            'competence_id', 'week', 'open_offers', 'open_requests'
+        ).iterator()
+    }
+    return sum(
+        1 for cell in expected.keys() | current.keys()
+        if expected.get(cell, (0, 0)) != current.get(cell, (0, 0))
+    )
+
+
+def rebuild(batch_size=1000):
+    """
+    Recalcule entièrement les statistiques à partir des créneaux, en une transaction (rapprochement
+    après un import ou une écriture faite sans passer par les signaux). Le compteur de modifications des
+    créneaux est incrémenté : les pages et les badges qui affichent les statistiques sont recalculés.
+
+    Returns :
+        int : Le nombre de cellules (compétence, semaine) écrites.
+    """
+    with transaction.atomic():
+        AvailabilityStat.objects.all().delete()
+        created = AvailabilityStat.objects.bulk_create(
+            [AvailabilityStat(**row) for row in _expected().iterator(chunk_size=batch_size)], batch_size=batch_size,
+        )
+        versions.bump(Slot)
+    return len(created)
+
+
+def options(params):
+    """
+    Lit les paramètres du tableau de bord.
+
+    Paramètres :
+        group : `competence` (par défaut) ou `category`.
+        weeks : Le nombre de semaines (WEEKS_SHOWN par défaut, MAX_WEEKS au plus).
+        start : Une date de la première semaine, au format AAAA-MM-JJ (la semaine en cours par défaut).
+
+    Returns :
+        tuple : (regroupement, nombre de semaines, lundi de la première semaine).
+
+    Raises :
+        StatsError : Si un paramètre est invalide.
+    """
+    group = params.get('group') or 'competence'
+    if group not in GROUPS:
+        raise StatsError(f"Le paramètre « group » doit valoir {' ou '.join(GROUPS)}.")
+    try:
+        weeks = int(params.get('weeks') or WEEKS_SHOWN)
+    except ValueError:
+        weeks = 0
+    if not 1 <= weeks <= MAX_WEEKS:
+        raise StatsError(f"Le paramètre « weeks » doit être un entier entre 1 et {MAX_WEEKS}.")
+    try:
+        start = week_of(params['start']) if params.get('start') else current_week()
+    except ValueError:
+        raise StatsError("Le paramètre « start » doit être une date au format AAAA-MM-JJ.") from None
+    return group, weeks, start
+
+
+def weekly(group='competence', weeks=WEEKS_SHOWN, start=None):
+    """
+    Offre et demande ouvertes par compétence ou par catégorie et par semaine, lues dans la table des
+    statistiques seulement (avec les noms par jointure), sans parcourir les créneaux.
+
+    Args:
+        group (str): 'competence' ou 'category'.
+        weeks (int): Le nombre de semaines.
+        start (date | None): Le lundi de la première semaine (la semaine en cours par défaut).
+
+    Returns :
+        dict : `{'weeks': [lundis], 'rows': [...]}` ; chaque ligne `{'id', 'name', 'offers', 'requests',
+        'total_offers', 'total_requests'}` donne les compteurs semaine par semaine et leur total. Les
+        lignes sans créneau ouvert sur la période sont omises.
+    """
+    start = start or current_week()
+    week_list = [start + timedelta(weeks=index) for index in range(weeks)]
+    positions = {week: index for index, week in enumerate(week_list)}
+    key, name = GROUPS[group]
+    cells = AvailabilityStat.objects.filter(week__gte=start, week__lt=start + timedelta(weeks=weeks)).values(
+        key, name, 'week',
+    ).annotate(offers=Sum('open_offers'), requests=Sum('open_requests')).order_by()
+    rows = {}
+    for cell in cells:
+        row = rows.setdefault(cell[key], {
+            'id': cell[key], 'name': cell[name] or "Sans catégorie", 'offers': [0] * weeks, 'requests': [0] * weeks,
+        })
+        row['offers'][positions[cell['week']]] += cell['offers']
+        row['requests'][positions[cell['week']]] += cell['requests']
+    for row in rows.values():
+        row['total_offers'], row['total_requests'] = sum(row['offers']), sum(row['requests'])
+    return {
+        'weeks': week_list,
+        'rows': sorted(
+            (row for row in rows.values() if row['total_offers'] or row['total_requests']),
+            key=lambda row: row['name'],
+        ),
+    }
@@ -0,0 +1,412 @@
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+# Nombre d'exécutions d'une tâche avant son échec définitif (modifiable par tâche, voir `task`)
+MAX_ATTEMPTS = 5
+
+# Délai avant une nouvelle exécution : RETRY_BASE_SECONDS * 2^(exécutions - 1), plafonné, avec une part aléatoire
+RETRY_BASE_SECONDS = 5
+RETRY_MAX_SECONDS = 60 * 60
+
+# Une tâche en cours depuis plus longtemps est considérée comme abandonnée (worker arrêté brutalement)
+LOCK_TIMEOUT_SECONDS = 10 * 60
+
+# Durée de conservation des tâches terminées (les tâches en échec sont conservées pour examen)
+RETENTION = timedelta(days=7)
+
+# Intervalle entre deux passes de maintenance du worker (tâches abandonnées, purge)
+MAINTENANCE_SECONDS = 60
+
+# Tâches prises en charge d'avance par thread du worker : la prise en charge (deux requêtes) est
+# partagée entre plusieurs tâches, sans qu'un worker n'accapare la file au détriment des autres
+PREFETCH_PER_THREAD = 4
+
+# Nombre d'exécutions récentes conservées par tâche pour le calcul des percentiles
+WINDOW_SIZE = 1000
+
+# Réveille un worker du même processus dès qu'une tâche est validée, sans attendre l'intervalle d'interrogation
+_wakeup = threading.Event()
+
+
+def task(function=None, *, max_attempts=MAX_ATTEMPTS):
+    """
+    Déclare une fonction exécutable en tâche de fond. Seules les fonctions ainsi déclarées peuvent être
+    exécutées par le worker : le nom lu dans la table ne permet pas d'appeler n'importe quelle fonction.
+
+    La fonction ne reçoit que des arguments nommés sérialisables en JSON, et doit pouvoir être exécutée
+    plusieurs fois (une tâche interrompue ou en erreur est exécutée de nouveau).
+
+    Args:
+        function (callable): La fonction décorée.
+        max_attempts (int): Nombre d'exécutions avant l'échec définitif.
+    """
+    def decorate(function):
+        function.task_name = f'{function.__module__}.{function.__qualname__}'
+        function.max_attempts = max_attempts
+        return function
+    return decorate(function) if function is not None else decorate
+
+
+def resolve(name):
+    """
+    Retourne la fonction d'une tâche à partir de son nom.
+
+    Raises :
+        ValueError : Si le nom ne désigne pas une fonction déclarée par `task`.
+    """
+    try:
+        function = import_string(name)
+    except ImportError as error:
+        raise ValueError(f"Tâche inconnue : {name}") from error
+    if getattr(function, 'task_name', None) != name:
+        raise ValueError(f"{name} n'est pas une tâche déclarée.")
+    return function
+
+
+def retry_delay(attempts):
+    """
+    Délai avant la prochaine exécution d'une tâche qui a échoué `attempts` fois : croissance
+    exponentielle plafonnée, dont une moitié aléatoire pour étaler les nouvelles tentatives.
+    """
+    delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+
+def _error_text(error):
+    return ''.join(traceback.format_exception(error))[-4000:]
+
+
+def _wake_workers():
+    _wakeup.set()
+
+
+def enqueue(function, payload=None, key=None, delay=0):
+    """
+    Demande l'exécution d'une tâche de fond.
+
+    La tâche est insérée dans la transaction en cours : elle n'est visible du worker qu'après la
+    validation de l'opération qui la demande, et disparaît avec elle si elle est annulée. Avec une clé,
+    la demande est ignorée si une tâche de même clé est déjà en attente (tâches regroupables, comme une
+    fusion d'index).
+
+    En mode immédiat (réglage TASKS_EAGER), la tâche est exécutée dans la requête
+    après la validation de la transaction en cours (tout de suite hors transaction) : une opération
+    annulée n'envoie pas de courriel. Si elle échoue, elle est enregistrée pour être reprise par un worker.
+
+    Args:
+        function (callable): La fonction de la tâche (décorée par `task`).
+        payload (dict | None): Ses arguments nommés.
+        key (str | None): Clé de dédoublonnage.
+        delay (float): Délai minimal avant l'exécution, en secondes.
+    """
+    payload = payload or {}
+    if getattr(settings, 'TASKS_EAGER', False) and not delay:
+        transaction.on_commit(lambda: _run_eager(function, payload, key))
+        return
+    Task.objects.bulk_create([Task(
+        name=function.task_name, payload=payload, key=key, max_attempts=function.max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )], ignore_conflicts=key is not None)
+    metrics.record(function.task_name, 'enqueued')
+    transaction.on_commit(_wake_workers)
+
+
+def _run_eager(function, payload, key):
+    """
+    Exécute une tâche tout de suite, dans un point de sauvegarde : en cas d'erreur, seules ses propres
+    écritures sont annulées, et la tâche est enregistrée comme ayant échoué une fois.
+    """
+    started = time.perf_counter()
+    try:
+        with transaction.atomic():
+            function(**payload)
+    except Exception as error:
+        logger.exception("Échec de la tâche %s exécutée immédiatement", function.task_name)
+        metrics.record(function.task_name, 'retried', time.perf_counter() - started)
+        Task.objects.bulk_create([Task(
+            name=function.task_name, payload=payload, key=key, max_attempts=function.max_attempts,
+            attempts=1, run_at=timezone.now() + retry_delay(1), last_error=_error_text(error),
+        )], ignore_conflicts=key is not None)
+        return
+    metrics.record(function.task_name, 'succeeded', time.perf_counter() - started)
+
+
+def claim(worker_id, limit):
+    """
+    Prend en charge au plus `limit` tâches exécutables, les plus anciennes d'abord.
+
+    La prise en charge est un UPDATE conditionnel (tâche encore en attente) : deux workers qui
+    sélectionnent les mêmes tâches ne peuvent pas les prendre tous les deux, y compris sous SQLite
+    qui ignore `select_for_update`. La clé de dédoublonnage est libérée : une nouvelle demande de la
+    même tâche pendant son exécution sera exécutée après elle.
+
+    Args:
+        worker_id (str): L'identifiant du worker.
+        limit (int): Nombre maximal de tâches.
+
+    Returns :
+        list : Les tâches prises en charge, au statut RUNNING.
+    """
+    now = timezone.now()
+    token = f'{worker_id}:{uuid.uuid4().hex[:8]}'
+    ready = Task.objects.filter(status=Task.PENDING, run_at__lte=now).order_by('run_at', 'id').values('id')[:limit]
+    claimed = Task.objects.filter(pk__in=ready, status=Task.PENDING).update(
+        status=Task.RUNNING, locked_by=token, locked_at=now, attempts=F('attempts') + 1, key=None,
+    )
+    if not claimed:
+        return []
+    return list(Task.objects.filter(status=Task.RUNNING, locked_by=token).order_by('run_at', 'id'))
+
+
+def execute(task_object):
+    """
+    Exécute une tâche prise en charge et enregistre son résultat.
+
+    La fonction et le passage au statut DONE sont dans la même transaction : une tâche dont le
+    résultat n'a pas pu être enregistré est annulée avec ses écritures, puis exécutée de nouveau.
+    En cas d'erreur, la tâche est remise en attente avec un délai croissant, ou passe au statut
+    FAILED après `max_attempts` exécutions.
+
+    Returns :
+        bool : True si la tâche a réussi.
+    """
+    started = time.perf_counter()
+    owned = Task.objects.filter(pk=task_object.pk, status=Task.RUNNING, locked_by=task_object.locked_by)
+    try:
+        function = resolve(task_object.name)
+        with transaction.atomic():
+            function(**task_object.payload)
+            owned.update(status=Task.DONE, finished_at=timezone.now(), last_error='')
+    except Exception as error:
+        duration = time.perf_counter() - started
+        if task_object.attempts >= task_object.max_attempts:
+            logger.error("Échec définitif de la tâche %s (%s)", task_object.pk, task_object.name, exc_info=error)
+            owned.update(status=Task.FAILED, finished_at=timezone.now(), last_error=_error_text(error))
+            metrics.record(task_object.name, 'failed', duration)
+        else:
+            logger.warning("Échec de la tâche %s (%s), nouvelle tentative prévue", task_object.pk, task_object.name, exc_info=error)
+            owned.update(
+                status=Task.PENDING, locked_by='', locked_at=None,
+                run_at=timezone.now() + retry_delay(task_object.attempts), last_error=_error_text(error),
+            )
+            metrics.record(task_object.name, 'retried', duration)
+        return False
+    metrics.record(task_object.name, 'succeeded', time.perf_counter() - started)
+    return True
+
+
+def run_pending(worker_id='local', limit=100):
+    """
+    Exécute dans le thread courant toutes les tâches exécutables, jusqu'à épuisement de la file :
+    pour les tests, et pour vider la file sans lancer de worker.
+
+    Returns :
+        int : Le nombre de tâches exécutées.
+    """
+    count = 0
+    while True:
+        claimed = claim(worker_id, limit)
+        if not claimed:
+            return count
+        for task_object in claimed:
+            execute(task_object)
+        count += len(claimed)
+
+
+def requeue_stale(timeout=LOCK_TIMEOUT_SECONDS):
+    """
+    Remet en attente les tâches en cours depuis plus de `timeout` secondes (worker arrêté pendant leur
+    exécution), ou les passe au statut FAILED si elles ont atteint leur nombre maximal d'exécutions.
+
+    Returns :
+        int : Le nombre de tâches reprises.
+    """
+    now = timezone.now()
+    stale = Task.objects.filter(status=Task.RUNNING, locked_at__lt=now - timedelta(seconds=timeout))
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED, finished_at=now, last_error="Exécution interrompue.",
+    )
+    requeued = stale.update(status=Task.PENDING, locked_by='', locked_at=None, run_at=now, last_error="Exécution interrompue.")
+    return failed + requeued
+
+
+def purge_finished(retention=RETENTION):
+    """
+    Supprime les tâches terminées depuis plus de `retention`.
+
+    Returns :
+        int : Le nombre de tâches supprimées.
+    """
+    deleted, _ = Task.objects.filter(status=Task.DONE, finished_at__lt=timezone.now() - retention).delete()
+    return deleted
+
+
+def queue_stats():
+    """
+    État de la file, lu dans la base (tous workers confondus).
+
+    Returns :
+        dict : Le nombre de tâches par statut, le retard de la plus ancienne tâche exécutable (secondes)
+        et le nombre de tâches terminées pendant la dernière minute.
+    """
+    now = timezone.now()
+    counts = dict(Task.objects.values_list('status').annotate(count=Count('id')).order_by())
+    oldest = Task.objects.filter(status=Task.PENDING, run_at__lte=now).aggregate(oldest=Min('run_at'))['oldest']
+    return {
+        'counts': {status: counts.get(status, 0) for status, _ in Task.STATUS_CHOICES},
+        'lag_s': round((now - oldest).total_seconds(), 1) if oldest else 0.0,
+        'done_last_minute': Task.objects.filter(status=Task.DONE, finished_at__gte=now - timedelta(minutes=1)).count(),
+    }
+
+
+class TaskMetrics:
+    """
+    Mesures des tâches exécutées par le processus courant : compteurs par tâche et par issue, durées
+    des WINDOW_SIZE dernières exécutions, débit depuis le démarrage ou la dernière remise à zéro.
+    """
+
+    OUTCOMES = ('enqueued', 'succeeded', 'retried', 'failed')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Efface toutes les mesures.
+        """
+        with self._lock:
+            self._started = time.monotonic()
+            self._counts = {}
+            self._durations = {}
+
+    def record(self, name, outcome, duration=None):
+        """
+        Ajoute une issue (`enqueued`, `succeeded`, `retried` ou `failed`) de la tâche `name`.
+        """
+        with self._lock:
+            counts = self._counts.setdefault(name, dict.fromkeys(self.OUTCOMES, 0))
+            counts[outcome] += 1
+            if duration is not None:
+                self._durations.setdefault(name, deque(maxlen=WINDOW_SIZE)).append(duration * 1000)
+
+    def snapshot(self):
+        """
+        Retourne les mesures sous forme de dictionnaire sérialisable.
+        """
+        with self._lock:
+            elapsed = max(time.monotonic() - self._started, 1e-9)
+            tasks = {}
+            for name, counts in sorted(self._counts.items()):
+                durations = sorted(self._durations.get(name, ()))
+
+                def percentile(fraction):
+                    return round(durations[min(int(len(durations) * fraction), len(durations) - 1)], 2) if durations else 0.0
+
+                tasks[name] = {**counts, 'p50_ms': percentile(0.50), 'p95_ms': percentile(0.95)}
+            executed = sum(counts['succeeded'] + counts['failed'] for counts in self._counts.values())
+            return {
+                'elapsed_s': round(elapsed, 1),
+                'throughput_per_s': round(executed / elapsed, 2),
+                'tasks': tasks,
+            }
+
+
+metrics = TaskMetrics()
+
+
+class Worker:
+    """
+    Worker de la file de tâches : un thread prend en charge les tâches exécutables, par lots d'au plus
+    PREFETCH_PER_THREAD tâches par thread, exécutées par une réserve de `threads` threads (chacun avec
+    sa connexion à la base). Le worker n'a besoin d'aucun service externe : la file est la table Task.
+
+    Attributes:
+        threads (int): Nombre de tâches exécutées en parallèle.
+        poll_interval (float): Attente maximale entre deux interrogations de la file vide, en secondes.
+        worker_id (str): Identifiant du worker, enregistré sur les tâches prises en charge.
+    """
+
+    def __init__(self, threads=4, poll_interval=1.0, worker_id=None):
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+        self._stop = threading.Event()
+
+    def stop(self):
+        """
+        Demande l'arrêt du worker : les tâches en cours sont terminées, aucune autre n'est prise en charge.
+        """
+        self._stop.set()
+        _wakeup.set()
+
+    def _execute(self, task_object):
+        try:
+            return execute(task_object)
+        finally:
+            close_old_connections()
+
+    def _maintain(self):
+        requeued = requeue_stale()
+        purged = purge_finished()
+        if requeued or purged:
+            logger.info("File de tâches : %s tâche(s) reprise(s), %s purgée(s)", requeued, purged)
+
+    def run(self, max_tasks=None, until_empty=False):
+        """
+        Exécute les tâches jusqu'à l'arrêt du worker.
+
+        Args:
+            max_tasks (int | None): S'arrête après avoir exécuté ce nombre de tâches.
+            until_empty (bool): S'arrête dès que la file ne contient plus de tâche exécutable.
+
+        Returns :
+            int : Le nombre de tâches exécutées.
+        """
+        processed = 0
+        in_flight = set()
+        next_maintenance = 0.0
+        with ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='core-task') as pool:
+            while not self._stop.is_set():
+                if time.monotonic() >= next_maintenance:
+                    self._maintain()
+                    next_maintenance = time.monotonic() + MAINTENANCE_SECONDS
+                free = self.threads * PREFETCH_PER_THREAD - len(in_flight)
+                if max_tasks is not None:
+                    free = min(free, max_tasks - processed - len(in_flight))
+                claimed = claim(self.worker_id, free) if free > 0 else []
+                in_flight.update(pool.submit(self._execute, task_object) for task_object in claimed)
+
+                if not claimed and not in_flight:
+                    if until_empty or (max_tasks is not None and processed >= max_tasks):
+                        break
+                    _wakeup.wait(self.poll_interval)
+                    _wakeup.clear()
+                    continue
+                if free <= len(claimed) or not claimed:
+                    # Le lot est plein (ou la file est vide) : attendre la fin d'une tâche
+                    done, in_flight = wait(in_flight, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                    processed += len(done)
+            done, _ = wait(in_flight)
+            processed += len(done)
+        close_old_connections()
+        return processed
@@ -1,8 +1,31 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from collections import Counter
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.core import mail
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connection, connections, transaction
+from django.db.backends.utils import CursorWrapper
+from django.test import AsyncClient, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.db.models.signals import post_save
-from django.contrib.auth.models import User
-from .models import Competence, Slot, Activity, Profile, Category, create_user_profile
-from datetime import date
+from django.template import Context, Template, engines
+from django.contrib.auth.models import AnonymousUser, User
+from django.urls import reverse
+from django.utils import timezone
+from .models import Competence, Slot, Activity, Profile, Category, MatchIndexEntry, MatchProposal, ArchivedSlot, ArchivedActivity, Task, AvailabilityStat
+from .pagination import EstimatedCountPaginator, InvalidCursor, KeysetPaginator
+from . import archive, benchmark, catalogue, database, events, performance, data_exchange, loadgen, match_index, matching, notifications, profiles, queries, recurrence, rows, search, stats, tasks, versions, views
+from .volunteering import ClaimResult, claim_activity
+from datetime import date, timedelta
 
 
 class CompetenceModelTest(TestCase):
@@ -150,3 +173,2137 @@ class ProfileModelTest(TestCase):
         expected_str = f"Profil de {self.user.username}"
         self.assertEqual(str(self.profile), expected_str)
 
+
+class ViewQueryCountTest(TestCase):
+    """
+    Garde-fou sur le nombre de requêtes SQL exécutées par chaque vue de liste.
+    Le nombre de requêtes doit rester constant quel que soit le nombre de lignes affichées.
+    """
+
+    # Nombre maximal de requêtes par vue (session et utilisateur inclus pour les vues authentifiées)
+    QUERY_BUDGETS = {
+        'available_slots': 4,
+        'competence_list': 4,
+        'user_competences': 3,
+        'my_slots': 4,
+        'help_requests': 3,
+        'my_requests': 3,
+        'available_help': 3,
+    }
+
+    def setUp(self):
+        """
+        Crée deux utilisateurs, des catégories et des compétences partagées.
+        """
+        self.user = User.objects.create_user(username="viewer", password="secret")
+        self.other = User.objects.create_user(username="helper", password="secret")
+        self.category = Category.objects.create(name="Maison")
+        self.owned = Competence.objects.create(name="Plomberie", category=self.category)
+        self.missing = Competence.objects.create(name="Couture", category=self.category)
+        self.user.profile.competences.add(self.owned)
+        self.client.login(username="viewer", password="secret")
+
+    def create_rows(self, count):
+        """
+        Crée `count` lignes de chaque sorte affichée par les vues de liste.
+        """
+        tomorrow = date.today() + timedelta(days=1)
+        for index in range(count):
+            category = Category.objects.create(name=f"Catégorie {len(Category.objects.all())}")
+            Competence.objects.create(name=f"Compétence {category.pk}", category=category)
+            Slot.objects.create(date=tomorrow, user=self.other, competence=self.missing, purpose='aid')
+            own_slot = Slot.objects.create(date=tomorrow, user=self.user, competence=self.owned, purpose='request')
+            Activity.objects.create(
+                description="Ma demande", requester=self.user, competence_needed=self.owned, slot=own_slot
+            )
+            other_slot = Slot.objects.create(date=tomorrow, user=self.other, competence=self.owned, purpose='request')
+            Activity.objects.create(
+                description="Sa demande", requester=self.other, competence_needed=self.owned,
+                slot=other_slot, volunteer=self.user if index % 2 else None
+            )
+
+    def test_query_budget_is_independent_of_row_count(self):
+        """
+        Vérifie que chaque vue respecte son budget de requêtes, avec peu puis beaucoup de lignes.
+        """
+        for count in (2, 10):
+            self.create_rows(count)
+            # Compteurs de versions et compétences de l'utilisateur en cache, comme en régime établi
+            # (chaque écriture les retire du cache)
+            versions.read(versions.TRACKED_MODELS)
+            profiles.competence_ids(self.user)
+            for url_name, budget in self.QUERY_BUDGETS.items():
+                with self.subTest(view=url_name, rows=count):
+                    with self.assertNumQueries(budget):
+                        response = self.client.get(reverse(url_name))
+                    self.assertEqual(response.status_code, 200)
+
+    def test_available_slots_lists_future_aid_slots(self):
+        """
+        Vérifie que la liste publique affiche les créneaux d'aide à venir avec leur compétence.
+        """
+        self.create_rows(3)
+        response = self.client.get(reverse('available_slots'))
+        self.assertEqual(len(response.context['slots']), 3)
+        self.assertContains(response, "Couture")
+
+
+
+class KeysetPaginatorTest(TestCase):
+    """
+    Classe de test pour la pagination par curseur.
+    """
+
+    def setUp(self):
+        """
+        Crée des créneaux répartis sur plusieurs dates, dont plusieurs le même jour.
+        """
+        self.user = User.objects.create_user(username="paginated")
+        self.competence = Competence.objects.create(name="Peinture")
+        for offset in (3, 1, 2, 1, 3, 2, 1):
+            Slot.objects.create(date=date.today() + timedelta(days=offset), user=self.user, competence=self.competence)
+
+    def collect_pages(self, paginator):
+        """
+        Parcourt toutes les pages et retourne les identifiants dans l'ordre.
+        """
+        ids, cursor = [], None
+        while True:
+            page = paginator.get_page(cursor)
+            ids.extend(slot.id for slot in page)
+            if not page.has_next:
+                return ids
+            cursor = page.next_cursor
+
+    def test_pages_follow_date_then_id(self):
+        """
+        Vérifie que les pages couvrent tous les créneaux, sans doublon, triés par (date, id).
+        """
+        paginator = KeysetPaginator(Slot.objects.all(), ordering=('date', 'id'), per_page=2)
+        expected = list(Slot.objects.order_by('date', 'id').values_list('id', flat=True))
+        self.assertEqual(self.collect_pages(paginator), expected)
+
+    def test_descending_ordering(self):
+        """
+        Vérifie le parcours avec un tri décroissant.
+        """
+        paginator = KeysetPaginator(Slot.objects.all(), ordering=('-date', '-id'), per_page=3)
+        expected = list(Slot.objects.order_by('-date', '-id').values_list('id', flat=True))
+        self.assertEqual(self.collect_pages(paginator), expected)
+
+    def test_cursor_is_stable_under_inserts(self):
+        """
+        Vérifie qu'une insertion avant le curseur ne décale pas la page suivante.
+        """
+        paginator = KeysetPaginator(Slot.objects.all(), ordering=('date', 'id'), per_page=2)
+        first_page = paginator.get_page()
+        Slot.objects.create(date=date.today(), user=self.user, competence=self.competence)
+        second_page = paginator.get_page(first_page.next_cursor)
+        expected = list(Slot.objects.order_by('date', 'id').values_list('id', flat=True))
+        self.assertEqual([slot.id for slot in second_page], expected[3:5])
+
+    def test_invalid_cursor(self):
+        """
+        Vérifie qu'un curseur malformé est refusé, par le paginateur comme par la vue.
+        """
+        paginator = KeysetPaginator(Slot.objects.all())
+        with self.assertRaises(InvalidCursor):
+            paginator.get_page("pas-un-curseur")
+        response = self.client.get(reverse('available_slots'), {'cursor': 'pas-un-curseur'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_available_slots_links_next_page(self):
+        """
+        Vérifie que la page publique propose un lien vers les créneaux suivants.
+        """
+        with mock.patch.object(views, 'SLOTS_PER_PAGE', 5):
+            response = self.client.get(reverse('available_slots'))
+        self.assertEqual(len(response.context['slots']), 5)
+        self.assertContains(response, "?cursor=" + response.context['page'].next_cursor)
+
+
+class ExplainViewQueriesCommandTest(TestCase):
+    """
+    Classe de test pour la commande explain_view_queries.
+    """
+
+    def test_plans_use_slot_indexes(self):
+        """
+        Vérifie que la commande affiche un plan par vue et que les listes de créneaux ouverts utilisent les index dédiés.
+        """
+        user = User.objects.create_user(username="planner")
+        competence = Competence.objects.create(name="Menuiserie")
+        Slot.objects.create(date=date.today(), user=user, competence=competence)
+        output = StringIO()
+        call_command('explain_view_queries', username="planner", stdout=output)
+        plans = output.getvalue()
+        for view_name in ('available_slots', 'my_slots', 'help_requests', 'my_requests', 'available_help'):
+            self.assertIn(f"== {view_name}", plans)
+        self.assertIn("slot_open_aid_date_idx", plans)
+        self.assertIn("slot_user_date_idx", plans)
+
+
+class MatchIndexTest(TestCase):
+    """
+    Classe de test pour l'index de correspondance des créneaux ouverts.
+    """
+
+    def setUp(self):
+        """
+        Crée un demandeur, un volontaire et une demande d'aide ouverte.
+        """
+        self.requester = User.objects.create_user(username="demandeur")
+        self.helper = User.objects.create_user(username="volontaire")
+        self.competence = Competence.objects.create(name="Électricité")
+        self.other_competence = Competence.objects.create(name="Musique")
+        self.helper.profile.competences.add(self.competence)
+        self.slot = Slot.objects.create(
+            date=date.today(), user=self.requester, competence=self.competence, purpose='request'
+        )
+        self.activity = Activity.objects.create(
+            description="Changer une prise", requester=self.requester,
+            competence_needed=self.competence, slot=self.slot
+        )
+        self.offer = Slot.objects.create(
+            date=date.today(), user=self.requester, competence=self.other_competence, purpose='aid'
+        )
+
+    def indexed(self):
+        """
+        Retourne le contenu de l'index sous forme d'ensemble comparable.
+        """
+        return set(MatchIndexEntry.objects.values_list('purpose', 'competence_id', 'slot_id', 'activity_id', 'owner_id'))
+
+    def test_signals_index_open_slots(self):
+        """
+        Vérifie que les créneaux ouverts et leurs activités sont indexés à la création.
+        """
+        self.assertEqual(self.indexed(), {
+            ('request', self.competence.id, self.slot.id, self.activity.id, self.requester.id),
+            ('aid', self.other_competence.id, self.offer.id, None, self.requester.id),
+        })
+
+    def test_closed_and_deleted_slots_leave_the_index(self):
+        """
+        Vérifie qu'un créneau fermé ou supprimé disparaît de l'index.
+        """
+        self.slot.is_available = False
+        self.slot.save()
+        self.offer.delete()
+        self.assertEqual(self.indexed(), set())
+
+    def test_rebuild_matches_signal_maintained_index(self):
+        """
+        Vérifie que la reconstruction complète produit le même index que les signaux.
+        """
+        expected = self.indexed()
+        MatchIndexEntry.objects.all().delete()
+        call_command('rebuild_match_index', stdout=StringIO())
+        self.assertEqual(self.indexed(), expected)
+        self.assertEqual(match_index.rebuild(batch_size=1), len(expected))
+
+    def test_views_read_matches_from_index(self):
+        """
+        Vérifie les listes help_requests et available_help calculées à partir de l'index.
+        """
+        self.assertEqual(list(queries.help_requests_queryset(self.helper, profiles.competence_ids(self.helper))), [self.activity])
+        self.assertEqual(list(queries.available_help_queryset(self.helper, profiles.competence_ids(self.helper))), [self.offer])
+        self.assertEqual(list(queries.help_requests_queryset(self.requester, profiles.competence_ids(self.requester))), [])
+
+        # Une fois volontaire, la demande reste visible pour le volontaire
+        self.slot.is_available = False
+        self.slot.save()
+        self.activity.volunteer = self.helper
+        self.activity.save()
+        self.assertEqual(list(queries.help_requests_queryset(self.helper, profiles.competence_ids(self.helper))), [self.activity])
+
+
+class CatalogueCacheTest(TestCase):
+    """
+    Classe de test pour le catalogue des compétences mis en cache.
+    """
+
+    def setUp(self):
+        """
+        Vide le cache et crée une catégorie contenant deux compétences.
+        """
+        cache.clear()
+        self.category = Category.objects.create(name="Jardin")
+        Competence.objects.create(name="Taille", category=self.category)
+        Competence.objects.create(name="Arrosage", category=self.category)
+
+    def test_catalogue_is_grouped_and_sorted(self):
+        """
+        Vérifie le regroupement des compétences par catégorie, triées par nom.
+        """
+        self.assertEqual(catalogue.get_catalogue(), [{
+            'id': self.category.id,
+            'name': "Jardin",
+            'competences': [
+                {'id': Competence.objects.get(name="Arrosage").id, 'name': "Arrosage"},
+                {'id': Competence.objects.get(name="Taille").id, 'name': "Taille"},
+            ],
+        }])
+
+    def test_cached_page_runs_no_query(self):
+        """
+        Vérifie qu'une fois le fragment en cache, la page anonyme ne fait aucune requête.
+        """
+        self.client.get(reverse('competence_list'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('competence_list'))
+        self.assertContains(response, "Arrosage")
+
+    def test_changes_invalidate_the_cache(self):
+        """
+        Vérifie que l'ajout, la modification et la suppression invalident le catalogue.
+        """
+        self.client.get(reverse('competence_list'))
+        competence = Competence.objects.create(name="Bouturage", category=self.category)
+        self.assertContains(self.client.get(reverse('competence_list')), "Bouturage")
+        competence.name = "Semis"
+        competence.save()
+        response = self.client.get(reverse('competence_list'))
+        self.assertContains(response, "Semis")
+        self.assertNotContains(response, "Bouturage")
+        self.category.delete()
+        self.assertContains(self.client.get(reverse('competence_list')), "Aucune compétence disponible.")
+
+
+class ClaimActivityTest(TestCase):
+    """
+    Classe de test pour la prise en charge d'une demande d'aide.
+    """
+
+    def setUp(self):
+        """
+        Crée une demande d'aide ouverte et un volontaire possédant la compétence requise.
+        """
+        self.requester = User.objects.create_user(username="demande")
+        self.helper = User.objects.create_user(username="aide", password="secret")
+        self.competence = Competence.objects.create(name="Dépannage")
+        self.helper.profile.competences.add(self.competence)
+        self.slot = Slot.objects.create(date=date.today(), user=self.requester, competence=self.competence, purpose='request')
+        self.activity = Activity.objects.create(
+            description="Panne de chauffage", requester=self.requester, competence_needed=self.competence, slot=self.slot
+        )
+
+    def test_claim_closes_slot_and_sets_volunteer(self):
+        """
+        Vérifie qu'une prise en charge ferme le créneau, enregistre le volontaire et met à jour l'index.
+        """
+        self.assertIs(claim_activity(self.activity.id, self.helper), ClaimResult.CLAIMED)
+        self.activity.refresh_from_db()
+        self.slot.refresh_from_db()
+        self.assertEqual(self.activity.volunteer, self.helper)
+        self.assertFalse(self.slot.is_available)
+        self.assertFalse(MatchIndexEntry.objects.filter(slot=self.slot).exists())
+        # Une nouvelle tentative du même volontaire n'est pas un conflit
+        self.assertIs(claim_activity(self.activity.id, self.helper), ClaimResult.CLAIMED)
+
+    def test_claim_results(self):
+        """
+        Vérifie les refus : activité inconnue, compétence manquante, créneau déjà pris.
+        """
+        outsider = User.objects.create_user(username="sans-competence")
+        late = User.objects.create_user(username="retardataire")
+        late.profile.competences.add(self.competence)
+        self.assertIs(claim_activity(0, self.helper), ClaimResult.NOT_FOUND)
+        self.assertIs(claim_activity(self.activity.id, outsider), ClaimResult.MISSING_COMPETENCE)
+        claim_activity(self.activity.id, self.helper)
+        self.assertIs(claim_activity(self.activity.id, late), ClaimResult.CONFLICT)
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.volunteer, self.helper)
+
+    def test_view_status_codes(self):
+        """
+        Vérifie la redirection après succès et le code 409 en cas de conflit.
+        """
+        self.client.login(username="aide", password="secret")
+        url = reverse('volunteer_for_help', args=[self.activity.id])
+        self.assertRedirects(self.client.get(url), reverse('help_requests'))
+        Activity.objects.filter(pk=self.activity.pk).update(volunteer=self.requester)
+        self.assertEqual(self.client.get(url).status_code, 409)
+        self.assertEqual(self.client.get(reverse('volunteer_for_help', args=[0])).status_code, 404)
+
+
+class ConcurrentClaimTest(TransactionTestCase):
+    """
+    Vérifie qu'une seule prise en charge réussit lorsque plusieurs volontaires se proposent simultanément.
+    """
+
+    VOLUNTEERS = 8
+
+    def test_exactly_one_concurrent_claim_wins(self):
+        """
+        Lance les prises en charge dans des threads synchronisés et vérifie qu'un seul volontaire l'emporte.
+        """
+        requester = User.objects.create_user(username="demandeur-concurrent")
+        competence = Competence.objects.create(name="Serrurerie")
+        slot = Slot.objects.create(date=date.today(), user=requester, competence=competence, purpose='request')
+        activity = Activity.objects.create(
+            description="Porte bloquée", requester=requester, competence_needed=competence, slot=slot
+        )
+        volunteers = []
+        for index in range(self.VOLUNTEERS):
+            volunteer = User.objects.create_user(username=f"volontaire-{index}")
+            volunteer.profile.competences.add(competence)
+            volunteers.append(volunteer)
+
+        barrier = threading.Barrier(self.VOLUNTEERS)
+        results = {}
+
+        def claim(volunteer):
+            try:
+                barrier.wait()
+                results[volunteer.pk] = claim_activity(activity.id, volunteer)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=claim, args=(volunteer,)) for volunteer in volunteers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        winners = [pk for pk, result in results.items() if result is ClaimResult.CLAIMED]
+        self.assertEqual(len(results), self.VOLUNTEERS)
+        self.assertEqual(len(winners), 1)
+        self.assertEqual(
+            sorted(result.value for result in results.values()),
+            ['claimed'] + ['conflict'] * (self.VOLUNTEERS - 1),
+        )
+        activity.refresh_from_db()
+        self.assertEqual(activity.volunteer_id, winners[0])
+
+
+class RecurringSlotTest(TestCase):
+    """
+    Classe de test pour la création de créneaux récurrents ou multiples.
+    """
+
+    def setUp(self):
+        """
+        Crée un utilisateur connecté possédant une compétence.
+        """
+        self.user = User.objects.create_user(username="recurrent", password="secret")
+        self.competence = Competence.objects.create(name="Soutien scolaire")
+        self.user.profile.competences.add(self.competence)
+        self.client.login(username="recurrent", password="secret")
+        self.monday = date(2030, 1, 7)
+
+    def test_expand_dates(self):
+        """
+        Vérifie le calcul des dates : date unique, récurrence hebdomadaire, jours choisis et dates supplémentaires.
+        """
+        self.assertEqual(recurrence.expand_dates(self.monday), [self.monday])
+        self.assertEqual(
+            recurrence.expand_dates(self.monday, self.monday + timedelta(days=14)),
+            [self.monday, self.monday + timedelta(days=7), self.monday + timedelta(days=14)],
+        )
+        self.assertEqual(
+            recurrence.expand_dates(self.monday, self.monday + timedelta(days=6), weekdays=[1, 3], extra_dates=[date(2030, 3, 1)]),
+            [self.monday + timedelta(days=1), self.monday + timedelta(days=3), date(2030, 3, 1)],
+        )
+
+    def test_expand_dates_is_bounded(self):
+        """
+        Vérifie le refus d'une période incohérente ou trop longue.
+        """
+        with self.assertRaises(ValidationError):
+            recurrence.expand_dates(self.monday, self.monday - timedelta(days=1))
+        with self.assertRaises(ValidationError):
+            recurrence.expand_dates(self.monday, date(9999, 12, 31), weekdays=range(7))
+
+    @override_settings(TASKS_EAGER=False)
+    def test_add_recurring_request_slots(self):
+        """
+        Vérifie la création en une requête HTTP d'une longue série de créneaux de demande et de leurs
+        activités, puis leur indexation par une tâche de fond.
+        """
+        # Dont l'incrémentation des versions des créneaux et des activités, la mise à jour des statistiques
+        # de disponibilité (une requête pour toutes les semaines) et l'insertion de deux tâches
+        with self.assertNumQueries(12):
+            response = self.client.post(reverse('add_slot'), {
+                'date': self.monday.isoformat(),
+                'repeat_until': (self.monday + timedelta(days=55)).isoformat(),
+                'weekdays': ['1', '3'],
+                'competence': self.competence.id,
+                'purpose': 'request',
+                'description': "Aide aux devoirs",
+            })
+        self.assertRedirects(response, reverse('my_slots'), fetch_redirect_response=False)
+        self.assertEqual(Slot.objects.filter(user=self.user).count(), 16)
+        self.assertEqual(Activity.objects.filter(requester=self.user, description="Aide aux devoirs").count(), 16)
+        self.assertFalse(MatchIndexEntry.objects.exists())
+        # La fusion de l'index plein texte, différée, attend son délai
+        self.assertEqual(tasks.run_pending(), 1)
+        self.assertEqual(MatchIndexEntry.objects.filter(owner=self.user, purpose='request').count(), 16)
+
+    @override_settings(TASKS_EAGER=False)
+    def test_few_slots_indexed_without_worker(self):
+        """
+        Vérifie qu'un créneau isolé est indexé dans la requête qui le crée, sans attendre un worker.
+        """
+        self.client.post(reverse('add_slot'), {
+            'date': self.monday.isoformat(), 'competence': self.competence.id,
+            'purpose': 'request', 'description': "Aide aux devoirs",
+        })
+        entry = MatchIndexEntry.objects.get(owner=self.user)
+        self.assertEqual((entry.purpose, entry.activity.description), ('request', "Aide aux devoirs"))
+        self.assertFalse(Task.objects.filter(name=match_index.index_new_slots.task_name).exists())
+
+    def test_invalid_dates_create_nothing(self):
+        """
+        Vérifie qu'une date invalide est signalée sans créer de créneau.
+        """
+        response = self.client.post(reverse('add_slot'), {
+            'date': self.monday.isoformat(),
+            'extra_dates': "2030-02-30",
+            'competence': self.competence.id,
+            'purpose': 'aid',
+        })
+        self.assertContains(response, "Date supplémentaire invalide", status_code=400)
+        self.assertFalse(Slot.objects.exists())
+
+    def test_invalid_purpose_creates_nothing(self):
+        """
+        Vérifie qu'un objectif inconnu ou absent est signalé sans créer de créneau.
+        """
+        for purpose in ('cadeau', None):
+            data = {'date': self.monday.isoformat(), 'competence': self.competence.id}
+            if purpose is not None:
+                data['purpose'] = purpose
+            with self.subTest(purpose=purpose):
+                response = self.client.post(reverse('add_slot'), data)
+                self.assertContains(response, "Objectif invalide", status_code=400)
+        self.assertFalse(Slot.objects.exists())
+
+
+class DataExchangeCommandTest(TestCase):
+    """
+    Classe de test pour les commandes import_data et export_data.
+    """
+
+    def setUp(self):
+        """
+        Crée un petit jeu de données couvrant les quatre modèles échangés.
+        """
+        self.user = User.objects.create_user(username="exportateur")
+        category = Category.objects.create(name="Cuisine")
+        self.competence = Competence.objects.create(name="Pâtisserie", category=category)
+        Competence.objects.create(name="Sans catégorie")
+        slot = Slot.objects.create(date=date(2030, 5, 4), user=self.user, competence=self.competence, purpose='request')
+        Activity.objects.create(description="Gâteau, « anniversaire »", requester=self.user, competence_needed=self.competence, slot=slot)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def export(self, model, fmt):
+        """
+        Exporte un modèle dans un fichier temporaire et retourne son chemin.
+        """
+        path = os.path.join(self.directory.name, f"{model}.{fmt}")
+        call_command('export_data', model, format=fmt, output=path, stdout=StringIO())
+        return path
+
+    def snapshot(self):
+        """
+        Retourne le contenu des quatre modèles sous une forme comparable.
+        """
+        return (
+            list(Category.objects.values_list('name').order_by('name')),
+            list(Competence.objects.values_list('name', 'category__name').order_by('name')),
+            list(Slot.objects.values_list('id', 'date', 'user__username', 'competence__name', 'is_available', 'purpose').order_by('id')),
+            list(Activity.objects.values_list('id', 'description', 'requester__username', 'slot_id', 'volunteer').order_by('id')),
+        )
+
+    def test_round_trip(self):
+        """
+        Vérifie qu'un export suivi d'un import dans une base vidée restaure les mêmes données, dans les deux formats.
+        """
+        expected = self.snapshot()
+        for fmt in data_exchange.FORMATS:
+            with self.subTest(format=fmt):
+                paths = [self.export(model, fmt) for model in ('category', 'competence', 'slot', 'activity')]
+                Category.objects.all().delete()
+                Competence.objects.all().delete()
+                for model, path in zip(('category', 'competence', 'slot', 'activity'), paths):
+                    call_command('import_data', model, path, batch_size=1, stdout=StringIO())
+                self.assertEqual(self.snapshot(), expected)
+                self.assertEqual(MatchIndexEntry.objects.filter(purpose='request').count(), 1)
+
+    def test_export_to_stdout(self):
+        """
+        Vérifie que l'export sans fichier écrit les seules données sur la sortie de la commande, et le bilan à part.
+        """
+        output, errors = StringIO(), StringIO()
+        call_command('export_data', 'category', format='jsonl', stdout=output, stderr=errors)
+        self.assertEqual([json.loads(line) for line in output.getvalue().splitlines()], [{'name': "Cuisine"}])
+        self.assertEqual(errors.getvalue(), "1 lignes exportées.\n")
+
+    def test_upsert_by_name(self):
+        """
+        Vérifie que l'import met à jour les compétences existantes au lieu de les dupliquer.
+        """
+        rows = [{'name': "Pâtisserie", 'category': None}, {'name': "Boulangerie", 'category': "Cuisine"}]
+        self.assertEqual(data_exchange.import_rows(data_exchange.SPECS['competence'], rows), 2)
+        self.assertIsNone(Competence.objects.get(name="Pâtisserie").category)
+        self.assertEqual(Competence.objects.get(name="Boulangerie").category.name, "Cuisine")
+        self.assertEqual(Competence.objects.count(), 3)
+
+    def test_invalid_row_is_reported(self):
+        """
+        Vérifie qu'une référence inconnue ou une valeur invalide interrompt l'import avec le numéro de ligne.
+        """
+        path = os.path.join(self.directory.name, "slots.csv")
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write("id,date,user,competence,is_available,purpose\n")
+            stream.write(",2030-01-01,exportateur,Pâtisserie,True,aid\n")
+            stream.write(",2030-01-02,inconnu,Pâtisserie,True,aid\n")
+        with self.assertRaisesMessage(CommandError, "Ligne 2 : user inconnu"):
+            call_command('import_data', 'slot', path, stdout=StringIO())
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write("id,date,user,competence,is_available,purpose\n")
+            stream.write(",2030-01-01,exportateur,Pâtisserie,True,autre\n")
+        with self.assertRaisesMessage(CommandError, "Ligne 1"):
+            call_command('import_data', 'slot', path, stdout=StringIO())
+
+
+class LoadGenerationAndBenchmarkTest(TestCase):
+    """
+    Classe de test pour le générateur de données et le banc d'essai des vues.
+    """
+
+    def test_generate_is_reproducible_and_skewed(self):
+        """
+        Vérifie les volumes générés, la reproductibilité par graine et la concentration des créneaux sur la compétence la plus populaire.
+        """
+        created = loadgen.generate(users=20, categories=3, competences=30, slots=400, seed=7, prefix="a")
+        self.assertEqual(created['users'], 20)
+        self.assertEqual(created['slots'], 400)
+        self.assertEqual(Profile.objects.filter(user__username__startswith="a-").count(), 20)
+        self.assertEqual(created['activities'], Slot.objects.filter(purpose='request').count())
+        first = list(Slot.objects.values_list('competence__name', 'purpose', 'date').order_by('id'))
+        loadgen.generate(users=20, categories=3, competences=30, slots=400, seed=7, prefix="b")
+        second = list(Slot.objects.filter(user__username__startswith="b-").values_list('competence__name', 'purpose', 'date').order_by('id'))
+        self.assertEqual([(name.replace("a ", "b ", 1), purpose, day) for name, purpose, day in first], second)
+        most_used = Slot.objects.filter(competence__name="a compétence 0").count()
+        self.assertGreater(most_used, 400 / 30 * 3)
+
+    def test_run_measures_every_route(self):
+        """
+        Vérifie que le banc d'essai mesure toutes les routes de core/urls.py avec le statut attendu.
+        """
+        loadgen.generate(users=5, categories=2, competences=5, slots=30, seed=1)
+        user = User.objects.get(username="charge-0")
+        results = benchmark.run(user, iterations=2)
+        expected_status = {'logout': 302, 'delete_slot': 302, 'add_slot': 302, 'volunteer_for_help': 302}
+        self.assertEqual(set(results['routes']), {route.name for route in benchmark.ROUTES})
+        for name, measures in results['routes'].items():
+            with self.subTest(route=name):
+                self.assertEqual(measures['status'], expected_status.get(name, 200))
+                self.assertLessEqual(measures['p50_ms'], measures['p95_ms'])
+
+    def test_compare_flags_regressions(self):
+        """
+        Vérifie la détection des régressions de latence et de nombre de requêtes.
+        """
+        def result(p95, queries):
+            return {'routes': {'vue': {'p95_ms': p95, 'queries': queries}}}
+        self.assertEqual(benchmark.compare(result(10, 3), result(11, 3))[1], [])
+        self.assertEqual(benchmark.compare(result(10, 3), result(13, 3))[1], ['vue'])
+        self.assertEqual(benchmark.compare(result(10, 3), result(10, 4))[1], ['vue'])
+
+
+class PerformanceMiddlewareTest(TestCase):
+    """
+    Classe de test pour le middleware de mesure des performances.
+    """
+
+    def setUp(self):
+        """
+        Vide les statistiques et le cache, puis crée un membre du personnel.
+        """
+        performance.registry.reset()
+        cache.clear()
+        self.staff = User.objects.create_user(username="personnel", password="secret", is_staff=True)
+        versions.read(versions.TRACKED_MODELS)
+
+    def test_server_timing_header(self):
+        """
+        Vérifie la présence des durées totale, base et gabarits dans l'en-tête Server-Timing.
+        """
+        response = self.client.get(reverse('competence_list'))
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="SQL \(1\)", tpl;dur=[\d.]+$')
+
+    def test_routes_are_aggregated(self):
+        """
+        Vérifie l'agrégation par route des durées, requêtes SQL et tailles de réponse.
+        """
+        for _ in range(3):
+            self.client.get(reverse('available_slots'))
+        stats = performance.registry.snapshot()['available_slots']
+        self.assertEqual(stats['count'], 3)
+        self.assertEqual(sum(bucket['count'] for bucket in stats['histogram']), 3)
+        self.assertEqual(stats['mean_queries'], 1)
+        self.assertGreater(stats['mean_bytes'], 0)
+        self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+
+    def test_stats_endpoint_is_staff_only(self):
+        """
+        Vérifie que seules les personnes du personnel accèdent aux statistiques, en HTML comme en JSON.
+        """
+        self.client.get(reverse('available_slots'))
+        self.assertEqual(self.client.get(reverse('performance_stats')).status_code, 302)
+        self.client.login(username="personnel", password="secret")
+        self.assertContains(self.client.get(reverse('performance_stats')), "available_slots")
+        data = self.client.get(reverse('performance_stats'), {'format': 'json'}).json()
+        self.assertIn('available_slots', data['routes'])
+
+    def test_slow_requests_are_logged(self):
+        """
+        Vérifie qu'une requête dépassant le seuil est journalisée en WARNING.
+        """
+        with self.settings(PERFORMANCE_SLOW_REQUEST_MS=-1):
+            with self.assertLogs('core.performance', level='WARNING') as logs:
+                self.client.get(reverse('available_slots'))
+        self.assertIn("available_slots", logs.output[0])
+
+
+class MatchingEngineTest(TestCase):
+    """
+    Classe de test pour le moteur de correspondance entre demandes et offres d'aide.
+    """
+
+    def setUp(self):
+        """
+        Crée trois utilisateurs et une compétence.
+        """
+        self.alice = User.objects.create_user(username="alice", password="secret")
+        self.bob = User.objects.create_user(username="bob", password="secret")
+        self.carol = User.objects.create_user(username="carol", password="secret")
+        self.competence = Competence.objects.create(name="Plomberie")
+        self.day = date.today() + timedelta(days=3)
+
+    def create_request(self, user, day=None):
+        """
+        Crée une demande d'aide ouverte et son activité.
+        """
+        slot = Slot.objects.create(date=day or self.day, user=user, competence=self.competence, purpose='request')
+        return Activity.objects.create(description="Besoin", requester=user, competence_needed=self.competence, slot=slot)
+
+    def create_offer(self, user, day=None):
+        """
+        Crée un créneau d'aide ouvert.
+        """
+        return Slot.objects.create(date=day or self.day, user=user, competence=self.competence, purpose='aid')
+
+    def test_assign_groups_by_competence_and_date(self):
+        """
+        Vérifie que seules les demandes et offres de même compétence et de même date sont associées.
+        """
+        day = date(2030, 1, 1)
+        requests = [(1, 5, day, 100), (2, 6, day, 100), (3, 5, day + timedelta(days=1), 100)]
+        offers = [(10, 5, day, 200), (11, 6, day + timedelta(days=1), 200)]
+        self.assertEqual(matching.assign(requests, offers), [(1, 10)])
+
+    def test_match_bucket_reassigns_to_avoid_own_offer(self):
+        """
+        Vérifie qu'un chemin augmentant libère une offre plutôt que d'associer une demande à l'offre de son auteur.
+        """
+        requests = [(1, 'carol'), (2, 'alice')]
+        offers = [(10, 'bob'), (11, 'alice')]
+        self.assertEqual(matching.match_bucket(requests, offers), [(1, 11), (2, 10)])
+        self.assertEqual(matching.match_bucket([(1, 'alice')], [(11, 'alice')]), [])
+
+    def test_synthetic_matching_is_maximal_per_bucket(self):
+        """
+        Vérifie sur des données synthétiques qu'aucune offre n'est proposée deux fois ni à son auteur, et que
+        chaque groupe (compétence, date) atteint la borne min(demandes, offres).
+        """
+        requests, offers = benchmark.synthetic_open_slots(2000, competences=10, days=5, owners=20)
+        pairs = matching.assign(requests, offers)
+        owners = {row[0]: row[3] for row in requests + offers}
+        self.assertEqual(len({slot_id for _, slot_id in pairs}), len(pairs))
+        self.assertEqual(len({activity_id for activity_id, _ in pairs}), len(pairs))
+        self.assertTrue(all(owners[activity_id] != owners[slot_id] for activity_id, slot_id in pairs))
+        request_counts = Counter((row[1], row[2]) for row in requests)
+        offer_counts = Counter((row[1], row[2]) for row in offers)
+        self.assertEqual(len(pairs), sum(min(count, offer_counts[key]) for key, count in request_counts.items()))
+
+    def test_run_writes_proposals_and_is_idempotent(self):
+        """
+        Vérifie l'enregistrement des propositions, puis qu'une seconde exécution n'en crée pas de nouvelles.
+        """
+        activity = self.create_request(self.alice)
+        own_offer = self.create_offer(self.alice)
+        offer = self.create_offer(self.bob)
+        self.create_offer(self.carol, day=self.day + timedelta(days=1))
+
+        result = matching.run(dry_run=True)
+        self.assertEqual(result['proposals'], 1)
+        self.assertFalse(MatchProposal.objects.exists())
+
+        with self.assertNumQueries(6):
+            matching.run()
+        proposal = MatchProposal.objects.get()
+        self.assertEqual((proposal.activity, proposal.offer), (activity, offer))
+        self.assertNotEqual(proposal.offer, own_offer)
+        self.assertEqual(matching.run()['proposals'], 0)
+
+    def test_stale_proposals_are_removed(self):
+        """
+        Vérifie qu'une proposition dont l'offre a été prise est supprimée et l'activité de nouveau proposée.
+        """
+        activity = self.create_request(self.alice)
+        offer = self.create_offer(self.bob)
+        matching.run()
+        offer.is_available = False
+        offer.save()
+        replacement = self.create_offer(self.carol)
+        result = matching.run()
+        self.assertEqual(result['removed'], 1)
+        self.assertEqual(MatchProposal.objects.get().offer, replacement)
+        self.assertEqual(MatchProposal.objects.get().activity, activity)
+
+    def test_match_slots_command(self):
+        """
+        Vérifie la sortie de la commande match_slots.
+        """
+        self.create_request(self.alice)
+        self.create_offer(self.bob)
+        out = StringIO()
+        call_command('match_slots', stdout=out)
+        self.assertIn("1 propositions créées", out.getvalue())
+        self.assertEqual(MatchProposal.objects.count(), 1)
+
+
+class AsyncViewTest(TestCase):
+    """
+    Classe de test pour les vues de lecture asynchrones servies par le point d'entrée ASGI.
+    """
+
+    def setUp(self):
+        """
+        Crée un utilisateur connecté sur le client asynchrone, et des créneaux d'un autre utilisateur.
+        """
+        self.user = User.objects.create_user(username="asynchrone", password="secret")
+        self.other = User.objects.create_user(username="autre", password="secret")
+        self.owned = Competence.objects.create(name="Plomberie", category=Category.objects.create(name="Maison"))
+        self.missing = Competence.objects.create(name="Couture")
+        self.user.profile.competences.add(self.owned)
+        tomorrow = date.today() + timedelta(days=1)
+        Slot.objects.create(date=tomorrow, user=self.other, competence=self.missing, purpose='aid')
+        slot = Slot.objects.create(date=tomorrow, user=self.other, competence=self.owned, purpose='request')
+        Activity.objects.create(description="Fuite d'eau", requester=self.other, competence_needed=self.owned, slot=slot)
+        self.async_client.force_login(self.user)
+
+    async def test_async_views_render(self):
+        """
+        Vérifie le rendu des vues asynchrones via ASGI, y compris l'en-tête Server-Timing du middleware.
+        """
+        expected = {
+            'available_slots': "Couture",
+            'competence_list': "Plomberie",
+            'help_requests': "Fuite",
+            'available_help': "Couture",
+        }
+        for url_name, text in expected.items():
+            with self.subTest(view=url_name):
+                response = await self.async_client.get(reverse(url_name))
+                self.assertContains(response, text)
+                # Les requêtes SQL exécutées dans le thread de l'ORM sont bien comptées
+                self.assertNotIn('SQL (0)', response['Server-Timing'])
+
+    async def test_async_login_required(self):
+        """
+        Vérifie la redirection d'un visiteur anonyme, identique à celle de `login_required`.
+        """
+        response = await AsyncClient().get(reverse('help_requests'))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], f"{settings.LOGIN_URL}?next={reverse('help_requests')}")
+
+    def test_views_are_coroutines(self):
+        """
+        Vérifie que les vues de lecture sont asynchrones, pour ne pas occuper de thread sous ASGI.
+        """
+        for view in (views.available_slots, views.competence_list, views.help_requests, views.available_help):
+            with self.subTest(view=view.__name__):
+                self.assertTrue(asyncio.iscoroutinefunction(view))
+
+
+class EntryPointBenchmarkTest(TransactionTestCase):
+    """
+    Vérifie la comparaison des points d'entrée WSGI et ASGI (les requêtes sont servies par d'autres threads,
+    d'où des données validées).
+    """
+
+    def test_compare_entry_points(self):
+        """
+        Vérifie que chaque vue asynchrone répond sans erreur sur les deux points d'entrée.
+        """
+        loadgen.generate(users=5, categories=2, competences=5, slots=30, seed=1)
+        user = User.objects.get(username="charge-0")
+        results = benchmark.compare_entry_points(user, concurrency_levels=(4,), requests=8)
+        self.assertEqual(len(results), len(benchmark.ASYNC_ROUTES) * 2)
+        for result in results:
+            with self.subTest(route=result['route'], entry_point=result['entry_point']):
+                self.assertEqual(result['errors'], 0)
+                self.assertEqual(result['requests'], 8)
+                self.assertGreater(result['throughput_rps'], 0)
+
+
+class ApiTest(TestCase):
+    """
+    Classe de test pour l'API JSON en lecture seule.
+    """
+
+    def setUp(self):
+        """
+        Crée des créneaux ouverts (d'aide et de demande), un créneau passé et un créneau déjà pris.
+        """
+        self.user = User.objects.create_user(username="partenaire", password="secret")
+        self.category = Category.objects.create(name="Maison")
+        self.competence = Competence.objects.create(name="Plomberie", category=self.category)
+        tomorrow = date.today() + timedelta(days=1)
+        self.slots = [
+            Slot.objects.create(date=tomorrow + timedelta(days=index % 3), user=self.user, competence=self.competence, purpose='aid')
+            for index in range(7)
+        ]
+        Slot.objects.create(date=date.today() - timedelta(days=1), user=self.user, competence=self.competence, purpose='aid')
+        Slot.objects.create(date=tomorrow, user=self.user, competence=self.competence, purpose='aid', is_available=False)
+        request_slot = Slot.objects.create(date=tomorrow, user=self.user, competence=self.competence, purpose='request')
+        self.activity = Activity.objects.create(
+            description="Fuite", requester=self.user, competence_needed=self.competence, slot=request_slot
+        )
+        self.async_client.force_login(self.user)
+
+    def test_cursor_pagination_and_field_selection(self):
+        """
+        Vérifie le parcours complet des créneaux ouverts par curseur, en une requête SQL par page.
+        """
+        url = f"{reverse('api_slots')}?purpose=aid&fields=id,date&limit=3"
+        ids = []
+        while url:
+            with self.assertNumQueries(1):
+                data = self.client.get(url).json()
+            self.assertTrue(all(set(row) == {'id', 'date'} for row in data['results']))
+            ids.extend(row['id'] for row in data['results'])
+            url = data['next']
+        expected = sorted(self.slots, key=lambda slot: (slot.date, slot.pk))
+        self.assertEqual(ids, [slot.pk for slot in expected])
+
+    def test_resources_expose_no_personal_data(self):
+        """
+        Vérifie le contenu des ressources, sans nom d'utilisateur, et que les demandes d'aide sont réservées
+        aux utilisateurs connectés.
+        """
+        response = self.client.get(reverse('api_activities'), {'format': 'ndjson'})
+        self.assertEqual(response.status_code, 401)
+        self.assertNotContains(response, "Fuite", status_code=401)
+        self.client.force_login(User.objects.create_user(username="lecteur"))
+        activity = self.client.get(reverse('api_activities')).json()['results'][0]
+        self.assertEqual(activity['description'], "Fuite")
+        self.assertEqual(activity['competence'], "Plomberie")
+        competence = self.client.get(reverse('api_competences'), {'category': self.category.pk}).json()['results']
+        self.assertEqual(competence, [{'id': self.competence.pk, 'name': "Plomberie", 'category_id': self.category.pk, 'category': "Maison"}])
+        self.assertEqual(self.client.get(reverse('api_categories')).json()['results'], [{'id': self.category.pk, 'name': "Maison"}])
+        self.assertNotContains(self.client.get(reverse('api_slots')), "partenaire")
+
+    def test_etag_returns_not_modified(self):
+        """
+        Vérifie qu'une page inchangée renvoie 304 avec If-None-Match, puis 200 après une modification.
+        """
+        response = self.client.get(reverse('api_slots'))
+        etag = response['ETag']
+        self.assertEqual(self.client.get(reverse('api_slots'), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Slot.objects.create(date=date.today() + timedelta(days=1), user=self.user, competence=self.competence)
+        self.assertEqual(self.client.get(reverse('api_slots'), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_invalid_parameters(self):
+        """
+        Vérifie les réponses 400 sur un champ, une taille de page, un filtre ou un curseur invalide.
+        """
+        for params in ({'fields': 'id,user'}, {'limit': '0'}, {'limit': 'x'}, {'competence': 'abc'}, {'cursor': '!!'}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('api_slots'), params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+    def test_ndjson_stream(self):
+        """
+        Vérifie l'export NDJSON en flux de toutes les lignes, sans pagination.
+        """
+        with mock.patch('core.api.STREAM_CHUNK_SIZE', 2):
+            response = self.client.get(reverse('api_slots'), {'format': 'ndjson', 'fields': 'id,purpose'})
+            self.assertTrue(response.streaming)
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertEqual(len(lines), 8)
+        self.assertEqual(json.loads(lines[0]).keys(), {'id', 'purpose'})
+
+    async def test_ndjson_stream_under_asgi(self):
+        """
+        Vérifie que le flux NDJSON est servi par un itérateur asynchrone sous ASGI.
+        """
+        response = await self.async_client.get(reverse('api_activities'), {'format': 'ndjson'})
+        self.assertTrue(response.is_async)
+        lines = b''.join([chunk async for chunk in response.streaming_content]).decode().splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], [self.activity.pk])
+
+
+class ConditionalResponseTest(TestCase):
+    """
+    Classe de test pour les réponses conditionnelles (ETag, Last-Modified, 304) des pages de liste.
+    """
+
+    def setUp(self):
+        """
+        Crée un utilisateur connecté, une compétence et une demande d'aide d'un autre utilisateur.
+        """
+        cache.clear()
+        self.user = User.objects.create_user(username="conditionnel", password="secret")
+        self.other = User.objects.create_user(username="autre", password="secret")
+        self.competence = Competence.objects.create(name="Menuiserie")
+        slot = Slot.objects.create(date=date.today() + timedelta(days=2), user=self.other, competence=self.competence, purpose='request')
+        self.activity = Activity.objects.create(
+            description="Étagère", requester=self.other, competence_needed=self.competence, slot=slot
+        )
+
+    def test_competence_list_not_modified_without_query(self):
+        """
+        Vérifie qu'une page inchangée est servie en 304 sans requête SQL, puis en 200 après une modification.
+        """
+        response = self.client.get(reverse('competence_list'))
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(response['Cache-Control'], 'public, no-cache')
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('competence_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Competence.objects.create(name="Vitrerie")
+        self.assertEqual(self.client.get(reverse('competence_list'), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_modified_since(self):
+        """
+        Vérifie la réponse 304 sur If-Modified-Since d'une vue synchrone (décorateur `condition`).
+        """
+        self.client.login(username="conditionnel", password="secret")
+        response = self.client.get(reverse('my_slots'))
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        last_modified = response['Last-Modified']
+        self.assertEqual(self.client.get(reverse('my_slots'), HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+    def test_etag_depends_on_user_and_competences(self):
+        """
+        Vérifie que l'ETag d'une page dépend de l'utilisateur et change avec ses compétences.
+        """
+        anonymous_etag = self.client.get(reverse('available_slots'))['ETag']
+        self.client.login(username="conditionnel", password="secret")
+        self.assertNotEqual(self.client.get(reverse('available_slots'))['ETag'], anonymous_etag)
+
+        etag = self.client.get(reverse('help_requests'))['ETag']
+        self.assertEqual(self.client.get(reverse('help_requests'), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.user.profile.competences.add(self.competence)
+        response = self.client.get(reverse('help_requests'), HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "Étagère")
+
+    def test_claim_updates_timestamps_and_versions(self):
+        """
+        Vérifie que la prise en charge, faite par UPDATE sans signal, met à jour updated_at et les versions.
+        """
+        self.user.profile.competences.add(self.competence)
+        before = versions.read(('core.activity', 'core.slot'))[0]
+        stamp = Activity.objects.get(pk=self.activity.pk).updated_at
+        self.assertIs(claim_activity(self.activity.pk, self.user), ClaimResult.CLAIMED)
+        self.assertEqual(versions.read(('core.activity', 'core.slot'))[0], tuple(version + 1 for version in before))
+        self.assertGreater(Activity.objects.get(pk=self.activity.pk).updated_at, stamp)
+
+
+class UserCompetenceCacheTest(TestCase):
+    """
+    Classe de test pour l'ensemble mémorisé des compétences d'un utilisateur (core.profiles).
+    """
+
+    def setUp(self):
+        """
+        Crée un utilisateur possédant une compétence, et une seconde compétence.
+        """
+        cache.clear()
+        self.user = User.objects.create_user(username="memo", password="secret")
+        self.owned = Competence.objects.create(name="Couture")
+        self.other = Competence.objects.create(name="Tricot")
+        self.user.profile.competences.add(self.owned)
+
+    def test_ids_are_memoized_per_request_and_cached_across_requests(self):
+        """
+        Vérifie qu'une seule requête lit les compétences, puis que l'ensemble est réutilisé par un autre objet utilisateur.
+        """
+        with self.assertNumQueries(1):
+            self.assertEqual(profiles.competence_ids(self.user), {self.owned.id})
+            profiles.competence_ids(self.user)
+        fresh = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(profiles.competence_ids(fresh), {self.owned.id})
+        self.assertEqual(profiles.competence_ids(AnonymousUser()), frozenset())
+
+    def test_m2m_changes_invalidate_both_sides(self):
+        """
+        Vérifie l'invalidation lors d'une modification depuis le profil comme depuis la compétence.
+        """
+        profiles.competence_ids(self.user)
+        self.user.profile.competences.add(self.other)
+        self.assertEqual(profiles.competence_ids(self.user), {self.owned.id, self.other.id})
+
+        self.owned.profiles.remove(self.user.profile)
+        self.assertEqual(profiles.competence_ids(User.objects.get(pk=self.user.pk)), {self.other.id})
+        self.other.profiles.clear()
+        self.assertEqual(profiles.competence_ids(User.objects.get(pk=self.user.pk)), frozenset())
+
+    def test_add_slot_lists_owned_competences_without_profile_lookup(self):
+        """
+        Vérifie que le formulaire d'ajout liste les compétences possédées sans lire le profil.
+        """
+        self.client.login(username="memo", password="secret")
+        profiles.competence_ids(self.user)
+        # Session, utilisateur et noms des compétences possédées
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('add_slot'))
+        self.assertContains(response, "Couture")
+        self.assertNotContains(response, "Tricot")
+
+    def test_user_competences_groups_choices_and_writes_only_the_difference(self):
+        """
+        Vérifie que la page groupe les compétences par catégorie depuis le cache, et que l'enregistrement
+        n'écrit que la différence, en une insertion et une suppression sur la table de liaison.
+        """
+        category = Category.objects.create(name="Textile")
+        Competence.objects.filter(pk=self.other.pk).update(category=category)
+        kept = Competence.objects.create(name="Broderie", category=category)
+        self.user.profile.competences.add(kept)
+        self.client.login(username="memo", password="secret")
+        response = self.client.get(reverse('user_competences'))
+        self.assertEqual(
+            [(group['name'], [competence['name'] for competence in group['competences']]) for group in response.context['groups']],
+            [("Textile", ["Broderie", "Tricot"]), ("Sans catégorie", ["Couture"])],
+        )
+        versions_before = versions.read((versions.label(Profile),))[0][0]
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(reverse('user_competences'), {'competences': [kept.id, self.other.id]})
+        self.assertRedirects(response, reverse('available_slots'), fetch_redirect_response=False)
+        writes = [query['sql'].split()[0] for query in captured if 'core_profile_competences' in query['sql']]
+        self.assertEqual(writes, ['SELECT', 'INSERT', 'DELETE'])
+        self.assertEqual(profiles.competence_ids(User.objects.get(pk=self.user.pk)), {kept.id, self.other.id})
+        self.assertGreater(versions.read((versions.label(Profile),))[0][0], versions_before)
+
+        response = self.client.post(reverse('user_competences'), {'competences': ['0']})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(reverse('user_competences'), {'competences': ['abc']})
+        self.assertEqual(response.status_code, 400)
+
+    def test_assign_competences_command(self):
+        """
+        Vérifie l'ajout et le retrait de compétences à plusieurs utilisateurs, et le refus des noms inconnus.
+        """
+        cohort = profiles.bulk_create_users([User(username=f"promo-{index}") for index in range(3)])
+        profiles.competence_ids(self.user)
+        output = StringIO()
+        call_command('assign_competences', 'memo', *[user.username for user in cohort], add=["Tricot"], remove=["Couture"], stdout=output)
+        self.assertIn("4 profil(s)", output.getvalue())
+        for user in [self.user, *cohort]:
+            self.assertEqual(profiles.competence_ids(User.objects.get(pk=user.pk)), {self.other.id})
+        with self.assertRaises(CommandError):
+            call_command('assign_competences', 'inconnu', add=["Tricot"], stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('assign_competences', 'memo', add=["Inconnue"], stdout=StringIO())
+
+
+class ProfileSignalTest(TestCase):
+    """
+    Classe de test pour la création des profils (signal et création groupée).
+    """
+
+    def test_user_update_does_not_write_profile(self):
+        """
+        Vérifie qu'un enregistrement d'utilisateur existant, comme à la connexion, n'écrit pas son profil.
+        """
+        user = User.objects.create_user(username="connexion", password="secret")
+        self.assertTrue(Profile.objects.filter(user=user).exists())
+        with self.assertNumQueries(1):
+            user.save(update_fields=['last_login'])
+        with CaptureQueriesContext(connection) as captured:
+            self.assertTrue(self.client.login(username="connexion", password="secret"))
+        self.assertFalse([query for query in captured if 'core_profile' in query['sql']])
+
+    def test_bulk_create_users_creates_profiles(self):
+        """
+        Vérifie que la création groupée insère aussi un profil par utilisateur.
+        """
+        users = profiles.bulk_create_users([User(username=f"lot-{index}") for index in range(3)])
+        self.assertEqual(Profile.objects.filter(user__in=users).count(), 3)
+        with self.assertNumQueries(0):
+            self.assertTrue(all(user.profile.pk for user in users))
+
+    def test_login_benchmark_compares_legacy_signal(self):
+        """
+        Vérifie que la mesure de connexion compte le profil relu et réenregistré par l'ancien signal.
+        """
+        legacy = benchmark.measure_logins(5, legacy=True)
+        current = benchmark.measure_logins(5)
+        self.assertEqual(legacy['queries_per_login'] - current['queries_per_login'], 2)
+        self.assertEqual(legacy['writes_per_login'] - current['writes_per_login'], 1)
+        self.assertFalse(User.objects.filter(username__startswith='bench-login').exists())
+
+
+class DatabaseRoutingTest(TransactionTestCase):
+    """
+    Classe de test du routage des lectures vers un réplica, avec deux fichiers SQLite : la base de test
+    principale et une copie tenant lieu de réplica, mise à jour par la commande sync_sqlite_replica.
+    """
+
+    def setUp(self):
+        """
+        Déclare le réplica, crée un créneau d'aide et le copie dans le réplica.
+        """
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        connections.settings[database.REPLICA] = {
+            **connections.settings[DEFAULT_DB_ALIAS], 'NAME': os.path.join(directory.name, 'replica.sqlite3'),
+        }
+        self.addCleanup(self.remove_replica)
+
+        self.owner = User.objects.create_user(username="offrant", password="secret")
+        tomorrow = date.today() + timedelta(days=1)
+        Slot.objects.create(date=tomorrow, user=self.owner, competence=Competence.objects.create(name="Jardinage"))
+        call_command('sync_sqlite_replica', stdout=StringIO())
+        # Créé après la copie : absent du réplica jusqu'à la prochaine synchronisation
+        Slot.objects.create(date=tomorrow, user=self.owner, competence=Competence.objects.create(name="Peinture"))
+
+    def remove_replica(self):
+        """
+        Ferme la connexion au réplica et retire l'alias.
+        """
+        connections[database.REPLICA].close()
+        del connections[database.REPLICA]
+        del connections.settings[database.REPLICA]
+
+    def test_listing_views_read_from_replica(self):
+        """
+        Vérifie que la liste publique lit le réplica, puis la base principale après une écriture du client.
+        """
+        response = self.client.get(reverse('available_slots'))
+        self.assertContains(response, "Jardinage")
+        self.assertNotContains(response, "Peinture")
+
+        # La connexion est une écriture (POST) : le client lit ensuite la base principale
+        response = self.client.post(reverse('login'), {'username': "offrant", 'password': "secret"})
+        self.assertIn(database.PIN_COOKIE, response.cookies)
+        self.assertContains(self.client.get(reverse('available_slots')), "Peinture")
+
+        anonymous = self.client_class()
+        self.assertNotContains(anonymous.get(reverse('available_slots')), "Peinture")
+        call_command('sync_sqlite_replica', stdout=StringIO())
+        self.assertContains(anonymous.get(reverse('available_slots')), "Peinture")
+
+    def test_get_writes_pin_to_primary(self):
+        """
+        Vérifie que les actions qui écrivent sur une requête GET (se proposer, supprimer un créneau) posent
+        le cookie, contrairement à une simple lecture.
+        """
+        helper = User.objects.create_user(username="volontaire")
+        competence = Competence.objects.get(name="Jardinage")
+        helper.profile.competences.add(competence)
+        slot = Slot.objects.create(date=date.today() + timedelta(days=1), user=self.owner, competence=competence, purpose='request')
+        activity = Activity.objects.create(description="Tailler la haie", requester=self.owner, competence_needed=competence, slot=slot)
+
+        self.client.force_login(helper)
+        self.assertNotIn(database.PIN_COOKIE, self.client.get(reverse('available_slots')).cookies)
+        self.assertIn(database.PIN_COOKIE, self.client.get(reverse('volunteer_for_help', args=[activity.id])).cookies)
+
+        owner = self.client_class()
+        owner.force_login(self.owner)
+        self.assertIn(database.PIN_COOKIE, owner.get(reverse('delete_slot', args=[slot.id])).cookies)
+
+    def test_router_keeps_writes_and_auth_on_primary(self):
+        """
+        Vérifie que les écritures, les utilisateurs et les lectures hors vue de liste restent sur la base principale.
+        """
+        router = database.PrimaryReplicaRouter()
+        self.assertEqual(router.db_for_read(Slot), DEFAULT_DB_ALIAS)
+        token = database._replica_reads.set(True)
+        try:
+            self.assertEqual(router.db_for_read(Slot), database.REPLICA)
+            self.assertEqual(router.db_for_read(User), DEFAULT_DB_ALIAS)
+            self.assertEqual(router.db_for_write(Slot), DEFAULT_DB_ALIAS)
+        finally:
+            database._replica_reads.reset(token)
+        self.assertFalse(router.allow_migrate(database.REPLICA, 'core'))
+
+    def test_sqlite_connections_are_tuned_for_concurrency(self):
+        """
+        Vérifie les réglages appliqués à chaque connexion SQLite (WAL, délai d'attente, synchronisation).
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout'])
+            cursor.execute("PRAGMA synchronous")
+            # 1 = NORMAL
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+
+
+class ArchiveTest(TestCase):
+    """
+    Classe de test pour l'archivage des créneaux passés et le filtre de date des vues de liste.
+    """
+
+    def setUp(self):
+        """
+        Crée, pour deux utilisateurs, des créneaux passés (offre et demande avec activité) et à venir.
+        """
+        cache.clear()
+        self.user = User.objects.create_user(username="archiviste", password="secret")
+        self.other = User.objects.create_user(username="ancien", password="secret")
+        self.competence = Competence.objects.create(name="Reliure")
+        self.user.profile.competences.add(self.competence)
+        yesterday, tomorrow = date.today() - timedelta(days=1), date.today() + timedelta(days=1)
+        self.past_offer = Slot.objects.create(date=yesterday, user=self.other, competence=self.competence, purpose='aid')
+        self.past_request = Slot.objects.create(date=yesterday, user=self.other, competence=self.competence, purpose='request')
+        self.past_activity = Activity.objects.create(
+            description="Relier un vieux livre", requester=self.other, competence_needed=self.competence,
+            slot=self.past_request, volunteer=self.user,
+        )
+        self.future = Slot.objects.create(date=tomorrow, user=self.other, competence=self.competence, purpose='request')
+        Activity.objects.create(
+            description="Relier un carnet", requester=self.other, competence_needed=self.competence, slot=self.future
+        )
+
+    def test_listing_views_ignore_past_slots(self):
+        """
+        Vérifie que les vues de liste n'affichent que les créneaux à venir, même avant l'archivage.
+        """
+        self.client.login(username="archiviste", password="secret")
+        response = self.client.get(reverse('help_requests'))
+        self.assertContains(response, "Relier un carnet")
+        self.assertNotContains(response, "Relier un vieux livre")
+        self.assertEqual(list(queries.available_help_queryset(self.other, frozenset())), [])
+        self.assertEqual(list(queries.my_slots_queryset(self.other)), [self.future])
+        self.assertEqual([activity.slot for activity in queries.my_requests_queryset(self.other)], [self.future])
+
+    def test_archive_moves_past_rows_in_batches(self):
+        """
+        Vérifie que les créneaux passés et leurs activités sont déplacés, lot par lot, avec leurs identifiants.
+        """
+        MatchProposal.objects.create(activity=self.past_activity, offer=self.past_offer)
+        before = versions.read(('core.slot',))[0]
+        totals = archive.archive_past_slots(batch_size=1)
+
+        self.assertEqual(totals, {'slots': 2, 'activities': 1, 'batches': 2})
+        self.assertEqual(list(Slot.objects.all()), [self.future])
+        self.assertEqual(
+            set(ArchivedSlot.objects.values_list('id', 'purpose')),
+            {(self.past_offer.pk, 'aid'), (self.past_request.pk, 'request')},
+        )
+        archived = ArchivedActivity.objects.get()
+        self.assertEqual((archived.pk, archived.slot_id, archived.volunteer), (self.past_activity.pk, self.past_request.pk, self.user))
+        self.assertFalse(MatchProposal.objects.exists())
+        self.assertFalse(MatchIndexEntry.objects.filter(slot__date__lt=date.today()).exists())
+        self.assertGreater(versions.read(('core.slot',))[0], before)
+        self.assertEqual(archive.archive_past_slots(), {'slots': 0, 'activities': 0, 'batches': 0})
+
+    def test_command_dry_run_changes_nothing(self):
+        """
+        Vérifie que la commande en mode --dry-run compte sans archiver, puis archive sans l'option.
+        """
+        output = StringIO()
+        call_command('archive_past_slots', dry_run=True, stdout=output)
+        self.assertIn("2 créneaux et 1 activités", output.getvalue())
+        self.assertEqual(Slot.objects.count(), 3)
+        call_command('archive_past_slots', days=2, stdout=StringIO())
+        self.assertEqual(Slot.objects.count(), 3)
+        call_command('archive_past_slots', stdout=StringIO())
+        self.assertEqual(Slot.objects.count(), 1)
+
+
+class SearchTest(TestCase):
+    """
+    Classe de test pour la recherche plein texte (index FTS5 tenu à jour par les déclencheurs SQLite).
+    """
+
+    def setUp(self):
+        """
+        Crée une catégorie, deux compétences et des demandes ouvertes, pourvue et passée.
+        """
+        cache.clear()
+        self.user = User.objects.create_user(username="chercheur", password="secret")
+        self.other = User.objects.create_user(username="demandeur", password="secret")
+        self.category = Category.objects.create(name="Bricolage")
+        self.electricity = Competence.objects.create(name="Électricité", category=self.category)
+        self.sewing = Competence.objects.create(name="Couture")
+        self.user.profile.competences.add(self.electricity)
+        tomorrow = date.today() + timedelta(days=1)
+        self.open = self._request("Changer une prise défectueuse", self.electricity, tomorrow)
+        self.hem = self._request("Faire l'ourlet d'un pantalon", self.sewing, tomorrow)
+        self.claimed = self._request("Changer une ampoule", self.electricity, tomorrow, volunteer=self.user)
+        self.past = self._request("Changer un interrupteur", self.electricity, date.today() - timedelta(days=1))
+
+    def _request(self, description, competence, day, volunteer=None):
+        slot = Slot.objects.create(date=day, user=self.other, competence=competence, purpose='request')
+        return Activity.objects.create(
+            description=description, requester=self.other, competence_needed=competence, slot=slot, volunteer=volunteer
+        )
+
+    def test_search_ignores_accents_and_case(self):
+        """
+        Vérifie qu'un mot saisi sans accent trouve la compétence accentuée et ses demandes.
+        """
+        self.assertEqual(search.search_competences("electricite"), [self.electricity])
+        self.assertEqual(search.search_requests("ELECTRICITE"), [self.open])
+        self.assertEqual(search.search_requests("défectueuse"), [self.open])
+
+    def test_search_matches_prefix_and_category(self):
+        """
+        Vérifie la recherche par début de mot et par nom de catégorie.
+        """
+        self.assertEqual(search.search_competences("élec"), [self.electricity])
+        self.assertEqual(search.search_competences("brico"), [self.electricity])
+        self.assertEqual(search.search_requests("ourlet pant"), [self.hem])
+
+    def test_only_open_future_requests(self):
+        """
+        Vérifie que les demandes pourvues, passées ou dont le créneau est fermé ne sont pas trouvées.
+        """
+        self.assertEqual(search.search_requests("changer"), [self.open])
+        self.assertEqual([item['id'] for item in search.suggest("changer")], [self.open.pk])
+        Slot.objects.filter(pk=self.open.slot_id).update(is_available=False)
+        self.assertEqual(search.search_requests("changer"), [])
+        self.assertEqual(search.suggest("changer"), [])
+
+    def test_fallback_without_index(self):
+        """
+        Vérifie que la recherche sans index FTS5 (autre base que SQLite) couvre les mêmes champs :
+        description, compétence et catégorie, pour les seules demandes ouvertes et à venir.
+        """
+        with mock.patch.object(search, '_fts_available', return_value=False):
+            self.assertEqual(search.search_requests("couture"), [self.hem])
+            self.assertEqual(search.search_requests("bricolage changer"), [self.open])
+            self.assertEqual(search.search_competences("bricolage"), [self.electricity])
+            self.assertEqual(
+                [(item['type'], item['id']) for item in search.suggest("bricol")],
+                [('competence', self.electricity.pk), ('request', self.open.pk)],
+            )
+
+    def test_index_follows_changes(self):
+        """
+        Vérifie que l'index suit les renommages, les prises en charge et les suppressions, y compris par
+        des mises à jour groupées qui n'envoient pas de signaux.
+        """
+        Competence.objects.filter(pk=self.sewing.pk).update(name="Retouches")
+        self.assertEqual(search.search_requests("retouches"), [self.hem])
+        self.assertEqual(search.search_competences("couture"), [])
+        Category.objects.filter(pk=self.category.pk).update(name="Maison")
+        self.assertEqual(search.search_competences("maison"), [self.electricity])
+
+        Activity.objects.filter(pk=self.open.pk).update(volunteer=self.user)
+        self.assertEqual(search.search_requests("prise"), [])
+        Activity.objects.filter(pk=self.claimed.pk).update(volunteer=None)
+        self.assertEqual(search.search_requests("ampoule"), [self.claimed])
+        self.hem.delete()
+        self.assertEqual(search.search_requests("ourlet"), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        """
+        Vérifie que les guillemets, opérateurs et étoiles saisis ne provoquent pas d'erreur FTS5.
+        """
+        for text in ('"prise', 'prise*', 'NOT prise', 'description:prise', '(', '***', ''):
+            search.search_requests(text)
+            search.suggest(text)
+        self.assertEqual(search.search_requests('"prise" AND'), [])
+        self.assertEqual(search.search_requests('prise"'), [self.open])
+
+    def test_suggestions_endpoint(self):
+        """
+        Vérifie que les suggestions, réservées aux utilisateurs connectés, listent d'abord les compétences,
+        puis les demandes ouvertes.
+        """
+        for url in (reverse('search_suggestions'), reverse('search')):
+            self.assertEqual(self.client.get(url, {'q': "pri"}).status_code, 302)
+        self.client.login(username="chercheur", password="secret")
+        response = self.client.get(reverse('search_suggestions'), {'q': "pri"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(item['type'], item['id']) for item in response.json()['suggestions']],
+            [('request', self.open.pk)],
+        )
+        response = self.client.get(reverse('search_suggestions'), {'q': "coutu"})
+        self.assertEqual(response.json()['suggestions'][0], {'type': 'competence', 'id': self.sewing.pk, 'label': "Couture"})
+
+    def test_search_page(self):
+        """
+        Vérifie que la page de recherche propose de se porter volontaire pour les demandes de ses compétences.
+        """
+        self.client.login(username="chercheur", password="secret")
+        response = self.client.get(reverse('search'), {'q': "changer"})
+        self.assertContains(response, "Changer une prise défectueuse")
+        self.assertNotContains(response, "Changer une ampoule")
+        self.assertContains(response, reverse('volunteer_for_help', args=[self.open.pk]))
+
+    def test_search_benchmark(self):
+        """
+        Vérifie que la mesure de l'autocomplétion s'exécute sur un petit index synthétique.
+        """
+        result = benchmark.measure_search(200, queries=20)
+        self.assertEqual(result['activities'], 200)
+        self.assertGreater(result['suggest_p95_ms'], 0)
+
+
+class TemplateRenderingTest(TestCase):
+    """
+    Classe de test pour la barre de navigation précalculée et les lignes préparées des gabarits de liste.
+    """
+
+    def setUp(self):
+        """
+        Crée un demandeur, un volontaire et un créneau de demande à venir avec son activité.
+        """
+        cache.clear()
+        self.user = User.objects.create_user(username="lecteur", password="secret")
+        self.other = User.objects.create_user(username="auteur", password="secret")
+        self.competence = Competence.objects.create(name="Jardinage")
+        self.slot = Slot.objects.create(
+            date=date.today() + timedelta(days=3), user=self.other, competence=self.competence, purpose='request'
+        )
+        self.activity = Activity.objects.create(
+            description="Tailler la haie", requester=self.other, competence_needed=self.competence, slot=self.slot,
+            volunteer=self.user,
+        )
+
+    def test_navigation_marks_current_page(self):
+        """
+        Vérifie que seul le lien de la page courante est mis en évidence, et les liens selon la connexion.
+        """
+        response = self.client.get(reverse('competence_list'))
+        links = {link['label']: link for link in response.context['nav_links']}
+        self.assertTrue(links["Liste des compétences"]['active'])
+        self.assertFalse(links["Créneaux disponibles"]['active'])
+        self.assertIn("Connexion", links)
+        self.assertNotIn("Mes créneaux", links)
+
+        self.client.login(username="lecteur", password="secret")
+        response = self.client.get(reverse('my_slots'))
+        self.assertEqual([link['label'] for link in response.context['nav_links'] if link['active']], ["Mes créneaux"])
+        self.assertContains(response, f'<a href="{reverse("my_slots")}" class="text-orange-500 hover:underline">Mes créneaux</a>', html=True)
+
+    def test_rows_match_reverse_and_template_dates(self):
+        """
+        Vérifie que les URL construites par concaténation et les dates mémorisées sont celles du gabarit.
+        """
+        self.assertEqual(rows.url_builder('contact_info')(42), reverse('contact_info', args=[42]))
+        format_date = rows.date_formatter()
+        self.assertEqual(format_date(self.slot.date), Template("{{ day }}").render(Context({'day': self.slot.date})))
+
+        slots = list(queries.my_slots_queryset(self.other))
+        self.assertEqual(rows.slot_rows(slots, self.user)[0]['contact_url'], reverse('contact_info', args=[self.activity.pk]))
+        self.assertIsNone(rows.slot_rows(slots, AnonymousUser())[0]['contact_url'])
+        row = rows.slot_rows(slots, self.other)[0]
+        self.assertEqual((row['is_aid'], row['description']), (False, "Tailler la haie"))
+
+        activities = list(queries.my_requests_queryset(self.other))
+        row = rows.request_rows(activities, self.user, frozenset([self.competence.pk]))[0]
+        self.assertEqual(row['volunteer_url'], reverse('volunteer_for_help', args=[self.activity.pk]))
+        self.assertEqual(row['contact_url'], reverse('contact_info', args=[self.activity.pk]))
+        row = rows.request_rows(activities, AnonymousUser())[0]
+        self.assertEqual((row['volunteer_url'], row['contact_url'], row['requester']), (None, None, "auteur"))
+
+    def test_list_pages_render_rows(self):
+        """
+        Vérifie l'affichage des lignes préparées sur les pages de l'utilisateur.
+        """
+        self.client.login(username="lecteur", password="secret")
+        self.user.profile.competences.add(self.competence)
+        response = self.client.get(reverse('help_requests'))
+        self.assertContains(response, "Tailler la haie")
+        self.assertContains(response, reverse('contact_info', args=[self.activity.pk]))
+        self.client.login(username="auteur", password="secret")
+        response = self.client.get(reverse('my_slots'))
+        self.assertContains(response, "Demande d'aide")
+        self.assertContains(response, reverse('delete_slot', args=[self.slot.pk]))
+
+    def test_cached_template_loader(self):
+        """
+        Vérifie que les gabarits sont chargés par le chargeur en cache.
+        """
+        loader = engines.all()[0].engine.template_loaders[0]
+        self.assertEqual(type(loader).__module__, 'django.template.loaders.cached')
+
+    def test_template_benchmark(self):
+        """
+        Vérifie que le micro-benchmark mesure chaque page de liste.
+        """
+        results = benchmark.measure_templates(sizes=(20,), repeat=1)
+        self.assertEqual({result['route'] for result in results}, {route for route, *_ in benchmark.TEMPLATE_PAGES})
+        self.assertTrue(all(result['render_ms'] > 0 for result in results))
+
+
+@tasks.task(max_attempts=2)
+def failing_task(message="Erreur de test"):
+    """
+    Tâche de test qui échoue toujours.
+    """
+    raise RuntimeError(message)
+
+
+@tasks.task
+def create_category_task(name):
+    """
+    Tâche de test qui écrit dans la base.
+    """
+    Category.objects.create(name=name)
+
+
+@override_settings(TASKS_EAGER=False)
+class TaskQueueTest(TestCase):
+    """
+    Classe de test pour la file de tâches de fond (table Task, core.tasks) et les notifications.
+    """
+
+    def setUp(self):
+        tasks.metrics.reset()
+
+    def test_enqueue_is_transactional_and_deduplicated(self):
+        """
+        Vérifie qu'une tâche disparaît avec la transaction annulée, et qu'une clé évite les doublons en attente.
+        """
+        try:
+            with transaction.atomic():
+                tasks.enqueue(create_category_task, {'name': "Annulée"})
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertFalse(Task.objects.exists())
+
+        search.schedule_merge()
+        search.schedule_merge()
+        self.assertEqual(Task.objects.filter(key=search.MERGE_TASK_KEY).count(), 1)
+
+    def test_merge_postponed_when_database_locked(self):
+        """
+        Vérifie qu'une fusion refusée par le verrou d'écriture est reportée, sans erreur ni annulation de la tâche.
+        """
+        execute = CursorWrapper.execute
+
+        def locked(cursor, sql, params=None):
+            if "'merge'" in sql:
+                raise OperationalError("database is locked")
+            return execute(cursor, sql, params)
+
+        with transaction.atomic(), mock.patch.object(CursorWrapper, 'execute', locked):
+            search.merge_index()
+            Category.objects.create(name="Après la fusion")
+        task = Task.objects.get(key=search.MERGE_TASK_KEY)
+        self.assertEqual(task.status, Task.PENDING)
+        self.assertGreater(task.run_at, timezone.now())
+
+    def test_run_pending_executes_once(self):
+        """
+        Vérifie l'exécution d'une tâche, son statut final, et qu'une tâche prise en charge ne l'est qu'une fois.
+        """
+        tasks.enqueue(create_category_task, {'name': "Jardin"})
+        self.assertEqual(tasks.claim('a', 10)[0].attempts, 1)
+        self.assertEqual(tasks.claim('b', 10), [])
+        Task.objects.update(status=Task.PENDING)
+
+        self.assertEqual(tasks.run_pending(), 1)
+        self.assertTrue(Category.objects.filter(name="Jardin").exists())
+        task = Task.objects.get()
+        self.assertEqual((task.status, task.attempts), (Task.DONE, 2))
+        self.assertEqual(tasks.metrics.snapshot()['tasks'][create_category_task.task_name]['succeeded'], 1)
+        self.assertEqual(tasks.queue_stats()['counts'][Task.DONE], 1)
+
+    def test_retry_with_backoff_then_fail(self):
+        """
+        Vérifie qu'une tâche en erreur est reprogrammée plus tard, puis en échec après son nombre maximal d'exécutions.
+        """
+        tasks.enqueue(failing_task)
+        with self.assertLogs('core.tasks', 'WARNING'):
+            self.assertEqual(tasks.run_pending(), 1)
+        task = Task.objects.get()
+        self.assertEqual((task.status, task.attempts), (Task.PENDING, 1))
+        self.assertIn("Erreur de test", task.last_error)
+        self.assertGreater(task.run_at, timezone.now() + timedelta(seconds=tasks.RETRY_BASE_SECONDS * 0.4))
+        self.assertEqual(tasks.run_pending(), 0)
+
+        Task.objects.update(run_at=timezone.now())
+        with self.assertLogs('core.tasks', 'ERROR'):
+            tasks.run_pending()
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Task.FAILED, 2))
+        counts = tasks.metrics.snapshot()['tasks'][failing_task.task_name]
+        self.assertEqual((counts['retried'], counts['failed']), (1, 1))
+
+    def test_stale_and_unknown_tasks(self):
+        """
+        Vérifie la reprise des tâches abandonnées et le refus d'exécuter une fonction non déclarée.
+        """
+        tasks.enqueue(create_category_task, {'name': "Reprise"})
+        tasks.claim('arrete', 1)
+        Task.objects.update(locked_at=timezone.now() - timedelta(seconds=tasks.LOCK_TIMEOUT_SECONDS + 1))
+        self.assertEqual(tasks.requeue_stale(), 1)
+        self.assertEqual(Task.objects.get().status, Task.PENDING)
+
+        with self.assertRaises(ValueError):
+            tasks.resolve('os.system')
+        Task.objects.create(name='os.system', payload={'command': 'true'}, run_at=timezone.now(), max_attempts=1)
+        with self.assertLogs('core.tasks', 'ERROR'):
+            tasks.run_pending()
+        self.assertEqual(Task.objects.get(name='os.system').status, Task.FAILED)
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_mode(self):
+        """
+        Vérifie l'exécution immédiate après la validation de la transaction (et pas après une annulation),
+        et l'enregistrement pour reprise d'une tâche immédiate en erreur.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            tasks.enqueue(create_category_task, {'name': "Immédiate"})
+            self.assertFalse(Category.objects.filter(name="Immédiate").exists())
+        self.assertTrue(Category.objects.filter(name="Immédiate").exists())
+        self.assertFalse(Task.objects.exists())
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                tasks.enqueue(create_category_task, {'name': "Annulée"})
+                transaction.set_rollback(True)
+        self.assertEqual(callbacks, [])
+        self.assertFalse(Category.objects.filter(name="Annulée").exists())
+        with self.assertLogs('core.tasks', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+            tasks.enqueue(failing_task)
+        task = Task.objects.get()
+        self.assertEqual((task.name, task.status, task.attempts), (failing_task.task_name, Task.PENDING, 1))
+
+    def test_volunteering_notifies_requester_off_request(self):
+        """
+        Vérifie que se proposer n'envoie pas le courriel pendant la requête, mais par la tâche de fond.
+        """
+        requester = User.objects.create_user(username="demandeuse", password="secret", email="demandeuse@example.org")
+        helper = User.objects.create_user(username="aidant", password="secret")
+        competence = Competence.objects.create(name="Plomberie")
+        helper.profile.competences.add(competence)
+        slot = Slot.objects.create(date=date.today() + timedelta(days=1), user=requester, competence=competence, purpose='request')
+        activity = Activity.objects.create(description="Fuite sous l'évier", requester=requester, competence_needed=competence, slot=slot)
+
+        self.client.login(username="aidant", password="secret")
+        self.client.get(reverse('volunteer_for_help', args=[activity.pk]))
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(
+            set(Task.objects.values_list('name', flat=True)),
+            {notifications.notify_volunteer.task_name, search.merge_index.task_name},
+        )
+        # La fusion de l'index plein texte, différée, attend son délai
+        self.assertEqual(tasks.run_pending(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["demandeuse@example.org"])
+        self.assertIn("aidant s'est proposé", mail.outbox[0].body)
+
+
+@override_settings(TASKS_EAGER=False)
+class TaskWorkerTest(TransactionTestCase):
+    """
+    Classe de test pour le worker de la file de tâches (réserve de threads, chacun avec sa connexion).
+    """
+
+    def test_worker_drains_queue(self):
+        """
+        Vérifie que le worker exécute toutes les tâches avec plusieurs threads, puis s'arrête sur une file vide.
+        """
+        for index in range(20):
+            tasks.enqueue(create_category_task, {'name': f"Catégorie {index}"})
+        processed = tasks.Worker(threads=4, poll_interval=0.05).run(until_empty=True)
+        self.assertEqual(processed, 20)
+        self.assertEqual(Category.objects.count(), 20)
+        self.assertEqual(Task.objects.filter(status=Task.DONE).count(), 20)
+
+    def test_command_and_benchmark(self):
+        """
+        Vérifie la commande du worker et la mesure du débit de la file.
+        """
+        tasks.enqueue(create_category_task, {'name': "Commande"})
+        output = StringIO()
+        call_command('run_task_worker', '--until-empty', '--stats-interval', '0', stdout=output)
+        self.assertIn("1 tâche(s) exécutée(s).", output.getvalue())
+        result = benchmark.measure_task_queue(count=30, threads=2)
+        self.assertEqual(result['tasks'], 30)
+
+
+
+class AvailabilityStatsTest(TestCase):
+    """
+    Classe de test pour les statistiques de disponibilité matérialisées (AvailabilityStat, core.stats).
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="organisatrice", password="secret")
+        self.helper = User.objects.create_user(username="benevole", password="secret")
+        self.category = Category.objects.create(name="Maison")
+        self.competence = Competence.objects.create(name="Peinture", category=self.category)
+        self.other = Competence.objects.create(name="Électricité", category=self.category)
+        self.helper.profile.competences.add(self.competence)
+        self.week = stats.current_week()
+
+    def counts(self, competence, week):
+        """
+        Retourne les compteurs (offres, demandes) d'une cellule, (0, 0) si elle n'existe pas.
+        """
+        cell = AvailabilityStat.objects.filter(competence=competence, week=week).first()
+        return (cell.open_offers, cell.open_requests) if cell else (0, 0)
+
+    def test_incremental_updates_match_rebuild(self):
+        """
+        Vérifie que les écritures (avec et sans signaux) tiennent les compteurs égaux à un recalcul complet.
+        """
+        next_week = self.week + timedelta(weeks=1)
+        offer = Slot.objects.create(date=self.week, user=self.user, competence=self.competence, purpose='aid')
+        recurrence.create_slots(self.user, self.competence, 'request', [self.week, next_week], "Repeindre le salon")
+        self.assertEqual(self.counts(self.competence, self.week), (1, 1))
+        self.assertEqual(stats.drift(), 0)
+
+        activity = Activity.objects.get(slot__date=self.week)
+        self.assertIs(claim_activity(activity.id, self.helper), ClaimResult.CLAIMED)
+        self.assertEqual(self.counts(self.competence, self.week), (1, 0))
+
+        offer.date, offer.competence = next_week, self.other
+        offer.save()
+        self.assertEqual(self.counts(self.competence, self.week), (0, 0))
+        self.assertEqual(self.counts(self.other, next_week), (1, 0))
+        offer.delete()
+        self.assertEqual(self.counts(self.other, next_week), (0, 0))
+        self.assertEqual(stats.drift(), 0)
+
+        Slot.objects.create(date=self.week - timedelta(weeks=1), user=self.user, competence=self.other, purpose='aid')
+        archive.archive_past_slots()
+        self.assertEqual(stats.drift(), 0)
+
+    def test_rebuild_command(self):
+        """
+        Vérifie que la commande signale les écarts avec --check, puis les corrige.
+        """
+        Slot.objects.create(date=self.week, user=self.user, competence=self.competence, purpose='aid')
+        AvailabilityStat.objects.update(open_offers=5)
+        output = StringIO()
+        call_command('rebuild_stats', check=True, stdout=output)
+        self.assertIn("1 cellule(s) divergente(s).", output.getvalue())
+        self.assertEqual(self.counts(self.competence, self.week), (5, 0))
+        call_command('rebuild_stats', stdout=StringIO())
+        self.assertEqual(self.counts(self.competence, self.week), (1, 0))
+
+    def test_dashboard_and_api_read_only_the_stats_table(self):
+        """
+        Vérifie le tableau de bord et l'API (équipe seulement), par compétence et par catégorie, sans lecture des créneaux.
+        """
+        Slot.objects.create(date=self.week, user=self.user, competence=self.competence, purpose='aid')
+        Slot.objects.create(date=self.week + timedelta(weeks=2), user=self.user, competence=self.other, purpose='request')
+        self.assertEqual(self.client.get(reverse('availability_stats')).status_code, 302)
+        self.assertEqual(self.client.get(reverse('api_availability_stats')).status_code, 403)
+        User.objects.create_user(username="membre", password="secret")
+        self.client.login(username="membre", password="secret")
+        self.assertEqual(self.client.get(reverse('api_availability_stats')).status_code, 403)
+        User.objects.create_user(username="staff", password="secret", is_staff=True)
+        self.client.login(username="staff", password="secret")
+
+        with CaptureQueriesContext(connection) as queries_run:
+            response = self.client.get(reverse('availability_stats'))
+            data = self.client.get(reverse('api_availability_stats'), {'group': 'category', 'weeks': 4}).json()
+        self.assertFalse(any('"core_slot"' in query['sql'] for query in queries_run.captured_queries))
+        self.assertContains(response, "Peinture")
+        self.assertEqual([row['name'] for row in response.context['rows']], ["Peinture", "Électricité"])
+        self.assertEqual(data['results'], [{
+            'id': self.category.id, 'name': "Maison", 'offers': [1, 0, 0, 0], 'requests': [0, 0, 1, 0],
+            'total_offers': 1, 'total_requests': 1,
+        }])
+        self.assertEqual(len(data['weeks']), 4)
+        self.assertEqual(self.client.get(reverse('api_availability_stats'), {'weeks': 0}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('availability_stats'), {'group': 'ville'}).status_code, 400)
+
+    def test_competence_list_badges(self):
+        """
+        Vérifie les badges d'offre et de demande de la liste des compétences, mis à jour après une écriture
+        et sans requête une fois en cache.
+        """
+        Slot.objects.create(date=self.week + timedelta(weeks=1), user=self.user, competence=self.competence, purpose='request')
+        response = self.client.get(reverse('competence_list'))
+        self.assertContains(response, "0 offre")
+        self.assertContains(response, "1 demande")
+        with self.assertNumQueries(0):
+            self.client.get(reverse('competence_list'))
+        Slot.objects.create(date=self.week, user=self.user, competence=self.competence, purpose='aid')
+        self.assertContains(self.client.get(reverse('competence_list')), "1 offre")
+
+
+async def stream_events(application, headers=(), until=None):
+    """
+    Ouvre le flux d'événements de l'application ASGI comme un client, exécute `until` une fois le
+    client abonné, puis se déconnecte et retourne le début de réponse et le corps reçus.
+    """
+    disconnected = asyncio.Event()
+    received = threading.Event()
+    body_sent = False
+    messages = []
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+        if message['type'] == 'http.response.body' and b'id: ' in message['body']:
+            received.set()
+
+    path = reverse('slot_events')
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': path, 'root_path': '', 'query_string': b'',
+        'headers': [(b'host', b'testserver'), *headers],
+    }
+    client = asyncio.ensure_future(application(scope, receive, send))
+    while not application.broker.subscriber_count():
+        await asyncio.sleep(0.001)
+    if until is not None:
+        await asyncio.get_running_loop().run_in_executor(None, until)
+        await asyncio.get_running_loop().run_in_executor(None, received.wait, 5)
+    disconnected.set()
+    await client
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    return messages[0], body
+
+
+class SlotEventsTest(TestCase):
+    """
+    Classe de test pour le flux d'événements des créneaux (core.events).
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="requester", password="secret")
+        self.helper = User.objects.create_user(username="helper", password="secret")
+        self.competence = Competence.objects.create(name="Jardinage")
+        self.helper.profile.competences.add(self.competence)
+        self.application = events.EventStreamApplication(None, broker=events.Broker(), heartbeat=60)
+
+    def test_writes_publish_after_commit(self):
+        """
+        Vérifie que la création, la prise en charge et la suppression d'un créneau sont publiées après la validation.
+        """
+        with mock.patch.object(events.broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks() as callbacks:
+                slot = Slot.objects.create(date=date.today(), competence=self.competence, user=self.user, purpose='request')
+                activity = Activity.objects.create(
+                    description="Tailler la haie", requester=self.user, competence_needed=self.competence, slot=slot,
+                )
+            publish.assert_not_called()
+            for callback in callbacks:
+                callback()
+            self.assertEqual(publish.call_args_list[-1].args[0], events.SLOT_OPENED)
+
+            publish.reset_mock()
+            with self.captureOnCommitCallbacks(execute=True):
+                claim_activity(activity.id, self.helper)
+            publish.assert_called_once_with(events.SLOT_CLAIMED, {'slot': slot.id, 'activity': activity.id})
+
+            publish.reset_mock()
+            with self.captureOnCommitCallbacks(execute=True):
+                recurrence.create_slots(self.user, self.competence, 'aid', [date.today(), date.today() + timedelta(days=7)])
+                slot.delete()
+            self.assertEqual(
+                [call.args[0] for call in publish.call_args_list],
+                [events.SLOT_OPENED, events.SLOT_OPENED, events.SLOT_DELETED],
+            )
+
+    def test_stream_delivers_events_and_ends_on_disconnect(self):
+        """
+        Vérifie que le flux reçoit un événement publié depuis un autre thread et se désabonne à la déconnexion.
+        """
+        broker = self.application.broker
+        start, body = asyncio.run(stream_events(
+            self.application, until=lambda: broker.publish(events.SLOT_CLAIMED, {'slot': 7, 'activity': 3}),
+        ))
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream; charset=utf-8'), start['headers'])
+        self.assertIn(b'id: 1\nevent: slot.claimed\ndata: {"slot":7,"activity":3}\n\n', body)
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    def test_last_event_id_replays_missed_events(self):
+        """
+        Vérifie qu'un client qui se reconnecte reçoit les événements manqués, ou un `reset` s'ils sont perdus.
+        """
+        broker = self.application.broker
+        for slot_id in range(3):
+            broker.publish(events.SLOT_OPENED, {'slot': slot_id})
+        start, body = asyncio.run(stream_events(self.application, headers=[(b'last-event-id', b'1')]))
+        self.assertNotIn(b'id: 1\n', body)
+        self.assertIn(b'id: 2\n', body)
+        self.assertIn(b'id: 3\n', body)
+        start, body = asyncio.run(stream_events(self.application, headers=[(b'last-event-id', b'99')]))
+        self.assertIn(events.RESET_FRAME, body)
+
+    def test_slow_client_buffer_is_bounded(self):
+        """
+        Vérifie qu'un client qui ne lit pas ses événements garde au plus `buffer_size` événements, puis reçoit un `reset`.
+        """
+        broker = events.Broker(buffer_size=2)
+
+        async def scenario():
+            subscription = broker.subscribe()
+            for slot_id in range(5):
+                broker.publish(events.SLOT_OPENED, {'slot': slot_id})
+            await asyncio.sleep(0)
+            self.assertLessEqual(len(subscription.buffer), 2)
+            frames = await subscription.next_frames()
+            broker.unsubscribe(subscription)
+            return frames
+
+        self.assertEqual(asyncio.run(scenario()), events.RESET_FRAME)
+
+    def test_other_requests_go_to_django(self):
+        """
+        Vérifie que le flux n'est pas servi par le gestionnaire de Django (WSGI), et que les autres chemins lui sont passés.
+        """
+        response = self.client.get(reverse('slot_events'))
+        self.assertEqual(response.status_code, 503)
+
+        paths = []
+
+        async def django_application(scope, receive, send):
+            paths.append(scope['path'])
+
+        application = events.EventStreamApplication(django_application, broker=events.Broker())
+        asyncio.run(application({'type': 'http', 'method': 'GET', 'path': reverse('available_slots')}, None, None))
+        self.assertEqual(paths, [reverse('available_slots')])
+
+    def test_load_benchmark(self):
+        """
+        Vérifie le test de charge du flux : tous les clients reçoivent tous les événements.
+        """
+        result = benchmark.measure_slot_events(connections=50, events_count=3, interval_ms=1)
+        self.assertEqual((result['received'], result['lost'], result['subscribers_left']), (150, 0, 0))
+
+
+class LargeTableAdminTest(TestCase):
+    """
+    Classe de test pour l'administration des grandes tables (core.admin).
+    """
+
+    def setUp(self):
+        """
+        Crée un administrateur, une compétence et des offres d'aide à venir.
+        """
+        self.admin = User.objects.create_superuser(username="admin", password="secret", email="admin@example.com")
+        self.owner = User.objects.create_user(username="proprio", password="secret")
+        self.competence = Competence.objects.create(name="Menuiserie")
+        self.tomorrow = date.today() + timedelta(days=1)
+        self.client.login(username="admin", password="secret")
+
+    def create_slots(self, count):
+        """
+        Crée `count` offres d'aide ouvertes.
+        """
+        return [Slot.objects.create(date=self.tomorrow, user=self.owner, competence=self.competence) for _ in range(count)]
+
+    def test_changelists_do_not_count_whole_tables_nor_query_per_row(self):
+        """
+        Vérifie que les listes des créneaux et des activités ont un nombre de requêtes constant et ne
+        comptent que par une sous-requête limitée.
+        """
+        query_counts = []
+        for count in (2, 10):
+            for slot in self.create_slots(count):
+                Activity.objects.create(description="Aide", requester=self.owner, competence_needed=self.competence, slot=slot)
+            for url in (reverse('admin:core_slot_changelist'), reverse('admin:core_activity_changelist')):
+                with CaptureQueriesContext(connection) as captured:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                counts = [query['sql'] for query in captured if 'COUNT(' in query['sql']]
+                self.assertTrue(counts)
+                self.assertTrue(all('LIMIT' in sql for sql in counts))
+                query_counts.append((url, len(captured)))
+        self.assertEqual(query_counts[:2], query_counts[2:])
+
+    def test_date_hierarchy_is_bounded_by_first_and_last_dates(self):
+        """
+        Vérifie que la hiérarchie de dates propose les périodes entre la première et la dernière date,
+        lues par deux requêtes ordonnées, sans DISTINCT sur les dates.
+        """
+        Slot.objects.create(date=date(2021, 3, 4), user=self.owner, competence=self.competence)
+        Slot.objects.create(date=date(2023, 5, 6), user=self.owner, competence=self.competence)
+        url = reverse('admin:core_slot_changelist')
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertFalse([query for query in captured if 'DISTINCT' in query['sql']])
+        for year in (2021, 2022, 2023):
+            self.assertContains(response, f'?date__year={year}"')
+        response = self.client.get(url, {'date__year': 2021})
+        self.assertContains(response, '?date__month=3&amp;date__year=2021"')
+        self.assertNotContains(response, '?date__month=4&amp;date__year=2021"')
+
+    def test_estimated_count_above_limit(self):
+        """
+        Vérifie le comptage exact sous la limite, l'estimation au-delà, et la limite pour une liste filtrée.
+        """
+        self.create_slots(5)
+        paginator_class = type('SmallLimitPaginator', (EstimatedCountPaginator,), {'exact_limit': 3})
+        self.assertEqual(EstimatedCountPaginator(Slot.objects.order_by('pk'), 2).count, 5)
+        self.assertEqual(paginator_class(Slot.objects.order_by('pk'), 2).count, 5)
+        self.assertEqual(paginator_class(Slot.objects.filter(is_available=True).order_by('pk'), 2).count, 4)
+
+    def test_search_by_username_and_competence(self):
+        """
+        Vérifie la recherche exacte par nom d'utilisateur et par compétence.
+        """
+        self.create_slots(2)
+        Slot.objects.create(date=self.tomorrow, user=self.admin, competence=Competence.objects.create(name="Jardinage"))
+        url = reverse('admin:core_slot_changelist')
+        self.assertEqual(self.client.get(url, {'q': 'proprio'}).context['cl'].result_count, 2)
+        self.assertEqual(self.client.get(url, {'q': 'Jardinage'}).context['cl'].result_count, 1)
+        self.assertEqual(self.client.get(url, {'q': 'propri'}).context['cl'].result_count, 0)
+
+    def test_bulk_actions_keep_index_and_stats_in_sync(self):
+        """
+        Vérifie que fermer, rouvrir et archiver des créneaux se fait en un UPDATE (ou par lots pour
+        l'archivage), en gardant à jour l'index de correspondance et les statistiques.
+        """
+        slots = self.create_slots(3)
+        selected = [slot.pk for slot in slots[:2]]
+        url = reverse('admin:core_slot_changelist')
+        with CaptureQueriesContext(connection) as captured, mock.patch.object(events.broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(url, {'action': 'close_slots', '_selected_action': selected})
+        # Fermés par l'administration : pas de volontaire, les clients ne doivent pas annoncer une prise en charge
+        self.assertEqual([call.args[0] for call in publish.call_args_list], [events.SLOT_CLOSED] * 2)
+        updates = [query['sql'] for query in captured if query['sql'].startswith('UPDATE "core_slot"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Slot.objects.filter(is_available=False).count(), 2)
+        self.assertEqual(MatchIndexEntry.objects.filter(slot_id__in=selected).count(), 0)
+        self.assertEqual(stats.drift(), 0)
+
+        # Réindexation par une tâche de fond, exécutée ici à la place du worker
+        self.client.post(url, {'action': 'reopen_slots', '_selected_action': selected})
+        tasks.run_pending()
+        self.assertEqual(Slot.objects.filter(is_available=True).count(), 3)
+        self.assertEqual(MatchIndexEntry.objects.filter(slot_id__in=selected).count(), 2)
+        self.assertEqual(stats.drift(), 0)
+
+        with mock.patch.object(events.broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(url, {'action': 'archive_selected_slots', '_selected_action': selected})
+        self.assertEqual(
+            sorted((call.args[0], call.args[1]['slot']) for call in publish.call_args_list),
+            [(events.SLOT_DELETED, pk) for pk in selected],
+        )
+        self.assertEqual(list(ArchivedSlot.objects.order_by('pk').values_list('pk', flat=True)), selected)
+        self.assertEqual(Slot.objects.count(), 1)
+        self.assertEqual(stats.drift(), 0)
@@ -1,6 +1,6 @@
 from django.urls import path
 from django.contrib.auth import views as auth_views
-from . import views
+from . import api, views
 
 urlpatterns = [
     path('creaneaux-disponibles/', views.available_slots, name='available_slots'),
@@ -16,6 +16,16 @@ urlpatterns = [
     path('aide-disponible/', views.available_help, name='available_help'),
     path('contact-info/<int:activity_id>/', views.contact_info, name='contact_info'),
     path('se-proposer-aide/<int:activity_id>/', views.volunteer_for_help, name='volunteer_for_help'),
+    path('recherche/', views.search_page, name='search'),
+    path('api/recherche/suggestions/', views.search_suggestions, name='search_suggestions'),
+    path('performances/', views.performance_stats, name='performance_stats'),
+    path('statistiques/', views.availability_stats, name='availability_stats'),
+    path('api/categories/', api.resource_list, {'resource': 'categories'}, name='api_categories'),
+    path('api/competences/', api.resource_list, {'resource': 'competences'}, name='api_competences'),
+    path('api/creneaux/', api.resource_list, {'resource': 'slots'}, name='api_slots'),
+    path('api/activites/', api.resource_list, {'resource': 'activities'}, name='api_activities'),
+    path('api/creneaux/evenements/', api.slot_events, name='slot_events'),
+    path('api/statistiques/', api.availability_stats, name='api_availability_stats'),
 
 ]
 
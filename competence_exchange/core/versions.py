@@ -0,0 +1,203 @@
+from datetime import datetime, time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import condition
+
+from . import database
+from .models import ModelVersion
+
+
+# Modèles dont les modifications sont comptées
+TRACKED_MODELS = ('core.category', 'core.competence', 'core.slot', 'core.activity', 'core.profile')
+
+# Copie en cache d'un compteur (version, date de modification) ; la table ModelVersion fait foi
+CACHE_KEY = 'core:model-version:{label}'
+
+
+def label(model):
+    """
+    Étiquette d'un modèle dans la table des versions, par exemple 'core.slot'.
+    """
+    return model._meta.label_lower
+
+
+def _forget(labels):
+    """
+    Retire du cache les compteurs donnés.
+    """
+    cache.delete_many([CACHE_KEY.format(label=name) for name in labels])
+
+
+def bump(*models):
+    """
+    Incrémente en une requête les compteurs de modifications des modèles donnés.
+
+    Appelée par les signaux de `core.signals`, et directement par les écritures qui ne déclenchent
+    pas de signaux (insertions groupées, `QuerySet.update`). La copie en cache est retirée tout de
+    suite et de nouveau après la validation de la transaction, au cas où une lecture concurrente
+    l'aurait entre-temps remplie avec l'ancienne valeur.
+
+    Args:
+        *models (Model): Les modèles modifiés.
+    """
+    labels = {label(model) for model in models}
+    now = timezone.now()
+    updated = ModelVersion.objects.filter(label__in=labels).update(version=F('version') + 1, changed_at=now)
+    if updated < len(labels):
+        # Compteur absent (base créée sans la migration de données) : il est créé à la volée
+        ModelVersion.objects.bulk_create(
+            [ModelVersion(label=name, changed_at=now) for name in labels], ignore_conflicts=True
+        )
+    _forget(labels)
+    transaction.on_commit(lambda: _forget(labels))
+
+
+def _state(found, labels):
+    """
+    Combine les compteurs `{étiquette: (version, date)}` en (versions dans l'ordre des étiquettes, dernière modification).
+    """
+    versions = tuple(found.get(name, (0, None))[0] for name in labels)
+    changed = [changed_at for _, changed_at in found.values() if changed_at is not None]
+    return versions, max(changed) if changed else None
+
+
+def _from_database(rows):
+    """
+    Met en cache les compteurs lus dans la table des versions et les retourne sous forme de dictionnaire.
+    """
+    found = {name: (version, changed_at) for name, version, changed_at in rows}
+    cache.set_many({CACHE_KEY.format(label=name): value for name, value in found.items()}, timeout=None)
+    return found
+
+
+def read(labels):
+    """
+    Lit les versions des modèles donnés, depuis le cache ou à défaut en une requête.
+
+    Dans une vue routée vers le réplica, les versions sont lues sur le réplica sans passer par le cache
+    (alimenté par la base principale) : l'ETag décrit ainsi les données affichées, et une page lue sur une
+    copie en retard n'est jamais mise en cache par le client sous la version la plus récente.
+
+    Returns :
+        tuple : (versions dans l'ordre des étiquettes, date de dernière modification ou None).
+    """
+    if database.reading_from_replica():
+        rows = ModelVersion.objects.filter(label__in=labels).values_list('label', 'version', 'changed_at')
+        return _state({name: (version, changed_at) for name, version, changed_at in rows}, labels)
+    cached = cache.get_many([CACHE_KEY.format(label=name) for name in labels])
+    found = {name: cached[CACHE_KEY.format(label=name)] for name in labels if CACHE_KEY.format(label=name) in cached}
+    missing = [name for name in labels if name not in found]
+    if missing:
+        found.update(_from_database(
+            ModelVersion.objects.filter(label__in=missing).values_list('label', 'version', 'changed_at')
+        ))
+    return _state(found, labels)
+
+
+async def aread(labels):
+    """
+    Variante asynchrone de `read`.
+    """
+    if database.reading_from_replica():
+        rows = ModelVersion.objects.filter(label__in=labels).values('label', 'version', 'changed_at')
+        return _state({row['label']: (row['version'], row['changed_at']) async for row in rows.aiterator()}, labels)
+    cached = await cache.aget_many([CACHE_KEY.format(label=name) for name in labels])
+    found = {name: cached[CACHE_KEY.format(label=name)] for name in labels if CACHE_KEY.format(label=name) in cached}
+    missing = [name for name in labels if name not in found]
+    if missing:
+        rows = [row async for row in ModelVersion.objects.filter(label__in=missing).values_list('label', 'version', 'changed_at')]
+        found.update(await sync_to_async(_from_database)(rows))
+    return _state(found, labels)
+
+
+def _validators(request, versions, changed_at):
+    """
+    Calcule l'ETag et le Last-Modified d'une page.
+
+    La page dépend aussi de l'utilisateur (la navigation et les liens de contact en dépendent) et de la
+    date du jour (les listes excluent les créneaux passés) : l'ETag les inclut, et le Last-Modified
+    n'est jamais antérieur au début de la journée.
+    """
+    today = timezone.localdate()
+    etag = f"u{request.user.pk or 0}-{today:%Y%m%d}-v{'.'.join(map(str, versions))}"
+    start_of_day = timezone.make_aware(datetime.combine(today, time.min))
+    last_modified = max(changed_at, start_of_day) if changed_at else start_of_day
+    return etag, last_modified
+
+
+def _patch_cache_control(request, response):
+    """
+    Impose la revalidation de la page à chaque affichage ; seules les pages anonymes sont partageables
+    par un cache intermédiaire.
+    """
+    if request.user.is_authenticated:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def conditional_page(*models):
+    """
+    Décorateur de vue : ETag et Last-Modified calculés à partir des compteurs de modifications des modèles
+    affichés, pour répondre 304 à une requête conditionnelle sans exécuter la vue (les compteurs sont lus
+    dans le cache, la table des versions n'étant interrogée qu'en cas d'absence).
+
+    Les vues synchrones utilisent le décorateur `condition` de Django ; les vues asynchrones, qu'il ne
+    prend pas en charge sous Django 4.2, appliquent la même logique. Les compteurs lus sont laissés à
+    la vue dans `request.model_versions` (`{étiquette: version}`), pour les requêtes GET et HEAD.
+
+    Args:
+        *models (Model): Les modèles dont le contenu de la page dépend.
+    """
+    labels = tuple(sorted(label(model) for model in models))
+
+    def cached_validators(request):
+        # `condition` appelle séparément les fonctions d'ETag et de Last-Modified : une seule lecture par requête
+        if not hasattr(request, '_page_validators'):
+            state = read(labels)
+            request.model_versions = dict(zip(labels, state[0]))
+            request._page_validators = _validators(request, *state)
+        return request._page_validators
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view(request, *args, **kwargs)
+                # Charge l'utilisateur (session) hors de la boucle d'événements
+                await sync_to_async(lambda: request.user.pk)()
+                state = await aread(labels)
+                request.model_versions = dict(zip(labels, state[0]))
+                etag, last_modified = _validators(request, *state)
+                etag, timestamp = quote_etag(etag), int(last_modified.timestamp())
+                response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                    if response.status_code == 200:
+                        response.setdefault('ETag', etag)
+                        response.setdefault('Last-Modified', http_date(timestamp))
+                return _patch_cache_control(request, response)
+            return async_wrapper
+
+        conditioned = condition(
+            etag_func=lambda request, *args, **kwargs: cached_validators(request)[0],
+            last_modified_func=lambda request, *args, **kwargs: cached_validators(request)[1],
+        )(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            return _patch_cache_control(request, conditioned(request, *args, **kwargs))
+        return wrapper
+
+    return decorator
@@ -1,27 +1,80 @@
-from django.http import HttpResponseForbidden
+from datetime import timedelta
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
 from .models import Slot, Profile, Competence, Activity, Category
-from datetime import date
+from .pagination import InvalidCursor, KeysetPaginator
+from . import catalogue, database, performance, profiles, queries, recurrence, rows, search, stats, versions
+from .volunteering import ClaimResult, claim_activity
+
+# Nombre de créneaux affichés par page sur la liste publique
+SLOTS_PER_PAGE = 50
+
+# Jours proposés pour la récurrence des créneaux (valeurs de date.weekday())
+WEEKDAYS = [(0, "Lundi"), (1, "Mardi"), (2, "Mercredi"), (3, "Jeudi"), (4, "Vendredi"), (5, "Samedi"), (6, "Dimanche")]
+
+
+async def _aload_user(request):
+    """
+    Charge l'utilisateur de la requête (session puis utilisateur) dans un thread, pour que les gabarits
+    puissent ensuite lire `request.user` sans requête synchrone depuis la boucle d'événements.
 
+    Returns :
+        User | AnonymousUser : L'utilisateur de la requête.
+    """
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
 
-def available_slots(request):
+
+def async_login_required(view):
+    """
+    Équivalent de `login_required` pour les vues asynchrones (que Django 4.2 ne prend pas en charge).
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await _aload_user(request)
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+@database.replica_reads
+@versions.conditional_page(Slot, Activity, Competence)
+async def available_slots(request):
     """
     Affiche la liste des créneaux disponibles pour l'aide, sans informations personnelles.
+    La liste est paginée par curseur sur (date, id) via le paramètre GET `cursor`.
+    Vue asynchrone : sous ASGI, aucun thread n'est occupé pendant les allers-retours avec la base.
 
     Args:
         request (HttpRequest) : La requête HTTP reçue par le serveur.
 
     Returns :
         HttpResponse : La page affichant les créneaux disponibles.
+        HttpResponseBadRequest : Si le curseur de pagination est invalide.
     """
-    slots = Slot.objects.filter(is_available=True, purpose='aid', date__gte=date.today())
-    return render(request, 'core/available_slots.html', {'slots': slots})
-
-
-def competence_list(request):
+    await _aload_user(request)
+    paginator = KeysetPaginator(queries.available_slots_queryset(), ordering=('date', 'id'), per_page=SLOTS_PER_PAGE)
+    try:
+        page = await paginator.aget_page(request.GET.get('cursor'))
+    except InvalidCursor:
+        return HttpResponseBadRequest("Curseur de pagination invalide.")
+    return render(request, 'core/available_slots.html', {'slots': rows.slot_rows(page.object_list, request.user), 'page': page})
+
+
+@database.replica_reads
+@versions.conditional_page(Category, Competence, Slot)
+async def competence_list(request):
     """
-    Affiche la liste des compétences regroupées par catégorie.
+    Affiche la liste des compétences regroupées par catégorie (vue asynchrone), avec pour chacune le
+    nombre d'offres et de demandes d'aide ouvertes à partir de la semaine en cours.
 
     Args:
         request (HttpRequest) : La requête HTTP reçue par le serveur.
@@ -29,75 +82,104 @@ def competence_list(request):
     Returns :
         HttpResponse : La page affichant la liste des compétences par catégorie.
     """
-    categories = Category.objects.all()
-    return render(request, 'core/competence_list.html', {'categories': categories})
+    await _aload_user(request)
+    # Le catalogue est lu depuis le cache : le gabarit ne peut pas interroger la base depuis la boucle d'événements
+    version = await catalogue.aget_version()
+    # Compteur des créneaux déjà lu par conditional_page (absent hors GET et HEAD)
+    slot_version = getattr(request, 'model_versions', {}).get(versions.label(Slot))
+    if slot_version is None:
+        slot_version = (await versions.aread((versions.label(Slot),)))[0][0]
+    return render(request, 'core/competence_list.html', {
+        'categories': await catalogue.aget_catalogue_with_stats(version, slot_version),
+        'catalogue_version': version,
+        'stats_version': f'{slot_version}-{stats.current_week():%Y%m%d}',
+    })
 
 
 @login_required
+@versions.conditional_page(Category, Competence, Profile)
 def user_competences(request):
     """
-    Permet à l'utilisateur de sélectionner les compétences qu'il possède.
+    Permet à l'utilisateur de sélectionner les compétences qu'il possède, regroupées par catégorie.
+
+    Les choix sont lus dans le catalogue en cache ; à l'enregistrement, seule la différence avec les
+    compétences actuelles est écrite (voir `core.profiles.set_competences`).
 
     Args:
-        request (HttpRequest) : La requête HTTP reçue par le serveur.
+        request (HttpRequest) : La requête HTTP reçue par le serveur.
 
-    Returns :
-        HttpResponse : La page permettant de sélectionner les compétences, ou une redirection.
+    Returns :
+        HttpResponse : La page permettant de sélectionner les compétences, ou une redirection.
+        HttpResponseBadRequest : Si une compétence envoyée est inconnue.
     """
+    choices = catalogue.get_choices()
     if request.method == 'POST':
-        selected_competences = request.POST.getlist('competences')
-        request.user.profile.competences.set(selected_competences)
+        try:
+            selected_competences = {int(value) for value in request.POST.getlist('competences')}
+        except ValueError:
+            return HttpResponseBadRequest("Compétence invalide.")
+        if not selected_competences <= catalogue.choice_ids(choices):
+            return HttpResponseBadRequest("Compétence inconnue.")
+        profiles.set_competences(request.user, selected_competences)
         return redirect('available_slots')
-    competences = Competence.objects.all()
-    return render(request, 'core/user_competences.html', {'competences': competences})
+    return render(request, 'core/user_competences.html', {
+        'groups': choices,
+        'selected_competence_ids': profiles.competence_ids(request.user),
+    })
 
 
 @login_required
 def add_slot(request):
     """
-    Permet à l'utilisateur de créer un créneau pour offrir ou demander de l'aide.
+    Permet à l'utilisateur de créer un créneau pour offrir ou demander de l'aide, ou une série de
+    créneaux (récurrence hebdomadaire jusqu'à une date de fin, ou liste de dates supplémentaires).
 
     Args:
         request (HttpRequest) : La requête HTTP reçue par le serveur.
 
     Returns :
         HttpResponse : La page d'ajout de créneau ou une redirection vers 'my_slots'.
+        HttpResponse : La page d'ajout avec un message d'erreur (code 400) si l'objectif ou les dates sont invalides.
     """
-    user_profile, created = Profile.objects.get_or_create(user=request.user)
-    # Compétences que l'utilisateur possède
-    competences = user_profile.competences.all()
+    # Compétences que l'utilisateur possède (identifiants mémorisés, puis noms lus sans jointure)
+    competence_ids = profiles.competence_ids(request.user)
+    competences = Competence.objects.filter(id__in=competence_ids).values('id', 'name').order_by('name')
 
     if request.method == 'POST':
         # Récupérer les données du formulaire
-        date = request.POST.get('date')
         competence_id = request.POST.get('competence')
         purpose = request.POST.get('purpose')
         competence = get_object_or_404(Competence, id=competence_id)
         description = request.POST.get('description') if purpose == 'request' else None
 
-        # Créer le créneau
-        slot = Slot.objects.create(
-            date=date,
-            competence=competence,
-            user=request.user,
-            is_available=True,
-            purpose=purpose
-        )
-
-        # Si c'est une demande d'aide, créer une activité avec la description
-        if purpose == 'request' and description:
-            Activity.objects.create(
-                description=description,
-                requester=request.user,
-                competence_needed=competence,
-                slot=slot
-            )
+        # Valider l'objectif, puis une seule fois l'ensemble des dates (date unique, récurrence ou liste de dates)
+        try:
+            if purpose not in dict(Slot.PURPOSE_CHOICES):
+                raise ValidationError("Objectif invalide.")
+            start = recurrence.parse_date(request.POST.get('date'), "Date")
+            until = request.POST.get('repeat_until')
+            until = recurrence.parse_date(until, "Date de fin") if until else None
+            weekdays = [int(day) for day in request.POST.getlist('weekdays')]
+            extra_dates = [
+                recurrence.parse_date(value, "Date supplémentaire")
+                for value in request.POST.get('extra_dates', '').replace(',', ' ').split()
+            ]
+            dates = recurrence.expand_dates(start, until, weekdays, extra_dates)
+        except (ValidationError, ValueError) as error:
+            message = error.messages[0] if isinstance(error, ValidationError) else "Jour de la semaine invalide."
+            return render(request, 'core/add_slot.html', {
+                'competences': competences, 'weekdays': WEEKDAYS, 'error': message,
+            }, status=400)
+
+        # Créer tous les créneaux (et les activités des demandes d'aide) en une transaction
+        recurrence.create_slots(request.user, competence, purpose, dates, description)
 
         return redirect('my_slots')
 
-    return render(request, 'core/add_slot.html', {'competences': competences})
+    return render(request, 'core/add_slot.html', {'competences': competences, 'weekdays': WEEKDAYS})
 
 @login_required
+@versions.conditional_page(Slot, Activity, Competence)
 def my_slots(request):
     """
     Affiche les créneaux de l'utilisateur, avec la possibilité de les supprimer.
@@ -108,8 +190,8 @@ def my_slots(request):
     Returns :
         HttpResponse : La page listant les créneaux de l'utilisateur.
     """
-    slots = Slot.objects.filter(user=request.user)
-    return render(request, 'core/my_slots.html', {'slots': slots})
+    slots = queries.my_slots_queryset(request.user)
+    return render(request, 'core/my_slots.html', {'slots': rows.slot_rows(slots, request.user)})
 
 
 @login_required
@@ -126,42 +208,32 @@ def delete_slot(request, slot_id):
     """
     slot = get_object_or_404(Slot, id=slot_id, user=request.user)
     slot.delete()
+    # Suppression déclenchée par un lien (GET) : le client doit lire la base principale
+    database.wrote(request)
     return redirect('my_slots')
 
 
-from django.db.models import Q
-
-@login_required
-def help_requests(request):
+@async_login_required
+@database.replica_reads
+@versions.conditional_page(Activity, Slot, Competence, Profile)
+async def help_requests(request):
     """
-    Affiche les demandes d'aide d'autres utilisateurs dans une compétence que l'utilisateur actuel possède.
+    Affiche les demandes d'aide d'autres utilisateurs dans une compétence que l'utilisateur actuel possède (vue asynchrone).
 
     Args:
         request (HttpRequest): La requête HTTP reçue par le serveur.
 
-    Returns :
+    Returns :
         HttpResponse : La page listant les demandes d'aide d'autres utilisateurs.
     """
-
-    # Compétences que l'utilisateur possède
-    user_competences = request.user.profile.competences.all()
-    print(f"Compétences de l'utilisateur : {[comp.name for comp in user_competences]}")
-
-    # Filtre les demandes d'aide disponibles ou celles où l'utilisateur est déjà volontaire
-    help_requests = Activity.objects.filter(
-        competence_needed__in=user_competences,
-        slot__purpose='request',  # Vérifie que le créneau est une demande d'aide
-    ).filter(
-        Q(slot__is_available=True) | Q(volunteer=request.user)  # Inclut les créneaux disponibles ou où l'utilisateur est volontaire
-    ).exclude(requester=request.user)
-
-    print(f"Nombre de demandes d'aide récupérées : {help_requests.count()}")
-
-    return render(request, 'core/help_requests.html', {'help_requests': help_requests})
+    competence_ids = await profiles.acompetence_ids(request.user)
+    help_requests = [activity async for activity in queries.help_requests_queryset(request.user, competence_ids).aiterator()]
+    return render(request, 'core/help_requests.html', {'help_requests': rows.request_rows(help_requests, request.user, competence_ids)})
 
 
 
 @login_required
+@versions.conditional_page(Activity, Slot, Competence)
 def my_requests(request):
     """
     Affiche les demandes d'aide créées par l'utilisateur connecté.
@@ -172,14 +244,16 @@ def my_requests(request):
     Returns :
         HttpResponse : La page listant les demandes d'aide de l'utilisateur.
     """
-    user_requests = Activity.objects.filter(requester=request.user)
-    return render(request, 'core/my_requests.html', {'user_requests': user_requests})
+    user_requests = queries.my_requests_queryset(request.user)
+    return render(request, 'core/my_requests.html', {'user_requests': rows.request_rows(user_requests, request.user)})
 
 
-@login_required
-def available_help(request):
+@async_login_required
+@database.replica_reads
+@versions.conditional_page(Slot, Competence, Profile)
+async def available_help(request):
     """
-    Affiche les créneaux disponibles où un autre utilisateur propose de l'aide dans une compétence que l'utilisateur actuel ne possède pas.
+    Affiche les créneaux disponibles où un autre utilisateur propose de l'aide dans une compétence que l'utilisateur actuel ne possède pas (vue asynchrone).
 
     Args:
         request (HttpRequest): La requête HTTP reçue par le serveur.
@@ -187,17 +261,9 @@ def available_help(request):
     Returns :
         HttpResponse : La page listant les créneaux d'aide disponibles.
     """
-
-    # Compétences que l'utilisateur possède
-    user_competences = request.user.profile.competences.all()
-
-    # Créneaux disponibles pour des compétences que l'utilisateur ne possède pas
-    available_slots = Slot.objects.filter(
-        is_available=True,
-        purpose='aid'
-    ).exclude(competence__in=user_competences).exclude(user=request.user)
-
-    return render(request, 'core/available_help.html', {'available_slots': available_slots})
+    competence_ids = await profiles.acompetence_ids(request.user)
+    available_slots = [slot async for slot in queries.available_help_queryset(request.user, competence_ids).aiterator()]
+    return render(request, 'core/available_help.html', {'available_slots': rows.offer_rows(available_slots)})
 
 
 @login_required
@@ -211,19 +277,18 @@ def volunteer_for_help(request, activity_id):
 
     Returns :
         HttpResponseRedirect : Redirection vers la page des demandes d'aide.
+        HttpResponseForbidden : Si l'utilisateur ne possède pas la compétence requise.
+        HttpResponse : Code 409 si un autre volontaire a déjà pris le créneau.
     """
-    activity = get_object_or_404(Activity, id=activity_id)
-
-    # Vérifie que l'utilisateur possède la compétence requise
-    if activity.competence_needed not in request.user.profile.competences.all():
+    result = claim_activity(activity_id, request.user)
+    if result is ClaimResult.NOT_FOUND:
+        raise Http404("Activité introuvable.")
+    if result is ClaimResult.MISSING_COMPETENCE:
         return HttpResponseForbidden("Vous ne possédez pas la compétence requise pour cette activité.")
+    if result is ClaimResult.CONFLICT:
+        return HttpResponse("Un autre utilisateur s'est déjà proposé pour cette activité.", status=409)
 
-    # Enregistre l'utilisateur comme volontaire et rend le créneau indisponible
-    activity.slot.is_available = False
-    activity.slot.save()
-    activity.volunteer = request.user
-    activity.save()
-
+    database.wrote(request)
     return redirect('help_requests')
 
 
@@ -249,3 +314,100 @@ def contact_info(request, activity_id):
     # Détermine l'autre utilisateur impliqué dans l'activité
     other_user = activity.volunteer if request.user == activity.requester else activity.requester
     return render(request, 'core/contact_info.html', {'other_user': other_user})
+
+
+@login_required
+@database.replica_reads
+def search_page(request):
+    """
+    Recherche plein texte des compétences (nom ou catégorie) et des demandes d'aide ouvertes
+    (description, compétence ou catégorie), insensible aux accents et triée par pertinence.
+
+    Paramètres GET :
+        q : Le texte recherché.
+
+    Args:
+        request (HttpRequest): La requête HTTP reçue par le serveur.
+
+    Returns :
+        HttpResponse : La page des résultats.
+    """
+    text = request.GET.get('q', '').strip()
+    return render(request, 'core/search.html', {
+        'query': text,
+        'competences': search.search_competences(text),
+        'help_requests': rows.request_rows(search.search_requests(text), request.user, profiles.competence_ids(request.user)),
+    })
+
+
+@login_required
+@database.replica_reads
+def search_suggestions(request):
+    """
+    Autocomplétion de la recherche : suggestions pour le début de texte saisi, au format JSON.
+
+    Paramètres GET :
+        q : Le texte saisi.
+
+    Args:
+        request (HttpRequest): La requête HTTP reçue par le serveur.
+
+    Returns :
+        JsonResponse : `{'suggestions': [{'type', 'id', 'label'}, ...]}`.
+    """
+    return JsonResponse({'suggestions': search.suggest(request.GET.get('q', ''))})
+
+
+@staff_member_required
+def performance_stats(request):
+    """
+    Affiche, pour le personnel uniquement, les statistiques de performance par route du processus courant
+    (durées, requêtes SQL, rendu des gabarits), au format HTML ou JSON avec `?format=json`.
+
+    Args:
+        request (HttpRequest): La requête HTTP reçue par le serveur.
+
+    Returns :
+        HttpResponse : La page des statistiques, ou JsonResponse avec `?format=json`.
+    """
+    route_stats = performance.registry.snapshot()
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'routes': route_stats})
+    return render(request, 'core/performance_stats.html', {'stats': route_stats})
+
+
+@staff_member_required
+@database.replica_reads
+def availability_stats(request):
+    """
+    Tableau de bord, pour le personnel uniquement, de l'offre et de la demande d'aide ouvertes par
+    compétence ou par catégorie et par semaine, lues dans la table des statistiques (voir `core.stats`).
+
+    Paramètres GET : `group`, `weeks` et `start` (voir `core.stats.options`).
+
+    Args:
+        request (HttpRequest): La requête HTTP reçue par le serveur.
+
+    Returns :
+        HttpResponse : La page du tableau de bord.
+        HttpResponseBadRequest : Si un paramètre est invalide.
+    """
+    try:
+        group, weeks, start = stats.options(request.GET)
+    except stats.StatsError as error:
+        return HttpResponseBadRequest(str(error))
+    table = stats.weekly(group, weeks, start)
+    return render(request, 'core/availability_stats.html', {
+        'group': group,
+        'weeks': table['weeks'],
+        'rows': [
+            {**row, 'cells': [
+                {'offers': offers, 'requests': requests, 'shortage': requests > offers}
+                for offers, requests in zip(row['offers'], row['requests'])
+            ]}
+            for row in table['rows']
+        ],
+        'previous_start': start - timedelta(weeks=weeks),
+        'next_start': start + timedelta(weeks=weeks),
+    })
+
@@ -0,0 +1,121 @@
+import enum
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+from django.utils import timezone
+
+from . import events, match_index, notifications, profiles, search, stats, tasks, versions
+from .models import Slot, Activity, MatchIndexEntry
+
+
+class ClaimResult(enum.Enum):
+    """
+    Résultat d'une tentative de prise en charge d'une demande d'aide.
+    """
+    CLAIMED = 'claimed'
+    NOT_FOUND = 'not_found'
+    MISSING_COMPETENCE = 'missing_competence'
+    CONFLICT = 'conflict'
+
+
+def claim_activity(activity_id, user):
+    """
+    Enregistre l'utilisateur comme volontaire d'une activité et rend son créneau indisponible, de manière atomique.
+
+    Le créneau n'est pris que par un UPDATE conditionnel (créneau encore disponible et compétence
+    requise parmi celles de l'utilisateur, lues par `core.profiles.competence_ids` sans jointure sur
+    la table de liaison) : si plusieurs volontaires se proposent en même temps, un seul UPDATE modifie
+    la ligne et les autres obtiennent un conflit, sans écraser le volontaire déjà enregistré. Cet UPDATE
+    tient lieu de verrou de ligne, y compris sous SQLite qui ignore `select_for_update`.
+
+    Le courriel au demandeur et la fusion de l'index plein texte sont demandés dans la même transaction,
+    comme tâches de fond (voir `core.tasks`) : ils n'allongent pas la requête. La prise du créneau est
+    publiée aux clients du flux d'événements (voir `core.events`) après la validation.
+
+    Args:
+        activity_id (int): L'identifiant de l'activité.
+        user (User): L'utilisateur qui se propose.
+
+    Returns :
+        ClaimResult : CLAIMED si l'utilisateur est (ou était déjà) le volontaire, NOT_FOUND si l'activité
+        n'existe pas, MISSING_COMPETENCE s'il ne possède pas la compétence requise, CONFLICT si le
+        créneau a déjà été pris.
+    """
+    slot_id = Activity.objects.filter(pk=activity_id).values('slot_id')[:1]
+    competence_ids = profiles.competence_ids(user)
+    now = timezone.now()
+    with transaction.atomic():
+        # Première instruction de la transaction : l'UPDATE conditionnel prend le verrou d'écriture
+        # avant toute lecture, ce qui sérialise les prises en charge concurrentes.
+        claimed = Slot.objects.filter(
+            pk=Subquery(slot_id),
+            is_available=True,
+        ).filter(
+            Exists(Activity.objects.filter(pk=activity_id, slot_id=OuterRef('pk'), competence_needed_id__in=competence_ids))
+        ).update(is_available=False, updated_at=now)
+
+        if claimed:
+            Activity.objects.filter(pk=activity_id).update(volunteer=user, updated_at=now)
+            claimed_slot_id, competence_id, slot_date = Slot.objects.filter(pk=Subquery(slot_id)).values_list(
+                'pk', 'competence_id', 'date'
+            ).get()
+            # Les UPDATE ne déclenchent pas les signaux : le créneau fermé est retiré de l'index et des
+            # statistiques, les versions des modèles sont incrémentées et la prise du créneau est publiée à la main
+            MatchIndexEntry.objects.filter(slot_id=claimed_slot_id).delete()
+            stats.apply(stats.deltas([(competence_id, slot_date, 'request')], -1))
+            versions.bump(Slot, Activity)
+            events.publish_on_commit(events.SLOT_CLAIMED, {'slot': claimed_slot_id, 'activity': activity_id})
+            # Hors de la requête : courriel au demandeur et fusion de l'index plein texte (la demande en sort)
+            tasks.enqueue(notifications.notify_volunteer, {'activity_id': activity_id})
+            search.schedule_merge()
+            return ClaimResult.CLAIMED
+
+        # Aucune ligne modifiée : on détermine pourquoi
+        activity = Activity.objects.filter(pk=activity_id).values('volunteer_id', 'competence_needed_id').first()
+    if activity is None:
+        return ClaimResult.NOT_FOUND
+    if activity['competence_needed_id'] not in competence_ids:
+        return ClaimResult.MISSING_COMPETENCE
+    if activity['volunteer_id'] == user.pk:
+        return ClaimResult.CLAIMED
+    return ClaimResult.CONFLICT
+
+
+def set_availability(queryset, available, batch_size=500):
+    """
+    Ouvre (`available`) ou ferme les créneaux d'un QuerySet en un seul UPDATE, par exemple depuis une
+    action groupée de l'administration ; les créneaux déjà dans l'état demandé ne sont pas modifiés.
+
+    Comme pour `claim_activity`, l'UPDATE ne déclenche pas les signaux : les créneaux modifiés, relus
+    avant l'UPDATE dans la même transaction, sont retirés de l'index de correspondance ou réindexés par
+    une tâche de fond, les statistiques et les versions sont mises à jour et chaque changement est
+    publié aux clients du flux d'événements.
+
+    Args:
+        queryset (QuerySet): Les créneaux à modifier.
+        available (bool): L'état demandé.
+        batch_size (int): Nombre de créneaux par tâche de réindexation.
+
+    Returns :
+        int : Le nombre de créneaux modifiés.
+    """
+    with transaction.atomic():
+        changed = queryset.filter(is_available=not available)
+        slots = list(changed.values_list('pk', 'competence_id', 'date', 'purpose'))
+        if not slots:
+            return 0
+        if not available:
+            MatchIndexEntry.objects.filter(slot_id__in=changed.values('pk')).delete()
+        count = changed.update(is_available=available, updated_at=timezone.now())
+        stats.apply(stats.deltas((slot[1:] for slot in slots), 1 if available else -1))
+        versions.bump(Slot)
+        slot_ids = [slot[0] for slot in slots]
+        if available:
+            for start in range(0, len(slot_ids), batch_size):
+                tasks.enqueue(match_index.index_new_slots, {'slot_ids': slot_ids[start:start + batch_size]})
+        event_type = events.SLOT_OPENED if available else events.SLOT_CLOSED
+        for pk, competence_id, slot_date, purpose in slots:
+            events.publish_on_commit(event_type, events.slot_data(
+                Slot(pk=pk, competence_id=competence_id, date=slot_date, purpose=purpose),
+            ))
+    return count